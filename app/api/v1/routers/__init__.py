@@ -4,9 +4,21 @@ from .health import router as health
 from .ingest import router as ingest
 from .data import router as data
 from .debug_data import router as debug_data
+from .tiles import router as tiles
+from .events import router as events
+from .stream import router as stream
+from .reconcile import router as reconcile
+from .archive import router as archive
+from .jobs import router as jobs
 
 api = APIRouter()
 api.include_router(health)
 api.include_router(ingest)
 api.include_router(data)
-api.include_router(debug_data)
\ No newline at end of file
+api.include_router(debug_data)
+api.include_router(tiles)
+api.include_router(events)
+api.include_router(stream)
+api.include_router(reconcile)
+api.include_router(archive)
+api.include_router(jobs)
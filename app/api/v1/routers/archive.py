@@ -0,0 +1,117 @@
+# app/api/v1/routers/archive.py
+from __future__ import annotations
+import asyncio
+import re
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Annotated, Any, Dict, List, Optional
+
+from ....core.deps import ReadRepoDep
+from ....models.schemas import (
+    ArchiveMonthsResponse, ArchiveStatsResponse, ArchiveTimeSeriesResponse, TimeSeriesParams, TimeSeriesPoint,
+)
+from ....services.archive import ArchiveUnavailable, default_archive, last_closed_month
+
+router = APIRouter(prefix="/archive", tags=["Archive"])
+
+_MONTH = r"^\d{4}-\d{2}$"
+_UNAVAILABLE = {503: {"description": "pyarrow não instalado ou ARCHIVE_DIR não configurado"}}
+
+def _archive():
+    try:
+        return default_archive()
+    except ArchiveUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+@router.get(
+    "/months",
+    summary="Months exported to the Parquet archive",
+    response_model=ArchiveMonthsResponse,
+    responses=_UNAVAILABLE,
+)
+async def months() -> Dict[str, Any]:
+    manifest = await asyncio.to_thread(_archive().manifest)
+    return {
+        "last_closed_month": last_closed_month(),
+        "months": [{"month": m, **info} for m, info in manifest.items()],
+    }
+
+@router.post(
+    "/export",
+    summary="Export closed months from Mongo into the Parquet archive",
+    response_model=ArchiveMonthsResponse,
+    responses=_UNAVAILABLE,
+)
+async def export(
+    repo: ReadRepoDep,
+    month: Annotated[Optional[List[str]], Query(description="YYYY-MM (repetível); padrão: todos os meses fechados que faltam")] = None,
+    force: Annotated[bool, Query(description="Reexporta meses já presentes no manifesto")] = False,
+) -> Dict[str, Any]:
+    """
+    Meses fechados (terminados há mais de ARCHIVE_CLOSE_AFTER_DAYS dias) lidos
+    do Mongo em ordem de data e gravados em `year=/month=`; meses abertos
+    pedidos em `month` são ignorados. Devolve só os meses exportados agora.
+    """
+    archive = _archive()
+    if month and not all(re.fullmatch(_MONTH, m) for m in month):
+        raise HTTPException(status_code=422, detail="month must be YYYY-MM")
+    try:
+        done = await archive.export_closed_months(repo, months=month, force=force)
+    except ArchiveUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    return {"last_closed_month": last_closed_month(), "months": done}
+
+@router.get(
+    "/stats",
+    summary="Stats over the archived months (reads only date and satellite columns)",
+    response_model=ArchiveStatsResponse,
+    responses=_UNAVAILABLE,
+)
+async def stats(
+    start: Annotated[Optional[str], Query(description="YYYY-MM-DD ou ISO")] = None,
+    end: Annotated[Optional[str], Query(description="YYYY-MM-DD ou ISO")] = None,
+    satelite: Optional[str] = None,
+    estado: Optional[str] = None,
+    bioma: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Mesmo formato de /data/stats, sobre o arquivo frio; `scan` mostra quantos
+    arquivos e row groups foram lidos depois da poda por partição/estatísticas.
+    """
+    archive = _archive()
+    try:
+        return await asyncio.to_thread(
+            archive.stats, start, end, satelite=satelite, estado=estado, bioma=bioma,
+        )
+    except ValueError as exc:           # start/end que não são data/ISO
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ArchiveUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+@router.get(
+    "/timeseries",
+    summary="Detection counts per hour/day/week over the archived months",
+    response_model=ArchiveTimeSeriesResponse,
+    responses=_UNAVAILABLE,
+)
+async def timeseries(q: Annotated[TimeSeriesParams, Depends()]) -> ArchiveTimeSeriesResponse:
+    """
+    Mesmo formato de /data/timeseries (buckets inteiros, group-by por
+    satelite/estado/bioma), lendo só data, frp e as dimensões pedidas.
+    Ex.: /archive/timeseries?interval=week&group_by=bioma&start=2019-01-01&end=2024-12-31
+    """
+    archive = _archive()
+    filters = {f: getattr(q, f) for f in ("satelite", "estado", "bioma")}
+    try:
+        dims = q.dims()
+        out = await asyncio.to_thread(
+            lambda: archive.timeseries(interval=q.interval, group_by=dims, start=q.start, end=q.end, **filters)
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    except ArchiveUnavailable as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+    points = [
+        TimeSeriesPoint(bucket=r["bucket"], group={d: r.get(d) for d in dims}, count=r["count"], frp_sum=r["frp_sum"])
+        for r in out["rows"]
+    ]
+    return ArchiveTimeSeriesResponse(interval=q.interval, group_by=dims, points=points, scan=out["scan"])
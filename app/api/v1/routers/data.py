@@ -1,20 +1,100 @@
 # app/routers/data.py
 from __future__ import annotations
-from fastapi import APIRouter, Depends, Query
-from typing import Annotated
-from pymongo import ASCENDING, DESCENDING
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Any, AsyncIterator, Dict, Iterable, Literal, Mapping, Union
 
 from ....models.schemas import (
     StatsResponse,
     FocusItem, FocusListResponse,
-    QueryParams
+    GeoJSONFeature, GeoJSONFeatureCollection,
+    DensityCell, DensityResponse,
+    TimeSeriesPoint, TimeSeriesResponse,
+    QueryParams, ExportParams, DensityParams, TimeSeriesParams
 )
-from ....core.deps import RepoDep, MongoDep
+from ....core.config import settings
+from ....core.deps import ReadRepoDep, RepoDep
 from ....core.logging_config import get_logger
+from ....repositories.mongo_repo import FOCUS_PROJECTION
+from ....utils.fast_json import FastJSONResponse, focus_list_dict, feature_collection_dict
+from ....utils.export_formats import ENCODERS, MEDIA_TYPES
+from ....utils.geo import parse_bbox, within_bbox, within_radius
+from ....utils.grid import res_key, cell_bounds
+from ....utils.cache import TTLCache
+from ....services.timeseries import timeseries as run_timeseries
+from ....services.hot_snapshot import hot_snapshot
 
 router = APIRouter(prefix="/data", tags=["Data"])
 log = get_logger()
 
+# /data/density: cache por (resolução, bbox, janela, filtros)
+_density_cache: TTLCache[DensityResponse] = TTLCache(maxsize=512, ttl=settings.density_cache_ttl)
+
+def _to_item(d: Mapping[str, Any]) -> FocusItem:
+    """Mapeia um documento (dict ou RawBSONDocument) para o modelo de saída."""
+    return FocusItem(
+        id=(d.get("id") or str(d.get("_id"))),
+        data_hora_gmt=d.get("data_hora_gmt"),
+        longitude=d.get("longitude"),
+        latitude=d.get("latitude"),
+        satelite=d.get("satelite"),
+        municipio=d.get("municipio"),
+        estado=d.get("estado"),
+        pais=d.get("pais"),
+        bioma=d.get("bioma"),
+        frp=d.get("frp"),
+        geometry=d.get("geometry"),
+    )
+
+def build_filter(q: QueryParams | DensityParams) -> Dict[str, Any]:
+    """
+    Traduz os parâmetros de consulta para filtro Mongo (atributos, intervalo de
+    datas, bbox/raio). `end` só com data (YYYY-MM-DD) inclui o dia inteiro.
+    """
+    flt: Dict[str, Any] = {}
+    for field in ("satelite", "estado", "municipio", "bioma"):
+        value = getattr(q, field, None)
+        if value:
+            flt[field] = value
+    if q.start or q.end:
+        rng = {}
+        if q.start: rng["$gte"] = q.start
+        if q.end: rng["$lte"] = q.end if "T" in q.end else f"{q.end}T23:59:59Z"
+        flt["data_hora_gmt"] = rng
+    near_lon, near_lat, near_km = (getattr(q, f, None) for f in ("near_lon", "near_lat", "near_km"))
+    if q.bbox:
+        flt["geometry"] = within_bbox(parse_bbox(q.bbox))
+    elif near_lon is not None and near_lat is not None and near_km:
+        flt["geometry"] = within_radius(near_lon, near_lat, near_km)
+    return flt
+
+def _sort_of(q: QueryParams) -> list[tuple[str, int]]:
+    return [("data_hora_gmt", -1 if q.sort.startswith("-") else 1)]
+
+def _to_feature(d: Mapping[str, Any]) -> GeoJSONFeature:
+    item = _to_item(d)
+    return GeoJSONFeature(
+        id=item.id,
+        geometry=item.geometry,
+        properties=item.model_dump(exclude={"id", "geometry"}),
+    )
+
+def _list_response(docs: Iterable[Mapping[str, Any]], fmt: str):
+    """
+    Monta a resposta de listagem (json ou geojson).
+    Com API_FAST_JSON, serializa direto com orjson e devolve um Response pronto
+    (o FastAPI não revalida o `response_model`); os bytes são os mesmos.
+    """
+    if settings.api_fast_json:
+        if fmt == "geojson":
+            return FastJSONResponse(feature_collection_dict(docs))
+        return FastJSONResponse(focus_list_dict(docs))
+
+    if fmt == "geojson":
+        return GeoJSONFeatureCollection(features=[_to_feature(d) for d in docs])
+    items = [_to_item(d) for d in docs]
+    return FocusListResponse(total=len(items), returned=len(items), items=items)
+
 @router.get(
     "/stats",
     summary="Basic collection stats",
@@ -22,7 +102,7 @@ log = get_logger()
     responses={200: {"description": "Stats aggregated"}}
 )
 async def stats(
-    repo: RepoDep,
+    repo: ReadRepoDep,
 ):
     """
     Estatísticas gerais:
@@ -36,94 +116,175 @@ async def stats(
 @router.get(
     "/recent",
     summary="List most recent fire focuses (ordered by data_hora_gmt desc)",
-    response_model=FocusListResponse,
+    response_model=Union[FocusListResponse, GeoJSONFeatureCollection],
     responses={200: {"description": "Recent documents returned"}}
 )
 async def recent(
-    repo: RepoDep,
-    mongo: MongoDep,
+    repo: ReadRepoDep,
+    primary: RepoDep,
     limit: Annotated[int, Query(gt=0, le=1000, example=20)] = 20,
+    format: Annotated[Literal["json", "geojson"], Query()] = "json",
 ):
     """
     Retorna os registros mais recentes, ordenados por data_hora_gmt desc.
     Use ?format=geojson para receber FeatureCollection.
     """
-    db, coll = mongo
-    
-    # 2buscar ordenando por data desc
-    cur = (
-        coll.find(
-            {},
-            projection={
-                "_id": 1,
-                "id": 1,
-                "geometry": 1,
-                "data_hora_gmt": 1,
-                "longitude": 1,
-                "latitude": 1,
-                "satelite": 1,
-                "municipio": 1,
-                "estado": 1,
-                "pais": 1,
-                "bioma": 1,
-                "frp": 1,
-            },
-        )
-        .sort([("data_hora_gmt", DESCENDING)])
-        .limit(int(limit))
-    )
-    
-    docs = await cur.to_list(length=int(limit))
-    
-    # mapear para o modelo de saída
-    items = [
-        FocusItem(
-            id=(d.get("id") or str(d.get("_id"))),
-            data_hora_gmt=d.get("data_hora_gmt"),
-            longitude=d.get("longitude"),
-            latitude=d.get("latitude"),
-            satelite=d.get("satelite"),
-            municipio=d.get("municipio"),
-            estado=d.get("estado"),
-            pais=d.get("pais"),
-            bioma=d.get("bioma"),
-            frp=d.get("frp"),
-            geometry=d.get("geometry"),
-        )
-        for d in docs
-    ]
-
-    return FocusListResponse(total=len(items), returned=len(items), items=items)
+    docs = None
+    # o snapshot (que vive até a próxima recarga) é carregado do primário
+    if await hot_snapshot.ensure_loaded(primary):
+        docs = hot_snapshot.recent(int(limit))
+    if docs is None:
+        # leitura lean: projeção derivada de FocusItem (sem `properties`)
+        docs = await repo.recent(int(limit), projection=FOCUS_PROJECTION)
+    return _list_response(docs, format)
 
 @router.get(
     "/find",
     summary="Find focus documents by filters",
-    response_model=FocusListResponse,
+    response_model=Union[FocusListResponse, GeoJSONFeatureCollection],
     responses={200: {"description": "Filtered documents returned"}}
 )
 async def find(
-    repo: RepoDep,
+    repo: ReadRepoDep,
+    primary: RepoDep,
     q: Annotated[QueryParams, Depends()]
 ):
     """
     Busca com filtros (temporais, atributos, geoespacial), paginação e formato.
+    Consultas com `start` dentro da janela quente são servidas do snapshot em memória.
     Ex.: /data/find?start=2025-10-02&end=2025-10-04&estado=Piauí&limit=50
          /data/find?near_lon=-42.5&near_lat=-7.76&near_km=25
          /data/find?bbox=-43.0,-8.0,-42.0,-7.5&format=geojson
     """
-    flt: dict = {}
-    if q.satelite: flt["satelite"] = q.satelite
-    if q.estado: flt["estado"] = q.estado
-    if q.municipio: flt["municipio"] = q.municipio
-    if q.bioma: flt["bioma"] = q.bioma
-    if q.start or q.end:
-        rng = {}
-        if q.start: rng["$gte"] = q.start
-        if q.end: rng["$lte"] = q.end
-        flt["data_hora_gmt"] = rng
+    # covers() antes da carga: consulta histórica não espera (nem recarrega) o snapshot.
+    # A janela só avança numa recarga, então a checagem repete depois dela.
+    if hot_snapshot.covers(q) and await hot_snapshot.ensure_loaded(primary) and hot_snapshot.covers(q):
+        return _list_response(hot_snapshot.find(q, limit=q.limit, skip=q.skip), q.format)
+
+    flt = build_filter(q)
+    docs = await repo.find(flt, limit=q.limit, skip=q.skip, sort=_sort_of(q), projection=FOCUS_PROJECTION)
+    return _list_response(docs, q.format)
 
-    sort = [("data_hora_gmt", -1 if q.sort.startswith("-") else 1)]
-    items = await repo.find(flt, limit=q.limit, skip=q.skip, sort=sort)
-    total = len(items)  # simplificação (poderia contar real)
-    
-    return FocusListResponse(total=total, returned=len(items), items=items)
\ No newline at end of file
+@router.get(
+    "/density",
+    summary="Detection counts and FRP sums per grid cell",
+    response_model=DensityResponse,
+    responses={200: {"description": "Grid cells aggregated"}},
+)
+async def density(
+    repo: ReadRepoDep,
+    q: Annotated[DensityParams, Depends()],
+    response: Response,
+):
+    """
+    Heatmap: agrega focos por célula de grade fixa (em graus) dentro de bbox/janela.
+    O `$group` usa a chave `grid.<res>` gravada na ingestão (índice data+célula+frp).
+    Ex.: /data/density?res=0.25&bbox=-60,-15,-45,-2&start=2025-09-01&end=2025-09-30
+    """
+    if q.res not in settings.grid_resolutions:
+        raise HTTPException(
+            status_code=422,
+            detail=f"res must be one of {settings.grid_resolutions}",
+        )
+    response.headers["Cache-Control"] = f"public, max-age={int(settings.density_cache_ttl)}"
+
+    key = (q.res, q.bbox, q.start, q.end, q.satelite, q.estado, q.bioma)
+    cached = _density_cache.get(key)
+    if cached is not None:
+        return cached
+
+    rows = await repo.agg_grid(build_filter(q), res_key(q.res))
+    cells = [
+        DensityCell(
+            cell=r["cell"],
+            bbox=list(cell_bounds(r["cell"], q.res)),
+            count=r["count"],
+            frp_sum=r.get("frp_sum") or 0.0,
+        )
+        for r in rows
+    ]
+    cells.sort(key=lambda c: c.count, reverse=True)
+    out = DensityResponse(resolution=q.res, total=sum(c.count for c in cells), cells=cells)
+    _density_cache.set(key, out)
+    return out
+
+@router.get(
+    "/timeseries",
+    summary="Detection counts per hour/day/week, optionally grouped",
+    response_model=TimeSeriesResponse,
+    responses={200: {"description": "Time series aggregated"}},
+)
+async def timeseries(
+    repo: ReadRepoDep,
+    primary: RepoDep,
+    q: Annotated[TimeSeriesParams, Depends()],
+):
+    """
+    Série temporal (contagem e soma de FRP) por bucket, com group-by opcional
+    por satelite/estado/bioma, numa única agregação sobre o índice de data.
+    Buckets fechados vêm de cache; só o bucket corrente é recalculado.
+    Ex.: /data/timeseries?interval=day&group_by=estado&start=2025-09-01&end=2025-09-30
+    """
+    filters = {f: getattr(q, f) for f in ("satelite", "estado", "bioma") if getattr(q, f)}
+    try:
+        dims = q.dims()
+        rows = await run_timeseries(
+            repo, interval=q.interval, group_by=dims, filters=filters, start=q.start, end=q.end,
+            cache_repo=primary,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    points = [
+        TimeSeriesPoint(
+            bucket=r["bucket"],
+            group={d: r.get(d) for d in dims},
+            count=r["count"],
+            frp_sum=r.get("frp_sum") or 0.0,
+        )
+        for r in rows
+    ]
+    return TimeSeriesResponse(interval=q.interval, group_by=dims, points=points)
+
+@router.get(
+    "/export",
+    summary="Stream filtered focus documents (NDJSON, GeoJSON or CSV)",
+    responses={200: {
+        "description": "Streamed export",
+        "content": {mt: {} for mt in MEDIA_TYPES.values()},
+    }},
+)
+async def export(
+    repo: ReadRepoDep,
+    q: Annotated[ExportParams, Depends()],
+):
+    """
+    Exporta o resultado inteiro de um filtro direto do cursor Mongo (sem `to_list`),
+    em blocos de EXPORT_CHUNK_ROWS linhas; memória constante seja qual for o volume.
+    Ex.: /data/export?estado=PARÁ&start=2025-09-01&end=2025-09-30&format=csv
+         /data/export?bbox=-55,-12,-45,-2&format=geojson
+    """
+    flt = build_filter(q)
+    cursor = repo.iter_find(
+        flt,
+        _sort_of(q),
+        limit=q.limit or 0,
+        skip=q.skip,
+        projection=FOCUS_PROJECTION,
+        batch_size=settings.export_batch_size,
+    )
+
+    async def _counted(docs: AsyncIterator[Mapping[str, Any]]) -> AsyncIterator[Mapping[str, Any]]:
+        rows = 0
+        try:
+            async for d in docs:
+                rows += 1
+                yield d
+        finally:
+            log.info("data.export.done", format=q.format, rows=rows)
+
+    body = ENCODERS[q.format](_counted(cursor), rows_per_chunk=settings.export_chunk_rows)
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[q.format],
+        headers={"Content-Disposition": f'attachment; filename="focos.{q.format}"'},
+    )
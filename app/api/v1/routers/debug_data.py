@@ -1,13 +1,16 @@
 # app/api/v1/routers/debug_data.py
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import PlainTextResponse
 from pymongo import UpdateOne
+from typing import Annotated, Literal, Optional
 import httpx, re
 
 from ....core.logging_config import get_logger
 from ....core.db import get_mongo as _get_mongo_original
 from ....models.schemas import WFSSchemaResponse
 from ....core.config import settings
-from ....services.inpe_client_old import BASE, SERVICE
+from ....core.mongo_monitor import command_monitor
+from ....core.profiler import profile_store
 
 log = get_logger()
 
@@ -93,7 +96,7 @@ async def wfs_schema():
     Útil para descobrir campos válidos para filtros/ordenção (sortBy).
     """
     # DescribeFeatureType: WFS 2.0 usa 'typeNames'
-    url = f"{BASE}{SERVICE}?service=WFS&version=2.0.0&request=DescribeFeatureType&typeNames={settings.wfs_typename}"
+    url = f"{settings.wfs_base}{settings.wfs_service_path}?service=WFS&version=2.0.0&request=DescribeFeatureType&typeNames={settings.wfs_typename}"
     async with httpx.AsyncClient(timeout=60) as client:
         r = await client.get(url)
         # Em alguns servidores, o retorno é XML/XSD (texto)
@@ -110,4 +113,57 @@ async def wfs_schema():
 
     log.info("wfs.schema_attrs", count=len(attrs))
     # devolve só um pedaço do XSD pra não pesar
-    return {"typeNames": settings.wfs_typename, "attr_count": len(attrs), "attributes": attrs[:200], "xsd_snippet": xsd[:1500]}
\ No newline at end of file
+    return {"typeNames": settings.wfs_typename, "attr_count": len(attrs), "attributes": attrs[:200], "xsd_snippet": xsd[:1500]}
+@router.get(
+    "/mongo-ops",
+    summary="Formatos de consulta Mongo mais caros e comandos lentos recentes",
+)
+async def mongo_ops(
+    top: Annotated[int, Query(gt=0, le=200)] = 20,
+    by: Annotated[Literal["total_ms", "max_ms", "avg_ms", "slow"], Query()] = "total_ms",
+    request_id: Annotated[Optional[str], Query(description="Filtra os lentos por x-request-id")] = None,
+    slow_limit: Annotated[int, Query(gt=0, le=200)] = 50,
+):
+    """
+    Top-N de formatos normalizados (valores trocados por "?") com contagem,
+    latência média/máxima e docs devolvidos, mais os últimos comandos acima de
+    MONGO_SLOW_MS com o `request_id` de origem. Os agregados por formato são
+    amostrados (MONGO_MONITOR_SAMPLE_RATE); os lentos entram todos.
+    """
+    return {
+        "enabled": settings.mongo_monitor_enabled,
+        "sample_rate": command_monitor.sample_rate,
+        "slow_ms": command_monitor.slow_ms,
+        "shapes": command_monitor.top(top, by=by),
+        "slow_ops": command_monitor.slow_ops(request_id=request_id, limit=slow_limit),
+    }
+
+@router.delete("/mongo-ops", summary="Zera os agregados do monitor de comandos Mongo")
+async def mongo_ops_reset():
+    command_monitor.reset()
+    return {"ok": True}
+
+@router.get("/profiles", summary="Perfis de requisição guardados (mais recentes primeiro)")
+async def list_profiles():
+    return {"items": profile_store.list()}
+
+@router.get(
+    "/profiles/{profile_id}",
+    summary="Resumo de um perfil (ou formato collapsed para flamegraph)",
+    responses={404: {"description": "Perfil não encontrado (expirado ou id inválido)"}},
+)
+async def get_profile(
+    profile_id: str,
+    format: Annotated[Literal["json", "collapsed"], Query()] = "json",
+    top: Annotated[int, Query(gt=0, le=200)] = 20,
+):
+    """
+    `profile_id` = `x-profile-id` da resposta perfilada (o `request_id`).
+    `format=collapsed` devolve `pilha;...;folha N` por linha (flamegraph.pl, speedscope).
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="profile not found")
+    if format == "collapsed":
+        return PlainTextResponse(profile.collapsed())
+    return profile.summary(top=top)
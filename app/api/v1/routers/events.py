@@ -0,0 +1,88 @@
+# app/routers/events.py
+from __future__ import annotations
+from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Annotated, Any, Dict, Literal, Union
+
+from ....models.schemas import (
+    EventParams, FireEventItem, FireEventListResponse,
+    FocusListResponse, GeoJSONFeatureCollection,
+)
+from ....core.deps import EventRepoDep, ReadRepoDep
+from ....repositories.mongo_repo import FOCUS_PROJECTION
+from ....services import clustering  # noqa: F401  (registra o gancho de agrupamento na ingestão)
+from ....utils.geo import parse_bbox, within_bbox
+from .data import _list_response
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+def build_event_filter(q: EventParams) -> Dict[str, Any]:
+    """Eventos ativos em [start, end] (sobreposição de janelas) + atributos/bbox do centróide."""
+    flt: Dict[str, Any] = {}
+    if q.start:
+        flt["last_seen"] = {"$gte": q.start}
+    if q.end:
+        flt["first_seen"] = {"$lte": q.end if "T" in q.end else f"{q.end}T23:59:59Z"}
+    for field in ("estado", "bioma"):
+        value = getattr(q, field)
+        if value:
+            flt[field] = value
+    if q.satelite:
+        flt["satelites"] = q.satelite
+    if q.min_count:
+        flt["count"] = {"$gte": q.min_count}
+    if q.min_frp is not None:
+        flt["frp_max"] = {"$gte": q.min_frp}
+    if q.bbox:
+        flt["centroid"] = within_bbox(parse_bbox(q.bbox))
+    return flt
+
+@router.get(
+    "",
+    summary="List fire events",
+    response_model=FireEventListResponse,
+    responses={200: {"description": "Events returned"}, 503: {"description": "Events require REPO_BACKEND=mongo"}},
+)
+async def list_events(events: EventRepoDep, q: EventParams = Depends()):
+    """
+    Eventos de fogo (focos agrupados por vizinhança espacial e temporal),
+    com centróide, extensão, first/last seen, FRP máximo e número de focos.
+    """
+    field = q.sort.lstrip("-")
+    docs = await events.find(
+        build_event_filter(q), limit=q.limit, skip=q.skip,
+        sort=[(field, -1 if q.sort.startswith("-") else 1)],
+    )
+    items = [FireEventItem(**d) for d in docs]
+    return FireEventListResponse(total=len(items), returned=len(items), items=items)
+
+@router.get(
+    "/{event_id}",
+    summary="Get a fire event",
+    response_model=FireEventItem,
+    responses={404: {"description": "Event not found"}, 503: {"description": "Events require REPO_BACKEND=mongo"}},
+)
+async def get_event(events: EventRepoDep, event_id: str):
+    doc = await events.get(event_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="event not found")
+    return FireEventItem(**doc)
+
+@router.get(
+    "/{event_id}/detections",
+    summary="Detections of a fire event",
+    response_model=Union[FocusListResponse, GeoJSONFeatureCollection],
+    responses={200: {"description": "Focus documents of the event"}},
+)
+async def event_detections(
+    repo: ReadRepoDep,
+    event_id: str,
+    limit: Annotated[int, Query(gt=0, le=1000)] = 1000,
+    skip: Annotated[int, Query(ge=0)] = 0,
+    format: Annotated[Literal["json", "geojson"], Query()] = "json",
+):
+    """Focos atribuídos ao evento (`event_id`), ordenados por data."""
+    docs = await repo.find(
+        {"event_id": event_id}, limit=limit, skip=skip,
+        sort=[("data_hora_gmt", 1)], projection=FOCUS_PROJECTION,
+    )
+    return _list_response(docs, format)
@@ -1,5 +1,10 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import JSONResponse, Response
 
+from ....core.bootstrap import readiness
+from ....core.config import settings
+from ....core.metrics import REGISTRY
+from ....utils.metrics import CONTENT_TYPE
 # from ....models import HealthResponse
 
 router = APIRouter(prefix="/health", tags=["Health"])
@@ -12,7 +17,41 @@ router = APIRouter(prefix="/health", tags=["Health"])
 )
 async def health():
     """
-    Healthcheck básico (sempre ok=True). Para checks profundos,
-    acrescente validação de conexão ao Mongo/WFS.
+    Liveness: o processo responde (sempre ok=True). Para decidir se a
+    instância recebe tráfego use /health/ready.
     """
     return {"ok": True}
+
+@router.get(
+    "/ready",
+    summary="Readiness (bootstrap concluído)",
+    responses={
+        200: {"description": "Pronta: dependências críticas conectadas e aquecidas"},
+        503: {"description": "Ainda em bootstrap ou dependência crítica indisponível"},
+    },
+)
+async def ready():
+    """
+    Prontidão por dependência (mongo_write, mongo_read, pool_warmup, hot_snapshot,
+    wfs), com tempo de cada etapa do bootstrap. 503 enquanto uma etapa crítica
+    não concluir, para o balanceador só rotear para instâncias aquecidas.
+    """
+    if not settings.bootstrap_enabled:
+        return {"ready": True, "bootstrap": "disabled"}
+    body = readiness.as_dict()
+    return JSONResponse(body, status_code=200 if body["ready"] else 503)
+
+@router.get(
+    "/metrics",
+    summary="Prometheus metrics",
+    response_class=Response,
+    responses={200: {"description": "Exposition format 0.0.4", "content": {"text/plain": {}}}},
+)
+async def metrics():
+    """
+    Métricas no formato texto do Prometheus: WFS (latência, bytes/features por
+    página, retries, breaker), bulk writes, etapas da ingestão e latência por rota.
+    """
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=404, detail="metrics disabled")
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,15 +1,26 @@
 # app/api/v1/routers/ingest.py
 from __future__ import annotations
-from fastapi import APIRouter, Depends, Query
-from typing import Annotated, Any, Dict
+from dataclasses import asdict
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import JSONResponse
+from concurrent.futures import BrokenExecutor, Executor
+from typing import Annotated, Any, AsyncIterator, Dict, List, Optional
 from time import perf_counter
 from datetime import datetime, timedelta, timezone
 
 from ....core.config import settings
-from ....models.schemas import IngestResponse
+from ....models.schemas import IngestJob, IngestJobList, IngestResponse, LayerInfo, LayersIngestResponse
 from ....core.deps import RepoDep, FireDep            # , SessionDep # get_mongo, 
 from ....core.logging_config import get_logger
+from ....core.metrics import INGEST_DOCS, INGEST_RUNS, INGEST_STAGE_SECONDS
+from ....services.ingest_events import publish_batch
+from ....services.jobs import JobProgress, QueueFull, job_manager
+from ....services.layers import LayerSpec, layer_runner
+from ....services.protocols import Repository
+from ....services.transform_pool import close_transform_pool, transform_pool, transform_workers
 from ....utils.time_windows import iso_date, window_from_last
+from ....utils.features import doc_from_feature, docs_from_page
+from ....utils.procpool import ordered_amap
 
 # from ....services.inpe_client_old import iter_wfs_48h, iter_wfs
 # from ....repositories import fires_repo_old
@@ -19,69 +30,190 @@ from ....utils.time_windows import iso_date, window_from_last
 router = APIRouter(prefix="/ingest", tags=["Ingestion"])
 log = get_logger()
 
+BackgroundQ = Annotated[bool, Query(description="Enfileira um job e responde 202 com o id (progresso em /jobs/{id})")]
+_JOB_RESPONSES: Dict[int | str, Dict[str, Any]] = {
+    202: {"description": "Job enqueued (background=true)", "model": IngestJob},
+    503: {"description": "Background jobs disabled or queue full"},
+}
+
+def _hist_spec(name: str, **kwargs: Any) -> LayerSpec:
+    """Camada `range` equivalente a /ingest/initial e /incremental (fatias = checkpoints do job)."""
+    return LayerSpec(
+        name=name,
+        typename=settings.wfs_typename_hist or settings.wfs_typename,
+        mode="range",
+        chunk_days=settings.jobs_chunk_days,
+        **kwargs,
+    )
+
+async def _enqueue(kind: str, specs: List[LayerSpec], **kwargs: Any) -> List[Dict[str, Any]]:
+    if not await job_manager.ensure_started():
+        raise HTTPException(status_code=503, detail="background jobs disabled (JOBS_ENABLED)")
+    try:
+        jobs = [await job_manager.submit(kind, spec, **kwargs) for spec in specs]
+    except QueueFull as exc:
+        raise HTTPException(status_code=503, detail=f"job queue full: {exc}")
+    return [IngestJob.model_validate(job.to_doc()).model_dump(mode="json") for job in jobs]
+
 def _doc_from_feature(feat: Dict[str, Any]) -> Dict[str, Any]:
     """
     Converte um Feature (GeoJSON do WFS) para o documento que salvamos no Mongo.
-    Mantém o mesmo shape usado no /ingest/48h.
+    Mantém o mesmo shape usado no /ingest/48h (ver utils/features.py).
+    """
+    return doc_from_feature(feat, settings.grid_resolutions)
+
+async def _pooled_docs(
+    feats: AsyncIterator[Dict[str, Any]],
+    executor: Executor,
+    stages: Dict[str, float],
+    progress: Optional[JobProgress],
+) -> AsyncIterator[list[dict]]:
+    """
+    Documentos por página, convertidos no pool (TRANSFORM_EXECUTOR), na ordem
+    das features. `fetch` é a espera pela fonte; `transform`, a espera pelo
+    pool além dela (a conversão das páginas seguintes corre em paralelo).
+    """
+    page_size = settings.transform_page_size or settings.wfs_page_size
+    resolutions = list(settings.grid_resolutions)
+
+    async def pages() -> AsyncIterator[tuple]:
+        page: list[dict] = []
+        t = perf_counter()
+        async for feat in feats:
+            page.append(feat)
+            if len(page) >= page_size:
+                stages["fetch"] += perf_counter() - t
+                if progress is not None:
+                    progress.fetched += len(page)
+                yield page, resolutions
+                page = []
+                t = perf_counter()
+        stages["fetch"] += perf_counter() - t
+        if page:
+            if progress is not None:
+                progress.fetched += len(page)
+            yield page, resolutions
+
+    t, fetched = perf_counter(), stages["fetch"]
+    try:
+        async for docs in ordered_amap(docs_from_page, pages(), executor=executor, max_inflight=transform_workers() * 2):
+            stages["transform"] += perf_counter() - t - (stages["fetch"] - fetched)
+            yield docs
+            t, fetched = perf_counter(), stages["fetch"]
+    except BrokenExecutor:
+        close_transform_pool(executor)      # esta ingestão falha; a próxima recria o pool
+        raise
+
+async def _write_batch(
+    repo: Repository,
+    batch: list[dict],
+    stages: Optional[Dict[str, float]] = None,
+    *,
+    publish: bool = True,
+    progress: Optional[JobProgress] = None,
+) -> int:
+    """Grava o lote e notifica os ganchos pós-escrita (caches derivados)."""
+    t0 = perf_counter()
+    written = await repo.upsert_many(batch)
+    t1 = perf_counter()
+    if publish:
+        await publish_batch(batch)
+    if stages is not None:
+        stages["write"] += t1 - t0
+        stages["hooks"] += perf_counter() - t1
+    if progress is not None:
+        progress.written += len(batch)
+        progress.upserted += written
+    return written
+
+async def _ingest_features(
+    repo: Repository,
+    feats: AsyncIterator[Dict[str, Any]],
+    mode: str,
+    *,
+    dry_run: bool = False,
+    batch_size: int = 2000,
+    publish: bool = True,
+    progress: Optional[JobProgress] = None,
+) -> int:
     """
-    props = feat.get("properties") or {}
-    geom = feat.get("geometry")
-    
-    doc_id = props.get("foco_id") or props.get("id_foco_bdq") or feat.get("id")
-    if not doc_id:
-        # sem identificador estável, descartamos o registro
-        return {}
-    return {
-        "_id": doc_id,
-        "id": doc_id,
-        "properties": props,
-        "geometry": geom,
-        "data_hora_gmt": props.get("data_hora_gmt"),
-        "longitude": props.get("longitude"),
-        "latitude": props.get("latitude"),
-        "satelite": props.get("satelite"),
-        "municipio": props.get("municipio"),
-        "estado": props.get("estado"),
-        "pais": props.get("pais"),
-        "bioma": props.get("bioma"),
-        "frp": props.get("frp"),
-    }
+    Consome o iterador de features em lotes e grava. Acumula o tempo por etapa
+    (fetch = espera pelo WFS, transform, write, hooks) e publica nas métricas.
+    `publish=False` não chama os ganchos pós-escrita (coleção que não é a
+    principal: caches e snapshot derivam só de MONGODB_COLLECTION).
+    `progress` (jobs em segundo plano) recebe os contadores ao vivo. Com
+    TRANSFORM_EXECUTOR=thread|process a conversão sai do event loop, por página.
+    """
+    stages = {"fetch": 0.0, "transform": 0.0, "write": 0.0, "hooks": 0.0}
+    total = 0
+    status = "error"
+    batch: list[dict] = []
+    executor = transform_pool()
+    try:
+        if executor is not None:
+            async for docs in _pooled_docs(feats, executor, stages, progress):
+                batch.extend(docs)
+                if len(batch) >= batch_size:
+                    if not dry_run:
+                        total += await _write_batch(repo, batch, stages, publish=publish, progress=progress)
+                    batch = []
+        else:
+            t = perf_counter()
+            async for feat in feats:
+                t1 = perf_counter()
+                stages["fetch"] += t1 - t
+                if progress is not None:
+                    progress.fetched += 1
+                doc = _doc_from_feature(feat)
+                if doc:
+                    batch.append(doc)
+                t = perf_counter()
+                stages["transform"] += t - t1
+                if len(batch) >= batch_size:
+                    if not dry_run:
+                        total += await _write_batch(repo, batch, stages, publish=publish, progress=progress)
+                    batch.clear()
+                    t = perf_counter()
+        if batch and not dry_run:
+            total += await _write_batch(repo, batch, stages, publish=publish, progress=progress)
+        status = "ok"
+    finally:
+        for stage, secs in stages.items():
+            INGEST_STAGE_SECONDS.labels(mode, stage).observe(secs)
+        INGEST_RUNS.labels(mode, status).inc()
+        INGEST_DOCS.labels(mode).inc(total)
+    return total
 
 @router.post(
     "/initial",
     summary="Ingest a fixed initial date window",
     response_model=IngestResponse,
-    responses={200: {"description": "Ingestion completed"}},
+    responses={200: {"description": "Ingestion completed"}, **_JOB_RESPONSES},
 )
 async def run_initial_ingest(
     repo: RepoDep,
     source: FireDep,
+    background: BackgroundQ = False,
 ) -> IngestResponse:
     """
     Ingere o intervalo inicial [INITIAL_START, INITIAL_END] usando a fonte configurada.
     Implementação nova usando DI:
     - `source` (FireSource) provê `iter_range(start, end)`
     - `repo` (Repository) executa `upsert_many(docs)`
+    Com `background=true` vira job (fatias de JOBS_CHUNK_DAYS, retomável).
     """
     start = settings.initial_start
     end = settings.initial_end
+    if background:
+        (job,) = await _enqueue("initial", [_hist_spec("initial")], start=start, end=end)
+        return JSONResponse(status_code=202, content=job)
 
-    total = 0
-    batch: list[dict] = []
     t0 = perf_counter()
 
     # async for feat in source.iter_range(start, end):
-    async for feat in source.iter_range(start, end, typename=settings.wfs_typename_hist):
-        doc = _doc_from_feature(feat)
-        if not doc:
-            continue
-        batch.append(doc)
-        if len(batch) >= 2000:
-            total += await repo.upsert_many(batch)
-            batch.clear()
-
-    if batch:
-        total += await repo.upsert_many(batch)
+    total = await _ingest_features(
+        repo, source.iter_range(start, end, typename=settings.wfs_typename_hist), "initial",
+    )
 
     dt = int((perf_counter() - t0) * 1000)
     log.info("ingest.initial.done", total_upserted=total, range=[start, end], duration_ms=dt)
@@ -99,17 +231,22 @@ async def run_initial_ingest(
     "/incremental",
     summary="Ingest an incremental time window since last known date",
     response_model=IngestResponse,
-    responses={200: {"description": "Incremental ingestion completed"}},
+    responses={200: {"description": "Incremental ingestion completed"}, **_JOB_RESPONSES},
 )
 async def run_incremental(
     repo: RepoDep,
     source: FireDep,
     days: Annotated[int, Query(gt=0, le=90, description="Janela (dias) caso não exista 'last_seen'")] = 7,
+    background: BackgroundQ = False,
 ) -> IngestResponse:
     """
     Ingere janela incremental a partir da última data conhecida no banco (campo `data_hora_gmt`).
-    Se não houver `last_seen`, recua `days` dias a partir de agora.
+    Se não houver `last_seen`, recua `days` dias a partir de agora. Em `background`
+    a janela é calculada quando o job começa a rodar.
     """
+    if background:
+        (job,) = await _enqueue("incremental", [_hist_spec("incremental", lookback_days=days)])
+        return JSONResponse(status_code=202, content=job)
     # Busca a última data persistida já no shape novo
     # last_seen = await repo.max_date("data_hora_gmt")
     # last_seen só para retorno/diagnóstico
@@ -122,22 +259,12 @@ async def run_incremental(
 
     start, end = window_from_last(last_seen, days=days)
 
-    total = 0
-    batch: list[dict] = []
     t0 = perf_counter()
 
     # async for feat in source.iter_range(start, end):
-    async for feat in source.iter_range(start, end, typename=settings.wfs_typename_hist):
-        doc = _doc_from_feature(feat)
-        if not doc:
-            continue
-        batch.append(doc)
-        if len(batch) >= 2000:
-            total += await repo.upsert_many(batch)
-            batch.clear()
-
-    if batch:
-        total += await repo.upsert_many(batch)
+    total = await _ingest_features(
+        repo, source.iter_range(start, end, typename=settings.wfs_typename_hist), "incremental",
+    )
 
     dt = int((perf_counter() - t0) * 1000)
     log.info(
@@ -166,6 +293,7 @@ async def run_incremental(
     responses={
         200: {"description": "Ingestion completed", "model": IngestResponse},
         500: {"description": "Unexpected error"},
+        **_JOB_RESPONSES,
     },
 )
 async def ingest_48h(
@@ -173,26 +301,17 @@ async def ingest_48h(
     source: FireDep,
     # session: SessionDep,  # exemplo de Depends custom
     dry_run: Annotated[bool, Query(description="Do not write to DB")] = False,
+    background: BackgroundQ = False,
 ) -> IngestResult:
     """
     Ingere/atualiza a janela 48h (camada 48h já recortada no servidor).
     """
+    if background:
+        spec = LayerSpec(name="48h", typename=settings.wfs_typename, mode="48h")
+        (job,) = await _enqueue("48h", [spec], dry_run=dry_run)
+        return JSONResponse(status_code=202, content=job)
     t0 = perf_counter()
-    total = 0
-    batch: list[dict] = []
-
-    async for feat in source.iter_48h():
-        doc = _doc_from_feature(feat)
-        if not doc:
-            continue
-        batch.append(doc)
-        if len(batch) >= 2000:
-            if not dry_run:
-                total += await repo.upsert_many(batch)
-            batch.clear()
-
-    if batch and not dry_run:
-        total += await repo.upsert_many(batch)
+    total = await _ingest_features(repo, source.iter_48h(), "48h", dry_run=dry_run)
 
     dt = int((perf_counter() - t0) * 1000)
     log.info("ingest.done", layer=settings.wfs_typename, total=total, duration_ms=dt)
@@ -202,4 +321,56 @@ async def ingest_48h(
         layer=settings.wfs_typename,
         total_upserted=total,
         duration_ms=dt,
-    )
\ No newline at end of file
+    )
+
+@router.get(
+    "/layers",
+    summary="List the configured WFS layers",
+    response_model=List[LayerInfo],
+)
+async def list_layers() -> List[LayerInfo]:
+    """Registro de camadas (WFS_LAYERS) com o resultado da última sincronização de cada uma."""
+    return [
+        LayerInfo(**asdict(spec), last=asdict(layer_runner.last[name]) if name in layer_runner.last else None)
+        for name, spec in layer_runner.layers.items()
+    ]
+
+@router.post(
+    "/layers",
+    summary="Sync several WFS layers concurrently",
+    response_model=LayersIngestResponse,
+    responses={
+        404: {"description": "Unknown layer"},
+        202: {"description": "One job per layer enqueued (background=true)", "model": IngestJobList},
+        503: _JOB_RESPONSES[503],
+    },
+)
+async def ingest_layers(
+    layer: Annotated[Optional[List[str]], Query(description="Camada(s) do registro; vazio = todas as habilitadas")] = None,
+    start: Annotated[Optional[str], Query(pattern=r"^\d{4}-\d{2}-\d{2}$", description="Início (camadas 'range'); padrão: último foco gravado")] = None,
+    end: Annotated[Optional[str], Query(pattern=r"^\d{4}-\d{2}-\d{2}$", description="Fim (camadas 'range'); padrão: hoje")] = None,
+    dry_run: Annotated[bool, Query(description="Do not write to DB")] = False,
+    background: BackgroundQ = False,
+) -> LayersIngestResponse:
+    """
+    Sincroniza as camadas em paralelo (pool HTTP compartilhado, concorrência
+    por camada do registro). Falha de uma camada não interrompe as outras:
+    cada uma volta com o próprio `status`. `background=true` enfileira um
+    job por camada.
+    """
+    try:
+        specs = layer_runner.select(layer)
+    except KeyError as exc:
+        raise HTTPException(status_code=404, detail=f"unknown layer: {exc.args[0]}")
+    if background:
+        jobs = await _enqueue("layer", specs, start=start, end=end, dry_run=dry_run)
+        return JSONResponse(status_code=202, content={"returned": len(jobs), "items": jobs})
+    t0 = perf_counter()
+    results = await layer_runner.run(layer, start=start, end=end, dry_run=dry_run)
+    failed = sum(r.status == "error" for r in results)
+    return LayersIngestResponse(
+        status="ok" if not failed else ("error" if failed == len(results) else "partial"),
+        total_upserted=sum(r.total_upserted for r in results),
+        duration_ms=int((perf_counter() - t0) * 1000),
+        results=[asdict(r) for r in results],
+    )
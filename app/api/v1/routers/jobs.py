@@ -0,0 +1,62 @@
+# app/api/v1/routers/jobs.py
+from __future__ import annotations
+from fastapi import APIRouter, HTTPException, Query
+from typing import Annotated, Any, Dict, Literal, Optional
+
+from ....models.schemas import IngestJob, IngestJobList
+from ....services.jobs import job_manager
+
+router = APIRouter(prefix="/jobs", tags=["Jobs"])
+
+async def _require_jobs() -> None:
+    if not await job_manager.ensure_started():
+        raise HTTPException(status_code=503, detail="background jobs disabled (JOBS_ENABLED)")
+
+@router.get(
+    "",
+    summary="List background ingestion jobs (most recent first)",
+    response_model=IngestJobList,
+    response_model_by_alias=False,
+    responses={503: {"description": "Background jobs disabled"}},
+)
+async def list_jobs(
+    status: Optional[Literal["queued", "running", "ok", "error", "cancelled"]] = None,
+    kind: Optional[Literal["initial", "incremental", "48h", "layer"]] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+    skip: Annotated[int, Query(ge=0)] = 0,
+) -> Dict[str, Any]:
+    await _require_jobs()
+    items = await job_manager.find(status, kind, limit=limit, skip=skip)
+    return {"returned": len(items), "items": items}
+
+@router.get(
+    "/{job_id}",
+    summary="Job state with live progress (features fetched/written, rate, ETA) and result",
+    response_model=IngestJob,
+    response_model_by_alias=False,
+    responses={404: {"description": "Job not found"}, 503: {"description": "Background jobs disabled"}},
+)
+async def get_job(job_id: str) -> Dict[str, Any]:
+    await _require_jobs()
+    doc = await job_manager.get(job_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return doc
+
+@router.delete(
+    "/{job_id}",
+    summary="Cancel a queued or running job",
+    response_model=IngestJob,
+    response_model_by_alias=False,
+    responses={404: {"description": "Job not found"}, 503: {"description": "Background jobs disabled"}},
+)
+async def cancel_job(job_id: str) -> Dict[str, Any]:
+    """
+    Job na fila sai dela; job rodando é interrompido entre features (o que já
+    foi gravado fica). Job já terminado volta como está.
+    """
+    await _require_jobs()
+    doc = await job_manager.cancel(job_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return doc
@@ -0,0 +1,76 @@
+# app/api/v1/routers/reconcile.py
+from __future__ import annotations
+from fastapi import APIRouter, HTTPException, Query
+from typing import Annotated, Any, Dict, Literal, Optional
+
+from ....core.deps import ReportsRepoDep
+from ....models.schemas import ReconcileReport, ReconcileReportList
+from ....services.layers import layer_runner
+from ....services.reconcile import Reconciler, default_range
+
+router = APIRouter(prefix="/reconcile", tags=["Reconciliation"])
+
+_DATE = r"^\d{4}-\d{2}-\d{2}$"
+
+@router.post(
+    "",
+    summary="Compare WFS and Mongo counts per window and re-ingest only the mismatched ones",
+    response_model=ReconcileReport,
+    response_model_by_alias=False,
+    responses={404: {"description": "Unknown layer"}},
+)
+async def reconcile(
+    reports: ReportsRepoDep,
+    layer: Annotated[str, Query(description="Camada do registro (WFS_LAYERS)")] = "incremental",
+    start: Annotated[Optional[str], Query(pattern=_DATE, description="Padrão: hoje - RECONCILE_DAYS")] = None,
+    end: Annotated[Optional[str], Query(pattern=_DATE, description="Padrão: hoje")] = None,
+    granularity: Annotated[Literal["day", "hour"], Query()] = "day",
+    refine: Annotated[bool, Query(description="Dias divergentes são refinados por hora antes de reingerir")] = True,
+    repair: Annotated[bool, Query(description="false = só relatório, sem reingestão")] = True,
+) -> Dict[str, Any]:
+    """
+    Contagem por janela na fonte (`resultType=hits`) x Mongo (`count_documents`
+    indexado); reingestão paralela só das janelas com menos documentos no
+    Mongo. O relatório fica gravado e aparece em `/reconcile/reports`.
+    """
+    if layer not in layer_runner.layers:
+        raise HTTPException(status_code=404, detail=f"unknown layer: {layer}")
+    default_start, default_end = default_range()
+    return await Reconciler(layer_runner, reports).run(
+        layer, start or default_start, end or default_end,
+        granularity=granularity, refine=refine, repair=repair,
+    )
+
+@router.get(
+    "/reports",
+    summary="List reconciliation reports (most recent first)",
+    response_model=ReconcileReportList,
+    response_model_by_alias=False,
+)
+async def list_reports(
+    reports: ReportsRepoDep,
+    layer: Optional[str] = None,
+    status: Optional[Literal["ok", "repaired", "drift", "skipped", "error"]] = None,
+    limit: Annotated[int, Query(ge=1, le=200)] = 20,
+    skip: Annotated[int, Query(ge=0)] = 0,
+) -> Dict[str, Any]:
+    flt: Dict[str, Any] = {}
+    if layer:
+        flt["layer"] = layer
+    if status:
+        flt["status"] = status
+    items = await reports.find(flt, limit=limit, skip=skip)
+    return {"returned": len(items), "items": items}
+
+@router.get(
+    "/reports/{report_id}",
+    summary="Reconciliation report with the drifted windows",
+    response_model=ReconcileReport,
+    response_model_by_alias=False,
+    responses={404: {"description": "Report not found"}},
+)
+async def get_report(report_id: str, reports: ReportsRepoDep) -> Dict[str, Any]:
+    doc = await reports.get(report_id)
+    if doc is None:
+        raise HTTPException(status_code=404, detail="report not found")
+    return doc
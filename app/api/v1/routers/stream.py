@@ -0,0 +1,108 @@
+# app/routers/stream.py
+from __future__ import annotations
+from fastapi import APIRouter, HTTPException, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import StreamingResponse
+from typing import Annotated, AsyncIterator, Optional
+
+from ....core.config import settings
+from ....core.logging_config import get_logger
+from ....services.push import PushFilter, broadcaster
+from ....utils.geo import parse_bbox
+
+router = APIRouter(prefix="/stream", tags=["Stream"])
+log = get_logger()
+
+def _push_filter(bbox: Optional[str], estado: Optional[str], satelite: Optional[str]) -> PushFilter:
+    try:
+        box = parse_bbox(bbox) if bbox else None
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
+    return PushFilter(bbox=box, estado=estado, satelite=satelite)
+
+def _array(payloads: list[bytes]) -> bytes:
+    return b"[" + b",".join(payloads) + b"]"
+
+@router.get(
+    "/detections",
+    summary="Server-Sent Events with new/updated detections",
+    response_class=StreamingResponse,
+    responses={
+        200: {"description": "text/event-stream: eventos `detections` (lista de FocusItem) e `dropped`"},
+        503: {"description": "Too many subscribers"},
+    },
+)
+async def stream_detections(
+    bbox: Annotated[Optional[str], Query(description="minLon,minLat,maxLon,maxLat")] = None,
+    estado: Optional[str] = None,
+    satelite: Optional[str] = None,
+):
+    """
+    Push de focos inseridos/alterados (substitui o polling de /data/recent).
+    Cada evento `detections` traz a lista de focos que casam com o filtro;
+    `dropped` avisa que a fila do cliente transbordou (os mais antigos foram descartados).
+    Comentários `: ping` mantêm a conexão viva a cada PUSH_HEARTBEAT_S.
+    """
+    flt = _push_filter(bbox, estado, satelite)
+    await broadcaster.ensure_source()
+    try:
+        sub = broadcaster.subscribe(flt)
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="too many subscribers")
+    log.info("push.subscribed", transport="sse", subscribers=broadcaster.subscribers)
+
+    async def events() -> AsyncIterator[bytes]:
+        seq = 0
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                items, dropped = await sub.next_batch(settings.push_heartbeat_s)
+                if dropped:
+                    yield b'event: dropped\ndata: {"count": %d}\n\n' % dropped
+                if not items:
+                    yield b": ping\n\n"
+                    continue
+                seq += 1
+                yield b"id: %d\nevent: detections\ndata: %s\n\n" % (seq, _array(items))
+        finally:
+            broadcaster.unsubscribe(sub)
+            log.info("push.unsubscribed", transport="sse", subscribers=broadcaster.subscribers)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/ws")
+async def stream_ws(
+    websocket: WebSocket,
+    bbox: Optional[str] = None,
+    estado: Optional[str] = None,
+    satelite: Optional[str] = None,
+):
+    """Mesmo fluxo do SSE via WebSocket: mensagens `{"event": ..., "data": ...}`."""
+    try:
+        flt = PushFilter(bbox=parse_bbox(bbox) if bbox else None, estado=estado, satelite=satelite)
+    except ValueError:
+        await websocket.close(code=1008)
+        return
+    await broadcaster.ensure_source()
+    try:
+        sub = broadcaster.subscribe(flt)
+    except OverflowError:
+        await websocket.close(code=1013)
+        return
+    await websocket.accept()
+    try:
+        while True:
+            items, dropped = await sub.next_batch(settings.push_heartbeat_s)
+            if dropped:
+                await websocket.send_text('{"event":"dropped","data":{"count":%d}}' % dropped)
+            if items:
+                await websocket.send_text('{"event":"detections","data":%s}' % _array(items).decode())
+            else:
+                await websocket.send_text('{"event":"ping"}')
+    except WebSocketDisconnect:
+        pass
+    finally:
+        broadcaster.unsubscribe(sub)
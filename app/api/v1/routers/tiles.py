@@ -0,0 +1,50 @@
+# app/api/v1/routers/tiles.py
+from __future__ import annotations
+from typing import Annotated, Optional
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
+
+from ....core.config import settings
+from ....core.deps import ReadRepoDep, RepoDep
+from ....services.tiles import MVT_MEDIA_TYPE, tile_cache
+
+router = APIRouter(prefix="/tiles", tags=["Tiles"])
+
+@router.get(
+    "/{z}/{x}/{y}",
+    summary="Mapbox Vector Tile of fire detections",
+    response_class=Response,
+    responses={
+        200: {"description": "MVT tile (layer 'focos')", "content": {MVT_MEDIA_TYPE: {}}},
+        304: {"description": "Not modified (ETag)"},
+        404: {"description": "Tile out of range"},
+    },
+)
+async def tile(
+    repo: ReadRepoDep,
+    primary: RepoDep,
+    request: Request,
+    z: Annotated[int, Path(ge=0, le=22)],
+    x: Annotated[int, Path(ge=0)],
+    y: Annotated[int, Path(ge=0)],
+    cluster: Annotated[Optional[bool], Query(description="Agrupar pontos (padrão: z <= TILES_CLUSTER_MAX_ZOOM)")] = None,
+):
+    """
+    Tile MVT (camada `focos`) montado por consulta bbox no índice 2dsphere.
+    Em zoom baixo os pontos são agrupados (`point_count`, `frp_sum`, `frp_max`).
+    Tiles até TILES_MAX_CACHED_ZOOM ficam em cache; a ingestão invalida só os tiles tocados.
+    """
+    n = 1 << z
+    if x >= n or y >= n:
+        raise HTTPException(status_code=404, detail="tile out of range")
+    use_cluster = z <= settings.tiles_cluster_max_zoom if cluster is None else cluster
+
+    cached = await tile_cache.get_or_render(repo, z, x, y, use_cluster, cache_repo=primary)
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={settings.tiles_max_age}",
+    }
+    if request.headers.get("if-none-match") == cached.etag:
+        return Response(status_code=304, headers=headers)
+    if not cached.data:
+        return Response(status_code=204, headers=headers)
+    return Response(content=cached.data, media_type=MVT_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,235 @@
+# app/cli.py
+"""
+Comandos de linha de comando (rodam fora da API, com as mesmas configurações).
+
+    python -m app.cli import-files dumps/focos_br_ref_2023.zip --start 2023-01-01 --end 2023-12-31
+    python -m app.cli import-files dumps/ --workers 8 --collection focos_hist
+    python -m app.cli import-files focos_mensal_br_202309.csv --dry-run
+    python -m app.cli replay-journal --since 2025-09-01 --layer dados_abertos:focos_48h_br_satref
+    python -m app.cli journal-runs
+    python -m app.cli prune-journal --days 14
+    python -m app.cli reconcile --layer hist --start 2020-01-01 --end 2024-12-31
+    python -m app.cli archive-export --month 2024-09 --force
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+from time import perf_counter
+
+from .core.config import settings
+from .core.db import close_mongo
+from .core.logging_config import get_logger, setup_logging, shutdown_logging
+from .repositories.sqlite_repo import close_sqlite
+from .services.transform_pool import close_transform_pool
+
+log = get_logger()
+
+async def import_files(args: argparse.Namespace) -> int:
+    """
+    Carga histórica a partir de dumps do BDQueimadas: `FileFireSource` ->
+    `_ingest_features` (mesmo caminho de /ingest/*) em lotes grandes.
+
+    Os ganchos pós-escrita ficam desligados por padrão: caches e snapshot
+    vivem no processo da API, não neste; `--hooks` roda os que persistem
+    estado (agrupamento em eventos de fogo).
+    """
+    from .api.v1.routers.ingest import _ingest_features
+    from .services.file_source import FileFireSource
+    from .services.layers import repo_for_collection
+
+    source = FileFireSource(args.paths, workers=args.workers, block_bytes=args.block_mb * 1024 * 1024 if args.block_mb else None)
+    collection = args.collection or settings.mongodb_coll
+    repo = None if args.dry_run else await repo_for_collection(collection)
+    if args.start or args.end:
+        feats = source.iter_range(args.start or "0001-01-01", args.end or "9999-12-31")
+    else:
+        feats = source.iter_48h()
+    rows = 0
+
+    async def counted():
+        nonlocal rows
+        async for feat in feats:
+            rows += 1
+            yield feat
+
+    t0 = perf_counter()
+    total = await _ingest_features(
+        repo, counted(), "file",  # type: ignore[arg-type]
+        dry_run=args.dry_run,
+        batch_size=args.batch_size or settings.import_batch_size,
+        publish=args.hooks and collection == settings.mongodb_coll,
+    )
+    dt = perf_counter() - t0
+    log.info("import.done", files=source.files, blocks=source.blocks, workers=source.workers,
+             rows=rows, total_upserted=total, dry_run=args.dry_run, duration_s=round(dt, 1))
+    print(f"{source.files} arquivo(s), {rows} focos lidos, {total} gravados{' (dry-run)' if args.dry_run else ''} "
+          f"em {dt:.1f}s ({rows / dt if dt else 0:.0f} focos/s, {source.workers} worker(s))")
+    return 0
+
+def _journal(args: argparse.Namespace):
+    from .services.page_journal import PageJournal, default_journal
+    journal = PageJournal(args.dir, retention_days=settings.journal_retention_days) if args.dir else default_journal()
+    if journal is None:
+        raise SystemExit("diário desligado: defina JOURNAL_DIR ou use --dir")
+    return journal
+
+def _journal_filters(args: argparse.Namespace) -> dict:
+    return {"layer": args.layer, "since": args.since, "until": args.until, "run": getattr(args, "run", None)}
+
+async def replay_journal(args: argparse.Namespace) -> int:
+    """
+    Refaz transformação + gravação a partir do diário de páginas do WFS, sem
+    rede. As páginas são relidas na ordem em que foram buscadas (a versão
+    mais recente de cada foco é a última gravada).
+    """
+    from .api.v1.routers.ingest import _ingest_features
+    from .services.layers import repo_for_collection
+    from .services.page_journal import JournalFireSource
+
+    source = JournalFireSource(_journal(args), **_journal_filters(args))
+    collection = args.collection or settings.mongodb_coll
+    repo = None if args.dry_run else await repo_for_collection(collection)
+    if args.start or args.end:
+        feats = source.iter_range(args.start or "0001-01-01", args.end or "9999-12-31", typename=args.layer)
+    else:
+        feats = source.iter_48h()
+    t0 = perf_counter()
+    total = await _ingest_features(
+        repo, feats, "replay",  # type: ignore[arg-type]
+        dry_run=args.dry_run,
+        batch_size=args.batch_size or settings.import_batch_size,
+        publish=args.hooks and collection == settings.mongodb_coll,
+    )
+    dt = perf_counter() - t0
+    stats = source.stats
+    log.info("journal.replay.done", total_upserted=total, dry_run=args.dry_run, duration_s=round(dt, 1),
+             pages=stats.pages, missing_pages=stats.missing, **_journal_filters(args))
+    print(f"{stats.pages} página(s), {total} focos gravados{' (dry-run)' if args.dry_run else ''} em {dt:.1f}s"
+          + (f"; {stats.missing} página(s) sem objeto no diário, puladas" if stats.missing else ""))
+    return 0
+
+async def journal_runs(args: argparse.Namespace) -> int:
+    """Lista as execuções guardadas no diário (camada, páginas, features, CQL)."""
+    for r in _journal(args).runs(**_journal_filters(args)):
+        print(f"{r['run']}  {r['started'][:19]}  {r['layer']:40s} pages={r['pages']:>5d} "
+              f"features={r['features']:>8d}  {r['cql'] or ''}")
+    return 0
+
+async def prune_journal(args: argparse.Namespace) -> int:
+    """Aplica a retenção (JOURNAL_RETENTION_DAYS ou --days) ao diário."""
+    r = _journal(args).prune(args.days)
+    print(f"{r.pages_files} arquivo(s) de metadados e {r.objects} página(s) removidos ({r.bytes / 1e6:.1f} MB)")
+    return 0
+
+async def reconcile(args: argparse.Namespace) -> int:
+    """Reconciliação WFS x Mongo de uma camada (ver services/reconcile.py); sai com 1 se sobrar divergência."""
+    from .core.deps import get_reports_repo
+    from .services.layers import layer_runner
+    from .services.reconcile import Reconciler, default_range
+
+    start, end = default_range(args.days)
+    report = await Reconciler(layer_runner, await get_reports_repo()).run(
+        args.layer, args.start or start, args.end or end,
+        granularity=args.granularity, refine=not args.no_refine, repair=not args.no_repair,
+    )
+    print(f"{report['status']}  {report['_id']}  {report['summary']}")
+    for w in report["windows"]:
+        print(f"  {w['window'][0]} .. {w['window'][1]}  wfs={w['wfs']} mongo={w['mongo']} "
+              f"after={w.get('mongo_after', '-')}  {w['status']}")
+    await layer_runner.aclose()
+    return 0 if report["status"] in ("ok", "repaired", "skipped") else 1
+
+async def archive_export(args: argparse.Namespace) -> int:
+    """Exporta meses fechados do Mongo para o arquivo Parquet (ver services/archive.py)."""
+    from .core.deps import get_read_repo
+    from .services.archive import Archive, default_archive
+
+    archive = Archive(args.dir) if args.dir else default_archive()
+    repo = await get_read_repo()
+    t0 = perf_counter()
+    done = await archive.export_closed_months(repo, months=args.month, force=args.force)
+    for m in done:
+        print(f"{m['month']}  rows={m['rows']:>8d}  row_groups={m.get('row_groups') or 0:>4d}  "
+              f"{(m.get('bytes') or 0) / 1e6:>7.1f} MB  {m.get('path') or '-'}")
+    print(f"{len(done)} mês(es) exportado(s) em {perf_counter() - t0:.1f}s")
+    return 0
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="python -m app.cli")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    imp = sub.add_parser("import-files", help="importa dumps CSV/.csv.gz/.zip do BDQueimadas")
+    imp.add_argument("paths", nargs="+", help="arquivos ou diretórios")
+    imp.add_argument("--start", help="YYYY-MM-DD (inclusive); padrão: sem filtro")
+    imp.add_argument("--end", help="YYYY-MM-DD (inclusive); padrão: sem filtro")
+    imp.add_argument("--workers", type=int, help="processos de parse (padrão IMPORT_WORKERS / núcleos - 1)")
+    imp.add_argument("--block-mb", type=int, help="tamanho do bloco de leitura (padrão IMPORT_BLOCK_BYTES)")
+    imp.add_argument("--batch-size", type=int, help="docs por bulk_write (padrão IMPORT_BATCH_SIZE)")
+    imp.add_argument("--collection", help="coleção de destino (padrão MONGODB_COLLECTION)")
+    imp.add_argument("--hooks", action="store_true", help="roda os ganchos pós-escrita (eventos de fogo)")
+    imp.add_argument("--dry-run", action="store_true", help="só lê e converte, sem gravar")
+    imp.set_defaults(handler=import_files)
+
+    def journal_args(p: argparse.ArgumentParser, *, run: bool = True) -> None:
+        p.add_argument("--dir", help="diretório do diário (padrão JOURNAL_DIR)")
+        p.add_argument("--layer", help="typeName da camada")
+        p.add_argument("--since", help="páginas buscadas a partir de (ISO/YYYY-MM-DD)")
+        p.add_argument("--until", help="páginas buscadas até (ISO/YYYY-MM-DD)")
+        if run:
+            p.add_argument("--run", help="só uma execução (ver journal-runs)")
+
+    rep = sub.add_parser("replay-journal", help="retransforma e grava a partir do diário de páginas do WFS")
+    journal_args(rep)
+    rep.add_argument("--start", help="só focos com data_hora_gmt >= (YYYY-MM-DD)")
+    rep.add_argument("--end", help="só focos com data_hora_gmt <= (YYYY-MM-DD)")
+    rep.add_argument("--batch-size", type=int, help="docs por bulk_write (padrão IMPORT_BATCH_SIZE)")
+    rep.add_argument("--collection", help="coleção de destino (padrão MONGODB_COLLECTION)")
+    rep.add_argument("--hooks", action="store_true", help="roda os ganchos pós-escrita (eventos de fogo)")
+    rep.add_argument("--dry-run", action="store_true", help="só lê e converte, sem gravar")
+    rep.set_defaults(handler=replay_journal)
+
+    runs = sub.add_parser("journal-runs", help="lista as execuções guardadas no diário")
+    journal_args(runs, run=False)
+    runs.set_defaults(handler=journal_runs)
+
+    rec = sub.add_parser("reconcile", help="compara contagens WFS x Mongo por janela e reingere só o que diverge")
+    rec.add_argument("--layer", default="incremental", help="camada do registro (WFS_LAYERS)")
+    rec.add_argument("--start", help="YYYY-MM-DD (padrão: hoje - --days)")
+    rec.add_argument("--end", help="YYYY-MM-DD (padrão: hoje)")
+    rec.add_argument("--days", type=int, help="janela para trás (padrão RECONCILE_DAYS)")
+    rec.add_argument("--granularity", choices=["day", "hour"], default="day")
+    rec.add_argument("--no-refine", action="store_true", help="não refina dias divergentes por hora")
+    rec.add_argument("--no-repair", action="store_true", help="só relatório, sem reingestão")
+    rec.set_defaults(handler=reconcile)
+
+    arc = sub.add_parser("archive-export", help="exporta meses fechados do Mongo para Parquet (ARCHIVE_DIR)")
+    arc.add_argument("--dir", help="diretório do arquivo (padrão ARCHIVE_DIR)")
+    arc.add_argument("--month", action="append", help="YYYY-MM (repetível); padrão: meses fechados que faltam")
+    arc.add_argument("--force", action="store_true", help="reexporta meses já presentes no manifesto")
+    arc.set_defaults(handler=archive_export)
+
+    prune = sub.add_parser("prune-journal", help="aplica a retenção ao diário")
+    prune.add_argument("--dir", help="diretório do diário (padrão JOURNAL_DIR)")
+    prune.add_argument("--days", type=float, help="retenção em dias (padrão JOURNAL_RETENTION_DAYS)")
+    prune.set_defaults(handler=prune_journal)
+    return ap
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    setup_logging()
+
+    async def run() -> int:
+        try:
+            return await args.handler(args)
+        finally:
+            close_transform_pool()
+            close_mongo()
+            close_sqlite()
+
+    try:
+        return asyncio.run(run())
+    finally:
+        shutdown_logging()
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+# app/core/bootstrap.py
+"""
+Bootstrap da aplicação (lifespan): conecta, aquece pools, confere índices e
+carrega caches antes de liberar tráfego.
+
+Cada etapa registra prontidão e tempo em `readiness`, exposto em
+`/health/ready`. Se uma etapa crítica falhar (ex.: Mongo fora do ar na
+partida), o bootstrap segue tentando em segundo plano com backoff e a
+instância continua "não pronta" (503) até concluir.
+"""
+from __future__ import annotations
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+import httpx
+
+from .config import settings
+from .db import get_mongo, get_mongo_read, warm_pools
+from .logging_config import get_logger
+
+log = get_logger()
+
+@dataclass
+class Check:
+    critical: bool
+    ok: bool = False
+    duration_ms: Optional[int] = None
+    error: Optional[str] = None
+    detail: Dict[str, Any] = field(default_factory=dict)
+
+class Readiness:
+    def __init__(self) -> None:
+        self.checks: Dict[str, Check] = {}
+        self.started_at: Optional[str] = None
+        self.ready_at: Optional[str] = None
+        self.total_ms: Optional[int] = None
+        self.attempts = 0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self.checks) and all(c.ok for c in self.checks.values() if c.critical)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "started_at": self.started_at,
+            "ready_at": self.ready_at,
+            "total_ms": self.total_ms,
+            "attempts": self.attempts,
+            "checks": {
+                name: {
+                    "ok": c.ok, "critical": c.critical, "duration_ms": c.duration_ms,
+                    "error": c.error, **({"detail": c.detail} if c.detail else {}),
+                }
+                for name, c in self.checks.items()
+            },
+        }
+
+readiness = Readiness()
+
+async def _step(name: str, critical: bool, fn: Callable[[], Awaitable[Optional[Dict[str, Any]]]]) -> bool:
+    check = readiness.checks.setdefault(name, Check(critical=critical))
+    if check.ok:
+        return True     # etapa já concluída numa tentativa anterior
+    t0 = perf_counter()
+    try:
+        check.detail = await fn() or {}
+        check.ok, check.error = True, None
+    except Exception as exc:
+        check.ok, check.error = False, f"{type(exc).__name__}: {exc}"
+        log.warning("bootstrap.step_failed", step=name, critical=critical, error=check.error)
+    check.duration_ms = int((perf_counter() - t0) * 1000)
+    return check.ok
+
+# ---------- etapas ----------
+async def _mongo_write() -> Dict[str, Any]:
+    db, coll = await get_mongo()     # ping + índices (uma vez, sob lock)
+    info = await coll.index_information()
+    return {"indexes": len(info)}
+
+async def _mongo_read() -> Dict[str, Any]:
+    await get_mongo_read()
+    return {"read_preference": settings.mongodb_read_preference, "split": settings.mongodb_split_clients}
+
+async def _warm_pools() -> Dict[str, Any]:
+    return {"connections": await warm_pools(settings.bootstrap_warm_connections)}
+
+async def _sqlite() -> Dict[str, Any]:
+    from ..repositories.sqlite_repo import sqlite_repo
+    repo = sqlite_repo()      # abre o banco e cria tabela/índices/R*Tree se preciso
+    return {"path": settings.sqlite_path, "rows": await repo.count()}
+
+async def _hot_snapshot() -> Dict[str, Any]:
+    from ..services.hot_snapshot import hot_snapshot
+    from .deps import get_repo
+    await hot_snapshot.load(await get_repo())     # primário: o snapshot fica até a próxima recarga
+    return {"rows": len(hot_snapshot)}
+
+async def _wfs() -> Dict[str, Any]:
+    url = settings.wfs_base.rstrip("/") + settings.wfs_service_path
+    async with httpx.AsyncClient(timeout=5.0) as client:
+        r = await client.get(url, params={"service": "WFS", "request": "GetCapabilities"})
+        r.raise_for_status()
+    return {"status": r.status_code}
+
+async def bootstrap_once() -> bool:
+    readiness.attempts += 1
+    if settings.repo_backend == "sqlite":
+        ok = await _step("sqlite", True, _sqlite)
+    else:
+        ok = await _step("mongo_write", True, _mongo_write)
+        ok = ok and await _step("mongo_read", True, _mongo_read)
+        if ok:
+            await _step("pool_warmup", False, _warm_pools)
+    if ok:
+        if settings.hot_snapshot_enabled:
+            await _step("hot_snapshot", False, _hot_snapshot)
+    if settings.bootstrap_check_wfs:
+        await _step("wfs", False, _wfs)
+    return readiness.ready
+
+async def run_bootstrap() -> None:
+    """Tenta até ficar pronto (backoff 1s..30s)."""
+    readiness.started_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    t0 = perf_counter()
+    delay = 1.0
+    while not await bootstrap_once():
+        log.warning("bootstrap.retry", in_s=delay, attempt=readiness.attempts)
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, 30.0)
+    readiness.total_ms = int((perf_counter() - t0) * 1000)
+    readiness.ready_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    log.info("bootstrap.ready", total_ms=readiness.total_ms,
+             steps={n: c.duration_ms for n, c in readiness.checks.items()})
@@ -2,6 +2,7 @@
 # app/config.py
 from pydantic import BaseModel, Field, validator
 import os
+from typing import Literal
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -36,6 +37,10 @@ def _load_layered_env():
 # executa o carregamento em camadas
 _load_layered_env()
 
+def _env_bool(name: str, default: str = "false") -> bool:
+    """Interpreta variáveis booleanas do .env ('1', 'true', 'yes', 'on')."""
+    return os.getenv(name, default).strip().lower() in ("1", "true", "yes", "on")
+
 class Settings(BaseModel):
     """
     Configurações da aplicação (carregadas de variáveis de ambiente).
@@ -50,15 +55,174 @@ class Settings(BaseModel):
     mongodb_uri: str | None = Field(default=os.getenv("MONGODB_URI"))
     mongodb_db: str = Field(default=os.getenv("MONGODB_DB", "inpe_db"))
     mongodb_coll: str = Field(default=os.getenv("MONGODB_COLLECTION", "focos_48h")) # "focos"
+
+    # --- Backend do repositório de focos: mongo (Atlas) ou sqlite (edge/offline, testes locais) ---
+    repo_backend: Literal["mongo", "sqlite"] = Field(default=os.getenv("REPO_BACKEND", "mongo"))
+    sqlite_path: str = Field(default=os.getenv("SQLITE_PATH", "data/inpe_sync.db"))
+    sqlite_cache_mb: int = Field(default=int(os.getenv("SQLITE_CACHE_MB", "64")))
+    sqlite_mmap_mb: int = Field(default=int(os.getenv("SQLITE_MMAP_MB", "256")))
+    sqlite_busy_timeout_ms: int = Field(default=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")))
+
+    # --- Clientes Mongo por papel: escrita (ingestão) x leitura (routers de consulta) ---
+    mongodb_split_clients: bool = Field(default=_env_bool("MONGODB_SPLIT_CLIENTS", "true"))
+    mongodb_read_uri: str | None = Field(default=os.getenv("MONGODB_READ_URI"))
+    mongodb_read_preference: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = Field(default=os.getenv("MONGODB_READ_PREFERENCE", "secondaryPreferred"))
+    mongodb_read_max_staleness_s: int | None = Field(
+        default=int(os.getenv("MONGODB_READ_MAX_STALENESS_S")) if os.getenv("MONGODB_READ_MAX_STALENESS_S") else None
+    )
+    mongodb_read_max_pool: int = Field(default=int(os.getenv("MONGODB_READ_MAX_POOL", "100")))
+    mongodb_read_min_pool: int = Field(default=int(os.getenv("MONGODB_READ_MIN_POOL", "10")))
+    mongodb_read_socket_timeout_ms: int = Field(default=int(os.getenv("MONGODB_READ_SOCKET_TIMEOUT_MS", "30000")))
+    mongodb_read_wait_queue_timeout_ms: int = Field(default=int(os.getenv("MONGODB_READ_WAIT_QUEUE_TIMEOUT_MS", "2000")))
+    mongodb_write_max_pool: int = Field(default=int(os.getenv("MONGODB_WRITE_MAX_POOL", "20")))
+    mongodb_write_min_pool: int = Field(default=int(os.getenv("MONGODB_WRITE_MIN_POOL", "0")))
+    mongodb_write_socket_timeout_ms: int = Field(default=int(os.getenv("MONGODB_WRITE_SOCKET_TIMEOUT_MS", "120000")))
+    mongodb_write_wait_queue_timeout_ms: int = Field(default=int(os.getenv("MONGODB_WRITE_WAIT_QUEUE_TIMEOUT_MS", "30000")))
+    mongodb_server_selection_timeout_ms: int = Field(default=int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "10000")))
+    mongodb_connect_timeout_ms: int = Field(default=int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "10000")))
+    # compressão no wire; compressores sem pacote instalado (zstandard/python-snappy) são ignorados
+    mongodb_compressors: list[str] = Field(
+        default=[c.strip() for c in os.getenv("MONGODB_COMPRESSORS", "zstd,snappy,zlib").split(",") if c.strip()]
+    )
+
+    # --- Métricas (/metrics, formato Prometheus) ---
+    metrics_enabled: bool = Field(default=_env_bool("METRICS_ENABLED", "true"))
+
+    # --- Monitoramento de comandos Mongo (formatos de consulta lentos, /data/debug/mongo-ops) ---
+    mongo_monitor_enabled: bool = Field(default=_env_bool("MONGO_MONITOR_ENABLED", "true"))
+    # fração dos comandos agregada por formato; os lentos entram sempre
+    mongo_monitor_sample_rate: float = Field(default=float(os.getenv("MONGO_MONITOR_SAMPLE_RATE", "0.1")))
+    mongo_slow_ms: float = Field(default=float(os.getenv("MONGO_SLOW_MS", "100")))
+
+    # --- Profiler por amostragem sob demanda (cabeçalho ou taxa; /data/debug/profiles) ---
+    profile_enabled: bool = Field(default=_env_bool("PROFILE_ENABLED", "false"))
+    profile_header: str = Field(default=os.getenv("PROFILE_HEADER", "x-profile"))
+    # se definido, o cabeçalho precisa trazer exatamente este valor
+    profile_token: str | None = Field(default=os.getenv("PROFILE_TOKEN"))
+    profile_sample_rate: float = Field(default=float(os.getenv("PROFILE_SAMPLE_RATE", "0")))
+    profile_paths: list[str] = Field(
+        default=[p.strip() for p in os.getenv("PROFILE_PATHS", "/api/v1/ingest,/api/v1/data").split(",") if p.strip()]
+    )
+    profile_interval_ms: float = Field(default=float(os.getenv("PROFILE_INTERVAL_MS", "5")))
+    profile_max_concurrent: int = Field(default=int(os.getenv("PROFILE_MAX_CONCURRENT", "2")))
+    profile_store_size: int = Field(default=int(os.getenv("PROFILE_STORE_SIZE", "50")))
+
+    # --- Bootstrap (lifespan) e prontidão (/health/ready) ---
+    bootstrap_enabled: bool = Field(default=_env_bool("BOOTSTRAP_ENABLED", "true"))
+    bootstrap_timeout_s: float = Field(default=float(os.getenv("BOOTSTRAP_TIMEOUT_S", "30")))
+    bootstrap_warm_connections: int = Field(default=int(os.getenv("BOOTSTRAP_WARM_CONNECTIONS", "10")))
+    bootstrap_check_wfs: bool = Field(default=_env_bool("BOOTSTRAP_CHECK_WFS", "false"))
+
+    # --- Leitura "lean" (projeção + RawBSONDocument + batch_size do cursor) ---
+    mongodb_lean_reads: bool = Field(default=_env_bool("MONGODB_LEAN_READS", "true"))
+    mongodb_batch_size: int = Field(default=int(os.getenv("MONGODB_BATCH_SIZE", "1000")))
+
+    # --- API ---
+    # serialização orjson sem revalidação do response_model em /data/recent e /data/find
+    api_fast_json: bool = Field(default=_env_bool("API_FAST_JSON", "false"))
+    # /data/export: docs por lote do cursor e linhas por bloco enviado
+    export_batch_size: int = Field(default=int(os.getenv("EXPORT_BATCH_SIZE", "2000")), gt=0, validate_default=True)
+    export_chunk_rows: int = Field(default=int(os.getenv("EXPORT_CHUNK_ROWS", "500")), gt=0, validate_default=True)
+
+    # --- Grade de densidade (chaves calculadas na ingestão, uma por resolução em graus) ---
+    grid_resolutions: list[float] = Field(
+        default=[float(r) for r in os.getenv("GRID_RESOLUTIONS", "1,0.5,0.25,0.1").split(",") if r.strip()]
+    )
+    density_cache_ttl: float = Field(default=float(os.getenv("DENSITY_CACHE_TTL", "300")))
+
+    # --- Eventos de fogo (agrupamento incremental de focos) ---
+    events_enabled: bool = Field(default=_env_bool("EVENTS_ENABLED", "true"))
+    mongodb_events_coll: str = Field(default=os.getenv("MONGODB_EVENTS_COLLECTION", "fire_events"))
+    events_cell_km: float = Field(default=float(os.getenv("EVENTS_CELL_KM", "1.0")))
+    events_gap_hours: float = Field(default=float(os.getenv("EVENTS_GAP_HOURS", "24")))
+
+    # --- Reconciliação WFS x Mongo (contagens por janela; reingere só o que diverge) ---
+    mongodb_reconcile_coll: str = Field(default=os.getenv("MONGODB_RECONCILE_COLLECTION", "reconcile_reports"))
+    # contagens (resultType=hits + count_documents) e reingestões simultâneas
+    reconcile_concurrency: int = Field(default=int(os.getenv("RECONCILE_CONCURRENCY", "8")))
+    # agenda (cron 5 campos; vazio = só sob demanda) e janela (dias para trás) da reconciliação agendada
+    reconcile_cron: str | None = Field(default=os.getenv("RECONCILE_CRON") or None)
+    reconcile_days: int = Field(default=int(os.getenv("RECONCILE_DAYS", "30")))
+
+    # --- Jobs de ingestão em segundo plano (/ingest/*?background=true, /jobs) ---
+    jobs_enabled: bool = Field(default=_env_bool("JOBS_ENABLED", "false"))
+    mongodb_jobs_coll: str = Field(default=os.getenv("MONGODB_JOBS_COLLECTION", "ingest_jobs"))
+    # limite global de jobs rodando ao mesmo tempo (cada um ainda respeita WFS_MAX_CONNECTIONS)
+    jobs_workers: int = Field(default=int(os.getenv("JOBS_WORKERS", "2")))
+    jobs_max_queued: int = Field(default=int(os.getenv("JOBS_MAX_QUEUED", "100")))
+    # fatia (= checkpoint) de initial/incremental; a retomada após reinício refaz no máximo uma fatia
+    jobs_chunk_days: int = Field(default=int(os.getenv("JOBS_CHUNK_DAYS", "1")))
+    jobs_save_interval_s: float = Field(default=float(os.getenv("JOBS_SAVE_INTERVAL_S", "5")))
+
+    # --- Arquivo frio em Parquet (meses fechados; requer pyarrow; vazio = desligado) ---
+    archive_dir: str | None = Field(default=os.getenv("ARCHIVE_DIR") or None)
+    # um mês é exportado quando terminou há mais de N dias (o INPE ainda corrige focos recentes)
+    archive_close_after_days: int = Field(default=int(os.getenv("ARCHIVE_CLOSE_AFTER_DAYS", "7")))
+    archive_row_group_rows: int = Field(default=int(os.getenv("ARCHIVE_ROW_GROUP_ROWS", "100000")))
+    archive_compression: str = Field(default=os.getenv("ARCHIVE_COMPRESSION", "zstd"))
+    # agenda da exportação (cron 5 campos, com SCHEDULER_ENABLED); vazio = só sob demanda
+    archive_cron: str | None = Field(default=os.getenv("ARCHIVE_CRON") or None)
+
+    # --- Push de focos novos (/stream) ---
+    push_source: Literal["auto", "ingest", "changestream"] = Field(default=os.getenv("PUSH_SOURCE", "auto"))
+    push_queue_size: int = Field(default=int(os.getenv("PUSH_QUEUE_SIZE", "1000")))
+    push_max_subscribers: int = Field(default=int(os.getenv("PUSH_MAX_SUBSCRIBERS", "500")))
+    push_heartbeat_s: float = Field(default=float(os.getenv("PUSH_HEARTBEAT_S", "15")))
+
+    # --- Snapshot colunar da janela quente (NumPy, em processo) ---
+    hot_snapshot_enabled: bool = Field(default=_env_bool("HOT_SNAPSHOT_ENABLED", "true"))
+    hot_window_hours: float = Field(default=float(os.getenv("HOT_WINDOW_HOURS", "48")))
+    hot_grid_deg: float = Field(default=float(os.getenv("HOT_GRID_DEG", "1.0")))
+    hot_snapshot_refresh_s: float = Field(default=float(os.getenv("HOT_SNAPSHOT_REFRESH_S", "300")))
+
+    # --- Vector tiles (/tiles/{z}/{x}/{y}) ---
+    # versão do dataset: troque para descartar todo o cache (ex.: mudança de mapeamento)
+    tiles_dataset_version: str = Field(
+        default=os.getenv("TILES_DATASET_VERSION")
+        or f"{os.getenv('MONGODB_DB', 'inpe_db')}.{os.getenv('MONGODB_COLLECTION', 'focos_48h')}"
+    )
+    tiles_cache_dir: str | None = Field(default=os.getenv("TILES_CACHE_DIR") or None)
+    tiles_cache_size: int = Field(default=int(os.getenv("TILES_CACHE_SIZE", "2048")))
+    tiles_max_cached_zoom: int = Field(default=int(os.getenv("TILES_MAX_CACHED_ZOOM", "12")))
+    tiles_cluster_max_zoom: int = Field(default=int(os.getenv("TILES_CLUSTER_MAX_ZOOM", "7")))
+    tiles_cluster_px: int = Field(default=int(os.getenv("TILES_CLUSTER_PX", "128")))
+    tiles_max_features: int = Field(default=int(os.getenv("TILES_MAX_FEATURES", "50000")))
+    tiles_max_age: int = Field(default=int(os.getenv("TILES_MAX_AGE", "60")))
     
     # --- WFS / BDQueimadas ---
     wfs_base: str = Field(default=os.getenv("WFS_BASE", "https://terrabrasilis.dpi.inpe.br/queimadas/geoserver"))
     wfs_service_path: str = Field(default=os.getenv("WFS_SERVICE_PATH", "/wfs")) # "WFS_SERVICE_PATH", "/deter-amz/wfs"
     wfs_typename: str = Field(default=os.getenv("WFS_TYPENAME", "dados_abertos:focos_48h_br_satref")) # "WFS_TYPENAME", "deter_public"
+    # camada histórica para janelas por data (/ingest/initial e /incremental); vazio = usa WFS_TYPENAME
+    wfs_typename_hist: str | None = Field(default=os.getenv("WFS_TYPENAME_HIST") or None)
     wfs_date_field: str = Field(default=os.getenv("WFS_DATE_FIELD", "data_hora_gmt")) # "WFS_DATE_FIELD", "date"
     wfs_srid: str = Field(default=os.getenv("WFS_SRID", "EPSG:4326")) # "WFS_SRID", "EPSG:4674"
     wfs_page_size: int = Field(default=int(os.getenv("WFS_PAGE_SIZE", "1000")))
     wfs_sortby: str = Field(default=os.getenv("WFS_SORTBY", "data_hora_gmt")) # "WFS_SORTBY", "gid"
+    # registro de camadas: JSON (lista de objetos) ou caminho de um .json; vazio = derivado de WFS_TYPENAME(_HIST)
+    wfs_layers: str | None = Field(default=os.getenv("WFS_LAYERS") or None)
+    # pool HTTP compartilhado pelas camadas sincronizadas em paralelo (limite global de conexões ao WFS)
+    wfs_max_connections: int = Field(default=int(os.getenv("WFS_MAX_CONNECTIONS", "8")))
+
+    # --- Transformação feature -> documento fora do event loop (uma página por tarefa) ---
+    # inline = no event loop; thread = pool de threads; process = pool de processos (spawn)
+    transform_executor: Literal["inline", "thread", "process"] = Field(default=os.getenv("TRANSFORM_EXECUTOR", "inline"))
+    transform_workers: int = Field(default=int(os.getenv("TRANSFORM_WORKERS", "0")))   # 0 = núcleos - 1
+    # features por tarefa (0 = WFS_PAGE_SIZE): grande o bastante para o IPC ficar pequeno perto do trabalho
+    transform_page_size: int = Field(default=int(os.getenv("TRANSFORM_PAGE_SIZE", "0")))
+
+    # --- Diário das páginas brutas do WFS (replay sem rede; vazio = desligado) ---
+    journal_dir: str | None = Field(default=os.getenv("JOURNAL_DIR") or None)
+    journal_retention_days: float = Field(default=float(os.getenv("JOURNAL_RETENTION_DAYS", "30")))
+    journal_compresslevel: int = Field(default=int(os.getenv("JOURNAL_COMPRESSLEVEL", "6")))
+
+    # --- Importação de dumps do BDQueimadas (python -m app.cli import-files) ---
+    # processos de parse; 0 = núcleos - 1
+    import_workers: int = Field(default=int(os.getenv("IMPORT_WORKERS", "0")))
+    import_block_bytes: int = Field(default=int(os.getenv("IMPORT_BLOCK_BYTES", str(4 * 1024 * 1024))))
+    import_batch_size: int = Field(default=int(os.getenv("IMPORT_BATCH_SIZE", "10000")))
 
     # --- Janelas (quando usar ingestão por datas) ---
     initial_start: str = Field(default=os.getenv("INITIAL_START", "2019-01-01"))
@@ -66,6 +230,8 @@ class Settings(BaseModel):
 
     # --- Scheduler ---
     schedule_cron: str = Field(default=os.getenv("SCHEDULE_CRON", "*/10 * * * *"))
+    # inicia o agendador no lifespan (um job por camada com `schedule`)
+    scheduler_enabled: bool = Field(default=_env_bool("SCHEDULER_ENABLED", "false"))
     
     # --- Robustez: retries / breaker ---
     retry_max_attempts: int = Field(default=int(os.getenv("RETRY_MAX_ATTEMPTS", "6")))
@@ -1,12 +1,16 @@
 # app/core/db.py
 from __future__ import annotations
+import asyncio
 import os
 from typing import Tuple
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase, AsyncIOMotorCollection
+from pymongo import IndexModel, read_preferences
 from pymongo.server_api import ServerApi
 
 from .config import settings
 from .logging_config import get_logger
+from .mongo_monitor import command_monitor
+from ..utils.grid import res_key
 
 log = get_logger()
 
@@ -14,46 +18,205 @@ _mongo_client: AsyncIOMotorClient | None = None
 _db: AsyncIOMotorDatabase | None = None
 _coll: AsyncIOMotorCollection | None = None
 
+# uma conexão por processo, mesmo com requisições simultâneas na partida
+_lock = asyncio.Lock()
+_read_lock = asyncio.Lock()
+
+_read_client: AsyncIOMotorClient | None = None
+_read_db: AsyncIOMotorDatabase | None = None
+_read_coll: AsyncIOMotorCollection | None = None
+
+# pacote opcional exigido por cada compressor do wire protocol (zlib é stdlib)
+_COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+
+def _available_compressors(requested: list[str]) -> list[str]:
+    """Mantém só os compressores cujo pacote está instalado (na ordem pedida)."""
+    out = []
+    for name in requested:
+        module = _COMPRESSOR_MODULES.get(name)
+        if module is None:
+            log.warning("mongo.compressor_unknown", compressor=name)
+            continue
+        try:
+            __import__(module)
+        except ImportError:
+            log.info("mongo.compressor_unavailable", compressor=name, package=module)
+            continue
+        out.append(name)
+    return out
+
+def client_options(role: str) -> dict:
+    """
+    Opções do MongoClient por papel:
+      - "write": ingestão (bulk writes longos, pool pequeno, primário);
+      - "read": routers de consulta (pool maior, timeouts curtos, readPreference configurável).
+    """
+    if role == "write":
+        opts = {
+            "maxPoolSize": settings.mongodb_write_max_pool,
+            "minPoolSize": settings.mongodb_write_min_pool,
+            "socketTimeoutMS": settings.mongodb_write_socket_timeout_ms,
+            "waitQueueTimeoutMS": settings.mongodb_write_wait_queue_timeout_ms,
+            "retryWrites": True,
+            "appname": "inpe_sync-write",
+        }
+    else:
+        opts = {
+            "maxPoolSize": settings.mongodb_read_max_pool,
+            "minPoolSize": settings.mongodb_read_min_pool,
+            "socketTimeoutMS": settings.mongodb_read_socket_timeout_ms,
+            "waitQueueTimeoutMS": settings.mongodb_read_wait_queue_timeout_ms,
+            "readPreference": settings.mongodb_read_preference,
+            "retryReads": True,
+            "appname": "inpe_sync-read",
+        }
+        if settings.mongodb_read_max_staleness_s and settings.mongodb_read_preference != "primary":
+            opts["maxStalenessSeconds"] = settings.mongodb_read_max_staleness_s
+    opts["serverSelectionTimeoutMS"] = settings.mongodb_server_selection_timeout_ms
+    opts["connectTimeoutMS"] = settings.mongodb_connect_timeout_ms
+    compressors = _available_compressors(settings.mongodb_compressors)
+    if compressors:
+        opts["compressors"] = ",".join(compressors)
+    return opts
+
+def _build_client(role: str, uri: str) -> AsyncIOMotorClient:
+    opts = client_options(role)
+    log.info("mongo.client", role=role,
+             pool=f"{opts['minPoolSize']}..{opts['maxPoolSize']}",
+             read_preference=opts.get("readPreference", "primary"),
+             compressors=opts.get("compressors"))
+    if settings.mongo_monitor_enabled:
+        opts["event_listeners"] = [command_monitor]
+    return AsyncIOMotorClient(
+        uri,
+        server_api=ServerApi("1"),     # segue o snippet do Atlas (propaga via Motor -> PyMongo)
+        **opts,
+    )
+
+
+def focus_indexes() -> list[IndexModel]:
+    """Índices de uma coleção de focos (a principal e as de outras camadas WFS)."""
+    return [
+        IndexModel("id", unique=True),                  # chave única
+        IndexModel([("geometry", "2dsphere")]),         # geo
+        IndexModel([("data_hora_gmt", 1)]),             # data
+        # séries temporais: data + dimensões de group-by + frp cobrem /data/timeseries
+        IndexModel([("data_hora_gmt", 1), ("satelite", 1), ("estado", 1), ("bioma", 1), ("frp", 1)]),
+        # densidade: data + célula + frp cobrem o $match/$group de /data/density
+        *(IndexModel([("data_hora_gmt", 1), (f"grid.{res_key(res)}", 1), ("frp", 1)])
+          for res in settings.grid_resolutions),
+        IndexModel("event_id", sparse=True),
+    ]
+
+async def ensure_indexes(db: AsyncIOMotorDatabase, coll: AsyncIOMotorCollection) -> list[str]:
+    """Cria (idempotente) os índices; um `createIndexes` por coleção. Retorna os nomes."""
+    # eventos de fogo: candidatos por célula + atividade; consultas por data/centróide
+    event_indexes = [
+        IndexModel([("cells", 1), ("last_seen", 1)]),
+        IndexModel([("last_seen", -1)]),
+        IndexModel([("centroid", "2dsphere")]),
+    ]
+    names = await coll.create_indexes(focus_indexes())
+    names += await db[settings.mongodb_events_coll].create_indexes(event_indexes)
+    # relatórios de reconciliação: últimos por camada
+    names += await db[settings.mongodb_reconcile_coll].create_indexes([IndexModel([("layer", 1), ("started_at", -1)])])
+    return names
 
 async def get_mongo() -> Tuple[AsyncIOMotorDatabase, AsyncIOMotorCollection]:
     """
-    Retorna (db, coll) do MongoDB como singleton e garante índices:
-      - 'id' (único) para upsert idempotente,
-      - 'geometry' (2dsphere) para consultas geoespaciais,
-      - 'data_hora_gmt' (asc) para ordenações/consultas temporais.
-    Executa também um 'ping' para falhas aparecerem cedo (auth/dns/etc).
+    Retorna (db, coll) do cliente de escrita (ingestão) como singleton e garante índices
+    (ver `ensure_indexes`). Executa também um 'ping' para falhas aparecerem cedo
+    (auth/dns/etc). A criação é protegida por lock: chamadas concorrentes na
+    partida esperam um único connect; se ele falhar, a próxima chamada tenta de novo.
     """
     global _mongo_client, _db, _coll
 
-    if _mongo_client is None:
-        if not settings.mongodb_uri:
-            raise RuntimeError("MONGODB_URI não configurado (.env)")
+    if _coll is not None:   # caminho rápido, sem lock
+        return _db, _coll   # type: ignore[return-value]
 
-        # log seguro (sem credenciais)
-        uri_hint = settings.mongodb_uri.split("@")[-1] if "@" in settings.mongodb_uri else settings.mongodb_uri
-        log.info("mongo.connecting", uri_hint=uri_hint)
+    async with _lock:
+        if _coll is None:
+            if not settings.mongodb_uri:
+                raise RuntimeError("MONGODB_URI não configurado (.env)")
 
-        _mongo_client = AsyncIOMotorClient(
-            settings.mongodb_uri,
-            server_api=ServerApi("1"),     # segue o snippet do Atlas (propaga via Motor -> PyMongo)
-            serverSelectionTimeoutMS=10_000,
-        )
+            # log seguro (sem credenciais)
+            uri_hint = settings.mongodb_uri.split("@")[-1] if "@" in settings.mongodb_uri else settings.mongodb_uri
+            log.info("mongo.connecting", uri_hint=uri_hint)
 
-        # ping cedo para falhas aparecerem já no startup/primeira chamada
-        await _mongo_client.admin.command("ping")
+            client = _build_client("write", settings.mongodb_uri)
+            try:
+                # ping cedo para falhas aparecerem já no startup/primeira chamada
+                await client.admin.command("ping")
+                db = client[settings.mongodb_db]
+                coll = db[settings.mongodb_coll]
+                await ensure_indexes(db, coll)
+            except BaseException:
+                client.close()
+                raise
+            _mongo_client, _db, _coll = client, db, coll
 
-        _db = _mongo_client[settings.mongodb_db]
-        _coll = _db[settings.mongodb_coll]
+            log.info("mongo.connected",
+                     db=settings.mongodb_db,
+                     coll=settings.mongodb_coll
+            )
 
-        # Índices
-        await _coll.create_index("id", unique=True)             # chave única
-        await _coll.create_index([("geometry", "2dsphere")])    # geo
-        await _coll.create_index([("data_hora_gmt", 1)])        # data
+    # tipos ignorados porque mypy não entende o guard anterior
+    return _db, _coll  # type: ignore[return-value]
 
-        log.info("mongo.connected",
-                 db=settings.mongodb_db,
-                 coll=settings.mongodb_coll
-        )
+async def get_mongo_read() -> Tuple[AsyncIOMotorDatabase, AsyncIOMotorCollection]:
+    """
+    (db, coll) do cliente de leitura dos routers de consulta: pool próprio, para
+    um backfill não disputar conexões com os dashboards. Usa MONGODB_READ_URI
+    (ou MONGODB_URI). Com MONGODB_SPLIT_CLIENTS=false reaproveita o cliente de
+    escrita, só trocando a readPreference da coleção.
+    """
+    global _read_client, _read_db, _read_coll
 
-    # tipos ignorados porque mypy não entende o guard anterior
-    return _db, _coll  # type: ignore[return-value]
\ No newline at end of file
+    if _read_coll is not None:
+        return _read_db, _read_coll  # type: ignore[return-value]
+
+    db, coll = await get_mongo()    # índices/ping garantidos pelo cliente principal
+    async with _read_lock:
+        if _read_coll is None:
+            if not settings.mongodb_split_clients:
+                _read_db, _read_coll = db, coll.with_options(read_preference=_read_preference(settings.mongodb_read_preference))
+            else:
+                client = _build_client("read", settings.mongodb_read_uri or settings.mongodb_uri)  # type: ignore[arg-type]
+                try:
+                    await client.admin.command("ping")
+                except BaseException:
+                    client.close()
+                    raise
+                _read_client = client
+                _read_db = client[settings.mongodb_db]
+                _read_coll = _read_db[settings.mongodb_coll]
+
+    return _read_db, _read_coll  # type: ignore[return-value]
+
+async def warm_pools(connections: int) -> dict[str, int]:
+    """
+    Abre `connections` conexões em cada pool com pings concorrentes
+    (cada operação simultânea faz checkout de uma conexão própria).
+    """
+    await get_mongo_read()
+    pools = {"write": (_mongo_client, settings.mongodb_write_max_pool)}
+    if _read_client is not None:
+        pools["read"] = (_read_client, settings.mongodb_read_max_pool)
+    opened = {}
+    for role, (client, max_pool) in pools.items():
+        n = min(connections, max_pool)
+        await asyncio.gather(*(client.admin.command("ping") for _ in range(n)))  # type: ignore[union-attr]
+        opened[role] = n
+    return opened
+
+def _read_preference(name: str) -> read_preferences._ServerMode:
+    return read_preferences.make_read_preference(read_preferences.read_pref_mode_from_name(name), None)
+
+def close_mongo() -> None:
+    """Fecha os clientes (shutdown)."""
+    global _mongo_client, _db, _coll, _read_client, _read_db, _read_coll
+    for client in (_read_client, _mongo_client):
+        if client is not None:
+            client.close()
+    _mongo_client = _db = _coll = None
+    _read_client = _read_db = _read_coll = None
@@ -1,27 +1,79 @@
 # app/deps.py
 from __future__ import annotations
 from typing import Annotated, Tuple
-from fastapi import Depends
+from fastapi import Depends, HTTPException
 from motor.motor_asyncio import AsyncIOMotorDatabase, AsyncIOMotorCollection, AsyncIOMotorClient
 from pymongo.server_api import ServerApi
 
 from ..core.config import settings
 from ..repositories.mongo_repo import MongoRepository
+from ..repositories.events_repo import MongoEventRepository
+from ..repositories.reports_repo import MongoReconcileReportRepository, SqliteReconcileReportRepository
+from ..repositories.jobs_repo import MongoJobRepository, SqliteJobRepository
+from ..repositories.sqlite_repo import sqlite_repo
 from ..services.wfs_service import WfsFireSource
-from ..services.protocols import Repository, FireSource
-from .db import get_mongo
+from ..services.protocols import Repository, FireSource, EventRepository, ReconcileReportRepository, JobRepository
+from .db import get_mongo, get_mongo_read
 
 MongoDep = Annotated[Tuple[AsyncIOMotorDatabase, AsyncIOMotorCollection], Depends(get_mongo)]
+MongoReadDep = Annotated[Tuple[AsyncIOMotorDatabase, AsyncIOMotorCollection], Depends(get_mongo_read)]
 
-def get_repo(mongo: MongoDep) -> Repository:
+def _mongo_repo(coll: AsyncIOMotorCollection) -> Repository:
+    return MongoRepository(
+        coll,
+        lean=settings.mongodb_lean_reads,
+        batch_size=settings.mongodb_batch_size,
+    )
+
+async def get_repo() -> Repository:
+    """Repositório de focos da ingestão: Mongo (cliente de escrita) ou SQLite (REPO_BACKEND=sqlite)."""
+    if settings.repo_backend == "sqlite":
+        return sqlite_repo()
+    _, coll = await get_mongo()
+    return _mongo_repo(coll)
+
+async def get_read_repo() -> Repository:
+    """Repositório dos routers de consulta (cliente de leitura, readPreference configurável)."""
+    if settings.repo_backend == "sqlite":
+        return sqlite_repo()
+    _, coll = await get_mongo_read()
+    return _mongo_repo(coll)
+
+def get_events_repo(mongo: MongoDep) -> EventRepository:
     db, coll = mongo
-    return MongoRepository(coll)
+    return MongoEventRepository(db[settings.mongodb_events_coll], coll)
+
+async def get_read_events_repo() -> EventRepository:
+    """Eventos (agrupamento só existe no Mongo): 503 com REPO_BACKEND=sqlite, como /jobs desligado."""
+    if settings.repo_backend != "mongo":
+        raise HTTPException(status_code=503, detail="events require REPO_BACKEND=mongo")
+    return get_events_repo(await get_mongo_read())
+
+async def get_reports_repo() -> ReconcileReportRepository:
+    """
+    Relatórios de reconciliação: tabela no SQLITE_PATH (REPO_BACKEND=sqlite) ou
+    coleção Mongo (cliente de escrita: a listagem enxerga o que acabou de ser gravado).
+    """
+    if settings.repo_backend == "sqlite":
+        return SqliteReconcileReportRepository(settings.sqlite_path)
+    db, _ = await get_mongo()
+    return MongoReconcileReportRepository(db[settings.mongodb_reconcile_coll])
+
+async def get_jobs_repo() -> JobRepository:
+    """Estado dos jobs de ingestão: coleção Mongo ou tabela no SQLITE_PATH (REPO_BACKEND=sqlite)."""
+    if settings.repo_backend == "sqlite":
+        return SqliteJobRepository(settings.sqlite_path)
+    db, _ = await get_mongo()
+    return MongoJobRepository(db[settings.mongodb_jobs_coll])
 
 async def get_fire_source() -> FireSource:
     return WfsFireSource()
 
 RepoDep = Annotated[Repository, Depends(get_repo)]
 FireDep = Annotated[FireSource, Depends(get_fire_source)]
+ReadRepoDep = Annotated[Repository, Depends(get_read_repo)]
+EventRepoDep = Annotated[EventRepository, Depends(get_read_events_repo)]
+ReportsRepoDep = Annotated[ReconcileReportRepository, Depends(get_reports_repo)]
 
 # Exemplo de “Session” dependência arbitrária para seu caso:
 class RequestSession:
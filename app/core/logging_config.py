@@ -1,9 +1,109 @@
 # app/logging_config.py
+import atexit
 import logging
 import os
+import queue
+import random
+import sys
+import time
+from logging.handlers import QueueHandler, QueueListener
+
 import structlog
 from structlog.contextvars import merge_contextvars
 
+_listener: QueueListener | None = None
+_handler: "DroppingQueueHandler | None" = None
+_sampler: "EventSampler | None" = None
+
+def _parse_map(raw: str) -> dict[str, float]:
+    """`evento=valor,evento=valor` -> {evento: valor} (entradas inválidas são ignoradas)."""
+    out: dict[str, float] = {}
+    for item in raw.split(","):
+        name, _, value = item.partition("=")
+        try:
+            out[name.strip()] = float(value)
+        except ValueError:
+            continue
+    return out
+
+class EventSampler:
+    """
+    Processador structlog: amostragem (LOG_SAMPLE) e limite por segundo
+    (LOG_RATE_LIMIT) por nome de evento. WARNING ou acima sempre passa.
+
+    O evento que passa carrega `sample_rate` (para reescalar contagens) e
+    `suppressed` (quantos do mesmo nome foram descartados pelo limite desde o
+    último emitido). Chamado de várias threads; contagens sem lock (aproximadas).
+    """
+    ALWAYS = frozenset({"warning", "error", "critical", "exception"})
+
+    def __init__(self, sample: dict[str, float], rate_limit: dict[str, float]) -> None:
+        self.sample = sample
+        self.rate_limit = rate_limit
+        self._windows: dict[str, list] = {}     # evento -> [segundo, emitidos, suprimidos]
+        self.dropped = 0
+
+    def __call__(self, logger, method_name, event_dict):
+        if method_name in self.ALWAYS:
+            return event_dict
+        event = event_dict.get("event")
+        rate = self.sample.get(event)
+        if rate is not None and rate < 1.0:
+            if random.random() >= rate:
+                self.dropped += 1
+                raise structlog.DropEvent
+            event_dict["sample_rate"] = rate
+        limit = self.rate_limit.get(event)
+        if limit is not None:
+            now = int(time.monotonic())
+            w = self._windows.get(event)
+            if w is None or w[0] != now:
+                w = self._windows[event] = [now, 0, w[2] if w else 0]
+            if w[1] >= limit:
+                w[2] += 1
+                self.dropped += 1
+                raise structlog.DropEvent
+            w[1] += 1
+            if w[2]:
+                event_dict["suppressed"], w[2] = w[2], 0
+        return event_dict
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler com fila limitada que nunca bloqueia quem loga (event loop).
+    Fila cheia: INFO/DEBUG novos são descartados; WARNING ou acima tiram o
+    registro mais antigo da fila para entrar.
+
+    Não formata no `prepare`: o evento segue como dict e o JSON é renderizado
+    na thread do QueueListener.
+    """
+    def __init__(self, q: queue.Queue) -> None:
+        super().__init__(q)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+        self.dropped += 1
+        if record.levelno < logging.WARNING:
+            return
+        try:
+            self.queue.get_nowait()
+            self.queue.put_nowait(record)
+        except (queue.Empty, queue.Full):
+            pass
+
+class _Listener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # fila cheia no stop: espera a thread abrir espaço em vez de levantar queue.Full
+        self.queue.put(self._sentinel, timeout=5)
+
 def setup_logging():
     """
     Inicializa logging + structlog em JSON.
@@ -11,24 +111,49 @@ def setup_logging():
     - Usa LOG_LEVEL (default INFO).
     - Habilita processadores do structlog (timestamp, stack info, exc info).
     - `merge_contextvars` injeta contextvars (ex.: request_id) nos logs.
+    - Escrita fora do event loop: o evento vai para uma fila limitada
+      (LOG_QUEUE_SIZE) e uma thread (QueueListener) renderiza o JSON e escreve
+      em stderr; com a fila cheia, descarta em vez de bloquear.
+    - LOG_SAMPLE / LOG_RATE_LIMIT: amostragem e limite/s por evento frequente.
     """
+    global _listener, _handler, _sampler
+    first = _handler is None
     # nível via env (INFO padrão)
     log_level = os.getenv("LOG_LEVEL", "INFO").upper()
 
-    # integra logging padrão do Python com structlog
-    logging.basicConfig(
-        level=log_level,
-        format="%(message)s",
+    sampler = _sampler = EventSampler(
+        _parse_map(os.getenv("LOG_SAMPLE", "")),
+        _parse_map(os.getenv("LOG_RATE_LIMIT", "wfs.response=20,wfs.request.range=20")),
     )
 
+    # stderr <- thread do listener <- fila limitada <- logging padrão (e structlog)
+    if _listener is not None:
+        _listener.stop()
+    stream = logging.StreamHandler(sys.stderr)
+    stream.setFormatter(structlog.stdlib.ProcessorFormatter(
+        processor=structlog.processors.JSONRenderer(),   # saída JSON
+        foreign_pre_chain=[
+            structlog.processors.add_log_level,
+            structlog.processors.TimeStamper(fmt="iso"),
+        ],
+    ))
+    handler = _handler = DroppingQueueHandler(queue.Queue(maxsize=int(os.getenv("LOG_QUEUE_SIZE", "10000"))))
+    _listener = _Listener(handler.queue, stream, respect_handler_level=False)
+    _listener.start()
+
+    root = logging.getLogger()
+    root.handlers[:] = [handler]
+    root.setLevel(log_level)
+
     structlog.configure(
         processors=[
             merge_contextvars,                      # <- junta contextvars no evento
             structlog.processors.add_log_level,
+            sampler,
             structlog.processors.TimeStamper(fmt="iso"),
             structlog.processors.StackInfoRenderer(),
             structlog.processors.format_exc_info,
-            structlog.processors.JSONRenderer(),   # saída JSON
+            structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
         wrapper_class=structlog.make_filtering_bound_logger(
             getattr(logging, log_level, logging.INFO)
@@ -38,6 +163,27 @@ def setup_logging():
         cache_logger_on_first_use=True,
     )
 
+    if first:
+        from .metrics import REGISTRY     # import tardio: metrics não depende de logging
+        REGISTRY.gauge("inpe_log_queue_depth", "Eventos de log aguardando escrita.", fn=lambda: _handler.queue.qsize())
+        REGISTRY.gauge("inpe_log_dropped", "Eventos de log descartados (fila cheia), acumulado.", fn=lambda: _handler.dropped)
+        REGISTRY.gauge("inpe_log_suppressed", "Eventos de log descartados por amostragem/limite, acumulado.", fn=lambda: _sampler.dropped)
+
+def logging_running() -> bool:
+    return _listener is not None
+
+def shutdown_logging():
+    """
+    Esvazia a fila e para a thread de escrita: fim do lifespan da API, `finally`
+    do `cli.main` e atexit (rede de segurança). `setup_logging` religa.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
 def get_logger():
     """
     Retorna um logger do structlog já configurado.
@@ -0,0 +1,90 @@
+# app/core/metrics.py
+"""
+Métricas da aplicação (expostas em /metrics) e middleware de latência por rota.
+
+Instrumentos dos caminhos quentes ficam aqui; gauges lidos na coleta
+(estado do breaker, assinantes do push, linhas do snapshot...) são
+registrados pelos próprios módulos com `REGISTRY.gauge(..., fn=...)`.
+"""
+from __future__ import annotations
+from time import perf_counter
+
+from ..utils.metrics import Registry
+
+REGISTRY = Registry()
+
+SIZE_BUCKETS = (1e3, 1e4, 1e5, 2.5e5, 5e5, 1e6, 2.5e6, 5e6, 1e7, 5e7)
+COUNT_BUCKETS = (0, 1, 10, 50, 100, 250, 500, 1000, 2000, 5000, 10000)
+
+# ---------- WFS ----------
+WFS_REQUEST_SECONDS = REGISTRY.histogram(
+    "inpe_wfs_request_seconds", "Latência de cada GET ao WFS (por tentativa).", ("layer", "outcome"),
+)
+WFS_PAGE_BYTES = REGISTRY.histogram(
+    "inpe_wfs_page_bytes", "Tamanho do corpo de cada página WFS.", ("layer",), buckets=SIZE_BUCKETS,
+)
+WFS_PAGE_FEATURES = REGISTRY.histogram(
+    "inpe_wfs_page_features", "Features por página WFS.", ("layer",), buckets=COUNT_BUCKETS,
+)
+WFS_RETRIES = REGISTRY.counter(
+    "inpe_wfs_retries_total", "Novas tentativas de GET ao WFS após falha.", ("layer",),
+)
+
+# ---------- Mongo ----------
+MONGO_BULK_SECONDS = REGISTRY.histogram(
+    "inpe_mongo_bulk_write_seconds", "Latência de cada bulk_write de upsert.",
+)
+MONGO_BULK_DOCS = REGISTRY.counter(
+    "inpe_mongo_bulk_docs_total", "Documentos por resultado do bulk_write.", ("result",),
+)
+
+# ---------- Ingestão ----------
+INGEST_STAGE_SECONDS = REGISTRY.histogram(
+    "inpe_ingest_stage_seconds",
+    "Tempo por etapa de uma execução de ingestão (fetch, transform, write, hooks).",
+    ("mode", "stage"),
+    buckets=(0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600),
+)
+INGEST_DOCS = REGISTRY.counter(
+    "inpe_ingest_docs_total", "Documentos gravados pela ingestão.", ("mode",),
+)
+INGEST_RUNS = REGISTRY.counter(
+    "inpe_ingest_runs_total", "Execuções de ingestão por resultado.", ("mode", "status"),
+)
+
+# ---------- HTTP ----------
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "inpe_http_request_seconds",
+    "Latência até o início da resposta, por rota (template) e status.",
+    ("method", "route", "status"),
+)
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI puro (sem BaseHTTPMiddleware): mede até o
+    `http.response.start` (time-to-first-byte), o que mantém SSE/streaming
+    com valores significativos. A rota é o template (`/data/find`), não o path.
+    """
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        t0 = perf_counter()
+        recorded = False
+
+        async def _send(message):
+            nonlocal recorded
+            if message["type"] == "http.response.start" and not recorded:
+                recorded = True
+                route = scope.get("route")
+                HTTP_REQUEST_SECONDS.labels(
+                    scope["method"],
+                    getattr(route, "path", "unmatched"),
+                    str(message["status"]),
+                ).observe(perf_counter() - t0)
+            await send(message)
+
+        await self.app(scope, receive, _send)
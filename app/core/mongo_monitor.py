@@ -0,0 +1,248 @@
+# app/core/mongo_monitor.py
+"""
+Monitoramento de comandos do Mongo (pymongo `CommandListener`).
+
+Para cada comando de leitura/escrita registra duração, documentos devolvidos e
+o *formato* normalizado da consulta (valores trocados por "?", operadores e
+campos preservados), para descobrir quais filtros deixam `/data/find` lento.
+
+Custo: no `started` guarda só uma referência ao comando (sem copiar); a
+normalização acontece apenas nos comandos amostrados (MONGO_MONITOR_SAMPLE_RATE)
+e nos lentos (>= MONGO_SLOW_MS, sempre registrados). Os eventos chegam das
+threads do executor do Motor, que copia o contexto: o `request_id` ligado pelo
+middleware está disponível aqui.
+"""
+from __future__ import annotations
+import random
+import threading
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Deque, Dict, List, Mapping, Optional, Tuple
+
+from pymongo import monitoring
+from structlog.contextvars import get_contextvars
+
+from .config import settings
+from .logging_config import get_logger
+from .metrics import REGISTRY
+
+log = get_logger()
+
+# comandos que interessam (handshake, ping, endSessions etc. ficam de fora)
+WATCHED = frozenset({
+    "find", "getMore", "aggregate", "count", "distinct",
+    "insert", "update", "delete", "findAndModify", "createIndexes",
+})
+# chave do comando com a parte "filtro" de cada tipo
+_FILTER_KEYS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+_MAX_SHAPES = 500
+
+MONGO_SLOW_OPS = REGISTRY.counter(
+    "inpe_mongo_slow_ops_total", "Comandos Mongo acima de MONGO_SLOW_MS.", ("command",),
+)
+
+def _shape(value: Any, depth: int = 0) -> Any:
+    """Troca valores por "?" preservando campos/operadores; listas viram um único elemento."""
+    if depth > 8:
+        return "?"
+    if isinstance(value, Mapping):
+        return {k: _shape(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if not value:
+            return []
+        first = value[0]
+        # $in/$nin com escalares: o tamanho da lista não muda o formato
+        if not isinstance(first, (Mapping, list, tuple)):
+            return ["?"]
+        return [_shape(v, depth + 1) for v in value]
+    return "?"
+
+def _compact(value: Any) -> str:
+    if isinstance(value, Mapping):
+        return "{" + ",".join(f"{k}:{_compact(v)}" for k, v in value.items()) + "}"
+    if isinstance(value, list):
+        return "[" + ",".join(_compact(v) for v in value) + "]"
+    return str(value)
+
+def query_shape(name: str, cmd: Mapping[str, Any]) -> str:
+    """Formato normalizado, ex.: `find focos filter={estado:?,data_hora_gmt:{$gte:?}} sort={data_hora_gmt:?}`."""
+    coll = cmd.get(name)
+    parts = [name, str(coll)]
+    if name == "aggregate":
+        parts.append("pipeline=" + _compact(_shape(cmd.get("pipeline") or [])))
+    elif name in ("update", "delete"):
+        ops = cmd.get("updates" if name == "update" else "deletes") or []
+        if ops:
+            parts.append("q=" + _compact(_shape(ops[0].get("q") or {})))
+            parts.append(f"n={len(ops)}")
+    elif name == "insert":
+        parts.append(f"n={len(cmd.get('documents') or [])}")
+    else:
+        key = _FILTER_KEYS.get(name)
+        if key and cmd.get(key):
+            parts.append(f"{key}=" + _compact(_shape(cmd[key])))
+        if cmd.get("sort"):
+            parts.append("sort=" + _compact(_shape(cmd["sort"])))
+        if name == "distinct":
+            parts.append(f"key={cmd.get('key')}")
+    return " ".join(parts)
+
+def _docs_returned(name: str, reply: Mapping[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, Mapping):
+        batch = cursor.get("firstBatch", cursor.get("nextBatch"))
+        return len(batch) if batch is not None else 0
+    if name == "distinct":
+        return len(reply.get("values") or [])
+    return int(reply.get("n", 0) or 0)
+
+@dataclass
+class ShapeStats:
+    command: str
+    count: int = 0
+    slow: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    docs: int = 0
+    last_request_id: Optional[str] = None
+    last_seen: Optional[str] = None
+
+    def as_dict(self, shape: str) -> Dict[str, Any]:
+        return {
+            "shape": shape,
+            "command": self.command,
+            "count": self.count,
+            "slow": self.slow,
+            "avg_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "max_ms": round(self.max_ms, 3),
+            "total_ms": round(self.total_ms, 3),
+            "avg_docs": round(self.docs / self.count, 1) if self.count else None,
+            "last_request_id": self.last_request_id,
+            "last_seen": self.last_seen,
+        }
+
+class CommandMonitor(monitoring.CommandListener):
+    """
+    Agrega por formato de consulta (amostrado) e guarda os últimos comandos
+    lentos (todos). `getMore` é agregado como `getMore <formato do find/aggregate de origem>`.
+    """
+    def __init__(self, slow_ms: float = 100.0, sample_rate: float = 0.1, recent_slow: int = 200) -> None:
+        self.slow_ms = slow_ms
+        self.sample_rate = sample_rate
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[Any, int], Tuple[str, Mapping[str, Any], Optional[str]]] = {}
+        self._cursors: Dict[int, Tuple[str, Mapping[str, Any]]] = {}   # cursor id -> comando de origem
+        self.shapes: Dict[str, ShapeStats] = {}
+        self.recent: Deque[Dict[str, Any]] = deque(maxlen=recent_slow)
+
+    # ---------- CommandListener ----------
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        if event.command_name not in WATCHED:
+            return
+        rid = get_contextvars().get("request_id")
+        with self._lock:
+            self._pending[(event.connection_id, event.request_id)] = (event.command_name, event.command, rid)
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._finish(event, event.reply, failed=False)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        self._finish(event, None, failed=True)
+
+    # ---------- agregação ----------
+    def _finish(self, event, reply: Optional[Mapping[str, Any]], failed: bool) -> None:
+        with self._lock:
+            pending = self._pending.pop((event.connection_id, event.request_id), None)
+        if pending is None:
+            return
+        name, cmd, rid = pending
+        ms = event.duration_micros / 1000.0
+        slow = ms >= self.slow_ms
+        cursor_id = _cursor_id(reply) if reply is not None else 0
+        if name == "getMore":
+            with self._lock:
+                origin = (self._cursors.get if cursor_id else self._cursors.pop)(cmd.get("getMore"), None)
+        elif cursor_id:
+            # o getMore herda o formato: guarda só a referência do comando de origem
+            self._remember_cursor(cursor_id, name, cmd)
+        if not slow and random.random() >= self.sample_rate:
+            return
+
+        if name == "getMore":
+            shape = f"getMore {query_shape(*origin)}" if origin else f"getMore {cmd.get('collection')}"
+        else:
+            shape = query_shape(name, cmd)
+        docs = _docs_returned(name, reply) if reply is not None else 0
+        now = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+        with self._lock:
+            st = self.shapes.get(shape)
+            if st is None:
+                if len(self.shapes) >= _MAX_SHAPES:
+                    self._evict()
+                st = self.shapes[shape] = ShapeStats(command=name)
+            st.count += 1
+            st.total_ms += ms
+            st.max_ms = max(st.max_ms, ms)
+            st.docs += docs
+            st.last_request_id = rid
+            st.last_seen = now
+            if slow:
+                st.slow += 1
+                self.recent.append({
+                    "at": now, "command": name, "shape": shape, "ms": round(ms, 3),
+                    "docs": docs, "failed": failed, "request_id": rid,
+                })
+        if slow:
+            MONGO_SLOW_OPS.labels(name).inc()
+            log.warning("mongo.slow_op", command=name, shape=shape, ms=round(ms, 3),
+                        docs=docs, failed=failed, request_id=rid)
+
+    def _remember_cursor(self, cursor_id: int, name: str, cmd: Mapping[str, Any]) -> None:
+        with self._lock:
+            if len(self._cursors) > 10_000:
+                self._cursors.clear()      # cursores abandonados: melhor perder formato que crescer sem limite
+            self._cursors[cursor_id] = (name, cmd)
+
+    def _evict(self) -> None:
+        # descarta o formato com menor tempo acumulado (sob self._lock)
+        victim = min(self.shapes, key=lambda s: self.shapes[s].total_ms)
+        del self.shapes[victim]
+
+    # ---------- leitura ----------
+    def top(self, n: int = 20, by: str = "total_ms") -> List[Dict[str, Any]]:
+        with self._lock:
+            items = list(self.shapes.items())
+        key = {
+            "total_ms": lambda kv: kv[1].total_ms,
+            "max_ms": lambda kv: kv[1].max_ms,
+            "slow": lambda kv: (kv[1].slow, kv[1].total_ms),
+            "avg_ms": lambda kv: kv[1].total_ms / kv[1].count if kv[1].count else 0.0,
+        }[by]
+        items.sort(key=key, reverse=True)
+        return [st.as_dict(shape) for shape, st in items[:n]]
+
+    def slow_ops(self, request_id: Optional[str] = None, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            ops = list(self.recent)
+        if request_id:
+            ops = [o for o in ops if o["request_id"] == request_id]
+        return ops[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self.shapes.clear()
+            self.recent.clear()
+            self._cursors.clear()
+
+def _cursor_id(reply: Mapping[str, Any]) -> int:
+    cursor = reply.get("cursor")
+    if isinstance(cursor, Mapping):
+        return int(cursor.get("id") or 0)
+    return 0
+
+command_monitor = CommandMonitor(
+    slow_ms=settings.mongo_slow_ms,
+    sample_rate=settings.mongo_monitor_sample_rate,
+)
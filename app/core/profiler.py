@@ -0,0 +1,205 @@
+# app/core/profiler.py
+"""
+Profiler por amostragem, sob demanda, para uma requisição.
+
+Desligado por padrão (PROFILE_ENABLED). Ativado pelo cabeçalho PROFILE_HEADER
+trazendo PROFILE_TOKEN (sem token configurado o cabeçalho é ignorado) ou
+por amostragem (PROFILE_SAMPLE_RATE) nas rotas de PROFILE_PATHS. Uma thread
+lê `sys._current_frames()` da thread do event loop a cada PROFILE_INTERVAL_MS:
+
+- se a pilha do loop passa pelo frame deste middleware, a requisição está
+  *rodando* (CPU no loop, inclusive chamadas bloqueantes): conta a pilha;
+- senão ela está *esperando* (I/O, executor, ou o loop ocupado com outra
+  tarefa): conta o ponto de `await` onde a corrotina está suspensa.
+
+Sem instrumentar funções, o custo fica na thread amostradora e só existe nas
+requisições perfiladas. O resumo (pilhas mais frequentes, rodando x esperando)
+vai para o log `profile.summary` e fica guardado para download em
+`/data/debug/profiles/{id}` (inclusive no formato "collapsed" de flamegraph).
+"""
+from __future__ import annotations
+import asyncio
+import hmac
+import os
+import random
+import sys
+import threading
+from collections import Counter, OrderedDict
+from time import perf_counter
+from types import FrameType
+from typing import Any, Dict, List, Optional, Tuple
+
+from .config import settings
+from .logging_config import get_logger
+
+log = get_logger()
+
+_MAX_DEPTH = 64
+
+def _label(frame: FrameType) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{getattr(code, 'co_qualname', code.co_name)}"
+
+def _running_stack(top: Optional[FrameType], marker: FrameType) -> Optional[Tuple[str, ...]]:
+    """Pilha (raiz -> folha) acima do `marker`, ou None se o marker não está na pilha."""
+    labels: List[str] = []
+    f = top
+    while f is not None:
+        if f is marker:
+            return tuple(reversed(labels[-_MAX_DEPTH:]))
+        labels.append(_label(f))
+        f = f.f_back
+    return None
+
+def _await_stack(coro: Any, marker: FrameType) -> Tuple[str, ...]:
+    """Cadeia de corrotinas suspensas (cr_await) abaixo do `marker`, até o ponto onde a tarefa espera."""
+    labels: List[str] = []
+    obj = coro
+    try:
+        while obj is not None and len(labels) < _MAX_DEPTH:
+            frame = getattr(obj, "cr_frame", None) or getattr(obj, "gi_frame", None) or getattr(obj, "ag_frame", None)
+            if frame is None:
+                if labels:
+                    labels.append(f"<{type(obj).__name__}>")    # Future/Task no fim da cadeia
+                break
+            if frame is marker:
+                labels.clear()      # o que vem antes (servidor, middlewares externos) é igual em todo perfil
+            else:
+                labels.append(_label(frame))
+            obj = getattr(obj, "cr_await", None) or getattr(obj, "gi_yieldfrom", None) or getattr(obj, "ag_await", None)
+    except Exception:       # leitura de outra thread: a cadeia pode mudar no meio
+        pass
+    return tuple(labels)
+
+class RequestProfile:
+    def __init__(self, profile_id: str, method: str, path: str, interval_s: float) -> None:
+        self.profile_id = profile_id
+        self.method = method
+        self.path = path
+        self.interval_s = interval_s
+        self.running: Counter = Counter()
+        self.waiting: Counter = Counter()
+        self.samples = 0
+        self.duration_ms = 0.0
+        self.status: Optional[int] = None
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        n_run, n_wait = sum(self.running.values()), sum(self.waiting.values())
+        ms_per = self.duration_ms / self.samples if self.samples else 0.0
+        return {
+            "id": self.profile_id,
+            "method": self.method,
+            "path": self.path,
+            "status": self.status,
+            "duration_ms": round(self.duration_ms, 2),
+            "samples": self.samples,
+            "interval_ms": self.interval_s * 1000,
+            "running_ms": round(n_run * ms_per, 2),
+            "waiting_ms": round(n_wait * ms_per, 2),
+            "running_pct": round(100 * n_run / self.samples, 1) if self.samples else None,
+            "top_running": [{"stack": ";".join(s), "samples": c} for s, c in self.running.most_common(top)],
+            "top_waiting": [{"stack": ";".join(s), "samples": c} for s, c in self.waiting.most_common(top)],
+        }
+
+    def collapsed(self) -> str:
+        """Formato "collapsed" (flamegraph.pl / speedscope): `pilha;...;folha N` por linha."""
+        lines = [f"running;{';'.join(s)} {c}" for s, c in self.running.items()]
+        lines += [f"waiting;{';'.join(s) or '?'} {c}" for s, c in self.waiting.items()]
+        return "\n".join(lines) + "\n"
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: RequestProfile, loop_thread: int, marker: FrameType, task: Optional[asyncio.Task]) -> None:
+        super().__init__(name=f"profiler-{profile.profile_id}", daemon=True)
+        self.profile = profile
+        self.loop_thread = loop_thread
+        self.marker = marker
+        self.task = task
+        self._stop_evt = threading.Event()
+
+    def run(self) -> None:
+        p = self.profile
+        while not self._stop_evt.wait(p.interval_s):
+            top = sys._current_frames().get(self.loop_thread)
+            stack = _running_stack(top, self.marker)
+            p.samples += 1
+            if stack is not None:
+                p.running[stack] += 1
+            else:
+                p.waiting[_await_stack(self.task.get_coro(), self.marker) if self.task else ()] += 1
+            del top
+
+    def stop(self) -> None:
+        self._stop_evt.set()
+        self.join()
+
+class ProfileStore:
+    """Últimos perfis (por id), para download."""
+    def __init__(self, size: int = 50) -> None:
+        self.size = size
+        self._items: "OrderedDict[str, RequestProfile]" = OrderedDict()
+
+    def add(self, profile: RequestProfile) -> None:
+        self._items[profile.profile_id] = profile
+        while len(self._items) > self.size:
+            self._items.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._items.get(profile_id)
+
+    def list(self) -> List[Dict[str, Any]]:
+        return [
+            {"id": p.profile_id, "method": p.method, "path": p.path, "status": p.status,
+             "duration_ms": round(p.duration_ms, 2), "samples": p.samples}
+            for p in reversed(self._items.values())
+        ]
+
+profile_store = ProfileStore(settings.profile_store_size)
+
+class ProfilerMiddleware:
+    """
+    Middleware ASGI puro. Fica dentro do RequestIdMiddleware: o id do perfil é o
+    `request_id` (devolvido também em `x-profile-id`).
+    """
+    def __init__(self, app) -> None:
+        self.app = app
+        self.header = settings.profile_header.lower().encode("latin-1")
+        self.active = 0
+
+    def _wanted(self, scope) -> bool:
+        if self.active >= settings.profile_max_concurrent:
+            return False
+        token = settings.profile_token
+        if token:
+            for name, value in scope.get("headers") or ():
+                if name == self.header:
+                    return hmac.compare_digest(value, token.encode())   # bytes: aceita cabeçalho não-ASCII
+        rate = settings.profile_sample_rate
+        if rate > 0 and scope["path"].startswith(tuple(settings.profile_paths)):
+            return random.random() < rate
+        return False
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+        pid = scope.get("state", {}).get("request_id") or os.urandom(8).hex()
+        profile = RequestProfile(pid, scope["method"], scope["path"], settings.profile_interval_ms / 1000.0)
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message = {**message, "headers": [*message.get("headers", []), (b"x-profile-id", pid.encode("latin-1"))]}
+            await send(message)
+
+        sampler = _Sampler(profile, threading.get_ident(), sys._getframe(), asyncio.current_task())
+        self.active += 1
+        t0 = perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            profile.duration_ms = (perf_counter() - t0) * 1000
+            sampler.stop()     # o wait() da thread acorda no set(): join imediato
+            self.active -= 1
+            profile_store.add(profile)
+            log.info("profile.summary", **profile.summary(top=5))
@@ -0,0 +1,40 @@
+# app/core/request_id.py
+"""
+Correlação por requisição: lê `x-request-id` (ou gera um) e o liga nas
+contextvars do structlog durante a requisição. Logs (`merge_contextvars`) e o
+monitor de comandos do Mongo enxergam o mesmo `request_id`; a resposta o
+devolve no cabeçalho `x-request-id`.
+"""
+from __future__ import annotations
+import uuid
+
+from structlog.contextvars import bound_contextvars
+
+HEADER = b"x-request-id"
+
+class RequestIdMiddleware:
+    """Middleware ASGI puro (HTTP e WebSocket)."""
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+        rid = None
+        for name, value in scope.get("headers") or ():
+            if name == HEADER:
+                rid = value.decode("latin-1")[:128]
+                break
+        rid = rid or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = rid
+
+        async def _send(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers") or [])
+                headers.append((HEADER, rid.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        with bound_contextvars(request_id=rid):
+            await self.app(scope, receive, _send)
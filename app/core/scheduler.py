@@ -3,7 +3,9 @@ from apscheduler.triggers.cron import CronTrigger
 
 from .config import settings
 from .logging_config import get_logger
-from ..api.v1.routers.ingest import run_incremental
+from ..services.layers import layer_runner
+from ..services.reconcile import reconcile_scheduled
+from ..services.archive import archive_scheduled
 
 scheduler: AsyncIOScheduler | None = None
 log = get_logger()
@@ -12,20 +14,55 @@ def start_scheduler(app):
     """
     Inicia o scheduler (APScheduler) uma única vez por processo.
 
-    - Lê a expressão cron de `settings.schedule_cron` (formato 5 campos: m h dom mon dow).
-    - Agenda a tarefa de sincronização incremental (`run_incremental`) de tempos em tempos.
+    - Um job por camada do registro (WFS_LAYERS) que tenha `schedule` (cron de
+      5 campos: m h dom mon dow); sem WFS_LAYERS, a camada "incremental" usa
+      `settings.schedule_cron`.
+    - RECONCILE_CRON: reconciliação WFS x Mongo das camadas `range`.
+    - ARCHIVE_CRON: exportação dos meses fechados para o arquivo Parquet.
+    - `max_instances=1` + `coalesce`: disparos atrasados viram uma execução só;
+      o runner também ignora uma camada que já está sincronizando.
     """
     global scheduler
     if scheduler:
         return
     scheduler = AsyncIOScheduler()
-    # cron estilo "* */30 * * * *" (minuto, hora, dia...)
-    trig = CronTrigger.from_crontab(settings.schedule_cron)
-    # 👇 passe a função, não uma lambda que retorna coroutine
-    # scheduler.add_job(lambda: run_incremental(), trig, name="incremental-sync")
-    scheduler.add_job(run_incremental, trig, name="incremental-sync")
+    jobs = {}
+    for spec in layer_runner.select():
+        if not spec.schedule:
+            continue
+        # 👇 passe a função, não uma lambda que retorna coroutine
+        scheduler.add_job(
+            layer_runner.run_layer,
+            CronTrigger.from_crontab(spec.schedule),
+            args=[spec.name],
+            id=f"layer:{spec.name}",
+            name=f"sync-{spec.name}",
+            max_instances=1,
+            coalesce=True,
+        )
+        jobs[spec.name] = spec.schedule
+    if settings.reconcile_cron:
+        scheduler.add_job(
+            reconcile_scheduled,
+            CronTrigger.from_crontab(settings.reconcile_cron),
+            id="reconcile",
+            name="reconcile",
+            max_instances=1,
+            coalesce=True,
+        )
+        jobs["reconcile"] = settings.reconcile_cron
+    if settings.archive_cron:
+        scheduler.add_job(
+            archive_scheduled,
+            CronTrigger.from_crontab(settings.archive_cron),
+            id="archive",
+            name="archive-export",
+            max_instances=1,
+            coalesce=True,
+        )
+        jobs["archive"] = settings.archive_cron
     scheduler.start()
-    log.info("scheduler.started", cron=settings.schedule_cron)
+    log.info("scheduler.started", jobs=jobs)
 
 def stop_scheduler(app):
     """
@@ -1,7 +1,59 @@
 # app/main.py
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 
 from .api.v1.routers import api as api_v1
+from .api.v1.routers.health import metrics
+from .core.bootstrap import run_bootstrap
+from .core.config import settings
+from .core.db import close_mongo
+from .repositories.sqlite_repo import close_sqlite
+from .core.logging_config import get_logger, logging_running, setup_logging, shutdown_logging
+from .core.metrics import MetricsMiddleware
+from .core.profiler import ProfilerMiddleware
+from .core.request_id import RequestIdMiddleware
+from .core.scheduler import start_scheduler, stop_scheduler
+from .services.jobs import job_manager
+from .services.layers import layer_runner
+from .services.push import broadcaster
+from .services.transform_pool import close_transform_pool
+
+setup_logging()
+log = get_logger()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Bootstrap antes do tráfego: conecta, aquece pools e caches (ver core/bootstrap.py).
+    Passado BOOTSTRAP_TIMEOUT_S a aplicação sobe mesmo assim e o bootstrap continua
+    em segundo plano; /health/ready responde 503 até concluir.
+    """
+    if not logging_running():      # lifespan anterior no mesmo processo (testes) desligou
+        setup_logging()
+    task = None
+    if settings.bootstrap_enabled:
+        task = asyncio.create_task(run_bootstrap(), name="bootstrap")
+        try:
+            await asyncio.wait_for(asyncio.shield(task), settings.bootstrap_timeout_s)
+        except asyncio.TimeoutError:
+            log.warning("bootstrap.timeout", timeout_s=settings.bootstrap_timeout_s)
+    if settings.scheduler_enabled:
+        start_scheduler(app)
+    if settings.jobs_enabled and not await job_manager.ensure_started():
+        job_manager.start_in_background()
+    yield
+    stop_scheduler(app)
+    await job_manager.stop()
+    if task is not None and not task.done():
+        task.cancel()
+    await layer_runner.aclose()
+    await broadcaster.stop()
+    close_transform_pool()
+    close_mongo()
+    close_sqlite()
+    shutdown_logging()              # por último: descarrega o que os passos acima logaram
 
 
 
@@ -67,16 +119,32 @@ tags_metadata = [
     {"name": "Health", "description": "Service liveness/readiness."},
     {"name": "Ingestion", "description": "Ingest data from TerraBrasilis WFS (48h, etc)."},
     {"name": "Data", "description": "Query/Stats for stored focus documents."},
+    {"name": "Tiles", "description": "Mapbox Vector Tiles of fire detections."},
+    {"name": "Events", "description": "Fire events (detections clustered in space and time)."},
+    {"name": "Stream", "description": "Push of new detections (SSE / WebSocket)."},
+    {"name": "Reconciliation", "description": "WFS x Mongo count drift per window and targeted re-ingestion."},
+    {"name": "Jobs", "description": "Background ingestion jobs: queue, live progress, cancellation."},
+    {"name": "Archive", "description": "Cold tier: closed months in partitioned Parquet (export and analytical queries)."},
 ]
 
 app = FastAPI(
     title="INPE Sync API",
     version="1.0.0",
     openapi_tags=tags_metadata,
+    lifespan=lifespan,
     summary="Versioned API to ingest and query TerraBrasilis fire detections.",
 )
 
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if settings.profile_enabled:
+    app.add_middleware(ProfilerMiddleware)
+# por último = mais externo: request_id já ligado para tudo o que vem depois
+app.add_middleware(RequestIdMiddleware)
+
 app.include_router(api_v1, prefix="/api/v1")
+# caminho padrão do scrape do Prometheus (mesmo handler de /api/v1/health/metrics)
+app.add_api_route("/metrics", metrics, methods=["GET"], include_in_schema=False)
 
 # if __name__ == "__main__":
 #     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,7 +1,10 @@
 # app/models/schemas.py
 from __future__ import annotations
 from typing import Optional, Dict, Any, List, Literal, Annotated
-from pydantic import BaseModel, Field, field_validator, ConfigDict, conint, confloat
+from fastapi.exceptions import RequestValidationError
+from pydantic import BaseModel, Field, field_validator, ConfigDict, ValidationError, conint, confloat
+
+from ..utils.geo import parse_bbox
 
 class HealthResponse(BaseModel):
     ok: bool = True
@@ -52,6 +55,47 @@ class GeoJSONFeatureCollection(BaseModel):
     type: Literal["FeatureCollection"] = "FeatureCollection"
     features: List[GeoJSONFeature]
 
+class DensityCell(BaseModel):
+    cell: str = Field(..., description="Chave da célula (ix:iy)")
+    bbox: List[float] = Field(..., description="minLon,minLat,maxLon,maxLat da célula")
+    count: int = Field(..., ge=0)
+    frp_sum: float = 0.0
+
+class DensityResponse(BaseModel):
+    resolution: float
+    total: int
+    cells: List[DensityCell]
+
+class TimeSeriesPoint(BaseModel):
+    bucket: str = Field(..., description="Início do bucket: YYYY-MM-DDTHH (hour) ou YYYY-MM-DD (day/week)")
+    group: Dict[str, Optional[str]] = Field(default_factory=dict, description="Valores das dimensões de group_by")
+    count: int = Field(..., ge=0)
+    frp_sum: float = 0.0
+
+class TimeSeriesResponse(BaseModel):
+    interval: Literal["hour", "day", "week"]
+    group_by: List[str] = []
+    points: List[TimeSeriesPoint]
+
+class FireEventItem(BaseModel):
+    """Evento de fogo: focos agrupados por vizinhança espacial e temporal."""
+    id: str
+    centroid: Dict[str, Any] = Field(..., description="GeoJSON Point (média dos focos)")
+    extent: List[float] = Field(..., description="minLon,minLat,maxLon,maxLat dos focos")
+    first_seen: str
+    last_seen: str
+    count: int = Field(..., ge=1, description="Número de focos")
+    frp_max: Optional[float] = None
+    frp_sum: float = 0.0
+    satelites: List[str] = []
+    estado: Optional[str] = None
+    bioma: Optional[str] = None
+
+class FireEventListResponse(BaseModel):
+    total: int
+    returned: int
+    items: List[FireEventItem]
+
 class IngestResponse(BaseModel):
     status: str
     layer: Optional[str] = None
@@ -73,8 +117,178 @@ class IngestResponse(BaseModel):
         }
     }
 
+class LayerIngestResult(BaseModel):
+    """Resultado da sincronização de uma camada WFS."""
+    layer: str
+    typename: str
+    collection: str
+    status: Literal["ok", "error", "skipped"]
+    total_upserted: int = 0
+    range: Optional[list[str]] = None
+    last_seen: Optional[str] = None
+    chunks: int = Field(0, description="Fatias de data paginadas (1 na camada 48h)")
+    duration_ms: int = 0
+    error: Optional[str] = None
+
+class LayersIngestResponse(BaseModel):
+    status: Literal["ok", "partial", "error"]
+    total_upserted: int
+    duration_ms: int
+    results: List[LayerIngestResult]
+
+class LayerInfo(BaseModel):
+    """Camada do registro (WFS_LAYERS) e o resultado da última execução."""
+    name: str
+    typename: str
+    mode: Literal["48h", "range"]
+    collection: str
+    date_field: str
+    sortby: str
+    schedule: Optional[str] = None
+    concurrency: int
+    chunk_days: int
+    lookback_days: int
+    retention_hours: Optional[int] = None
+    enabled: bool
+    last: Optional[LayerIngestResult] = None
+
+class ReconcileWindow(BaseModel):
+    """Janela em que a contagem da fonte (WFS) diverge da do Mongo."""
+    window: List[str] = Field(..., description="[início, fim] ISO (inclusivos)")
+    wfs: int
+    mongo: int
+    mongo_after: Optional[int] = Field(None, description="Contagem no Mongo após reingerir a janela")
+    status: Literal["missing", "extra", "repaired", "drifting"]
+
+class ReconcileSummary(BaseModel):
+    checked: int = Field(0, description="Janelas comparadas na granularidade pedida")
+    matched: int = 0
+    wfs_total: int = 0
+    mongo_total: int = 0
+    hits_requests: int = 0
+    drift: int = 0
+    missing: int = 0
+    extra: int = 0
+    repaired: int = 0
+    still_drifting: int = 0
+    reingested_docs: int = 0
+
+class ReconcileReport(BaseModel):
+    id: str = Field(..., alias="_id")
+    layer: str
+    typename: str
+    collection: str
+    granularity: Literal["day", "hour"]
+    refine: bool
+    repair: bool
+    range: List[str]
+    started_at: str
+    finished_at: Optional[str] = None
+    duration_ms: Optional[int] = None
+    status: Literal["running", "ok", "repaired", "drift", "skipped", "error"]
+    error: Optional[str] = None
+    note: Optional[str] = Field(None, description="Ex.: janela recortada à retenção da camada")
+    summary: ReconcileSummary
+    windows: Optional[List[ReconcileWindow]] = None
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class ReconcileReportList(BaseModel):
+    returned: int
+    items: List[ReconcileReport]
+
+class IngestJobProgress(BaseModel):
+    fetched: int = Field(0, description="Features recebidas da fonte")
+    written: int = Field(0, description="Documentos enviados ao banco")
+    upserted: int = Field(0, description="Documentos inseridos/alterados")
+    chunks_done: int = 0
+    chunks_total: int = 0
+    expected: Optional[int] = Field(None, description="Total na fonte para a janela (resultType=hits), se disponível")
+
+class IngestJob(BaseModel):
+    """Job de ingestão em segundo plano (fila + workers; estado persistido)."""
+    id: str = Field(..., alias="_id")
+    kind: Literal["initial", "incremental", "48h", "layer"]
+    layer: str
+    spec: Dict[str, Any] = Field(..., description="Camada executada (campos de LayerInfo)")
+    start: Optional[str] = None
+    end: Optional[str] = None
+    dry_run: bool = False
+    status: Literal["queued", "running", "ok", "error", "cancelled"]
+    created_at: str
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    attempts: int = Field(0, description="Execuções (> 1 = retomado após reinício)")
+    last_seen: Optional[str] = None
+    error: Optional[str] = None
+    progress: IngestJobProgress
+    elapsed_s: float = 0.0
+    rate_per_s: Optional[float] = Field(None, description="Features buscadas por segundo")
+    eta_s: Optional[float] = Field(None, description="Estimativa do tempo restante (só com o job rodando)")
+
+    model_config = ConfigDict(populate_by_name=True)
+
+class IngestJobList(BaseModel):
+    returned: int
+    items: List[IngestJob]
+
+class ArchiveScan(BaseModel):
+    """O que a consulta leu do arquivo Parquet (após poda de partições e de row groups)."""
+    columns: List[str]
+    files: int
+    total_files: int
+    row_groups: int
+    total_row_groups: int
+
+class ArchiveStatsResponse(StatsResponse):
+    scan: ArchiveScan
+
+class ArchiveTimeSeriesResponse(TimeSeriesResponse):
+    scan: ArchiveScan
+
+class ArchiveMonth(BaseModel):
+    """Partição mensal exportada (entrada do `_manifest.json`)."""
+    month: str = Field(..., description="YYYY-MM")
+    rows: int = Field(..., ge=0)
+    min_data_hora_gmt: Optional[str] = None
+    max_data_hora_gmt: Optional[str] = None
+    exported_at: str
+    path: Optional[str] = Field(None, description="Relativo a ARCHIVE_DIR; ausente se o mês não tem focos")
+    bytes: Optional[int] = None
+    row_groups: Optional[int] = None
+
+class ArchiveMonthsResponse(BaseModel):
+    last_closed_month: str
+    months: List[ArchiveMonth]
+
 # ---------- Entradas (query) ----------
-class QueryParams(BaseModel):
+def _check_end_after_start(v: Optional[str], info) -> Optional[str]:
+    start = info.data.get("start")
+    if start and v and v < start:
+        raise ValueError("end must be >= start")
+    return v
+
+def _check_bbox(v: Optional[str]) -> Optional[str]:
+    if not v:
+        return v
+    parse_bbox(v)       # 4 números finitos; ValueError vira 422
+    return v
+
+class QueryModel(BaseModel):
+    """
+    Base dos parâmetros de consulta usados com `Depends()`: o FastAPI só valida
+    os tipos de cada query param; erro de validador do modelo (bbox, end < start)
+    subiria como 500. Aqui vira RequestValidationError (422, formato padrão).
+    """
+    def __init__(self, **data: Any) -> None:
+        try:
+            super().__init__(**data)
+        except ValidationError as exc:
+            raise RequestValidationError(
+                [dict(e, loc=("query", *e["loc"])) for e in exc.errors(include_url=False, include_context=False)]
+            ) from None
+
+class QueryParams(QueryModel):
     """Parâmetros de busca textual / temporal / espacial."""
     start: Optional[str] = Field(None, description="Data inicial (YYYY-MM-DD)")
     end: Optional[str] = Field(None, description="Data final (YYYY-MM-DD)")
@@ -105,20 +319,83 @@ class QueryParams(BaseModel):
     @field_validator("end")
     @classmethod
     def _end_after_start(cls, v: Optional[str], info):
-        start = info.data.get("start")
-        if start and v and v < start:
-            raise ValueError("end must be >= start")
-        return v
+        return _check_end_after_start(v, info)
 
     @field_validator("bbox")
     @classmethod
     def _bbox_fmt(cls, v: Optional[str]):
-        if not v:
-            return v
-        parts = v.split(",")
-        if len(parts) != 4:
-            raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
-        return v
+        return _check_bbox(v)
+
+class ExportParams(QueryParams):
+    """Filtros de /data/export: mesmos do /data/find, sem teto de `limit`."""
+    limit: Optional[conint(gt=0)] = Field(None, description="Máximo de linhas (vazio = sem limite)")
+    format: Literal["ndjson", "geojson", "csv"] = "ndjson"
+
+class DensityParams(QueryModel):
+    """Parâmetros de /data/density (grade fixa em graus)."""
+    res: float = Field(0.5, description="Resolução da célula em graus (uma de GRID_RESOLUTIONS)")
+    start: Optional[str] = Field(None, description="Data inicial (YYYY-MM-DD)")
+    end: Optional[str] = Field(None, description="Data final (YYYY-MM-DD)")
+    bbox: Optional[str] = Field(None, description="minLon,minLat,maxLon,maxLat")
+    satelite: Optional[str] = None
+    estado: Optional[str] = None
+    bioma: Optional[str] = None
+
+    @field_validator("end")
+    @classmethod
+    def _end_after_start(cls, v: Optional[str], info):
+        return _check_end_after_start(v, info)
+
+    @field_validator("bbox")
+    @classmethod
+    def _bbox_fmt(cls, v: Optional[str]):
+        return _check_bbox(v)
+
+class TimeSeriesParams(QueryModel):
+    """Parâmetros de /data/timeseries."""
+    interval: Literal["hour", "day", "week"] = "day"
+    group_by: Optional[str] = Field(None, description="Dimensões separadas por vírgula: satelite,estado,bioma")
+    start: Optional[str] = Field(None, description="Início (YYYY-MM-DD ou ISO); padrão depende do intervalo")
+    end: Optional[str] = Field(None, description="Fim (YYYY-MM-DD ou ISO); padrão = agora")
+    satelite: Optional[str] = None
+    estado: Optional[str] = None
+    bioma: Optional[str] = None
+
+    @field_validator("end")
+    @classmethod
+    def _end_after_start(cls, v: Optional[str], info):
+        return _check_end_after_start(v, info)
+
+    def dims(self) -> List[str]:
+        """Dimensões de `group_by` (ValueError se alguma não for satelite/estado/bioma)."""
+        dims = [d.strip() for d in self.group_by.split(",") if d.strip()] if self.group_by else []
+        if any(d not in ("satelite", "estado", "bioma") for d in dims):
+            raise ValueError("group_by accepts satelite, estado, bioma")
+        return dims
+
+class EventParams(QueryModel):
+    """Parâmetros de /events (janela = eventos ativos em algum momento de [start, end])."""
+    start: Optional[str] = Field(None, description="Eventos com last_seen >= start (YYYY-MM-DD ou ISO)")
+    end: Optional[str] = Field(None, description="Eventos com first_seen <= end (YYYY-MM-DD ou ISO)")
+    bbox: Optional[str] = Field(None, description="Centróide dentro de minLon,minLat,maxLon,maxLat")
+    estado: Optional[str] = None
+    bioma: Optional[str] = None
+    satelite: Optional[str] = Field(None, description="Eventos vistos por este satélite")
+    min_count: Optional[conint(ge=1)] = Field(None, description="Mínimo de focos")
+    min_frp: Optional[confloat(ge=0)] = Field(None, description="FRP máximo >= min_frp")
+    limit: conint(gt=0, le=1000) = 100
+    skip: conint(ge=0) = 0
+    sort: Literal["-last_seen", "last_seen", "-count", "-frp_max", "-first_seen", "first_seen"] = "-last_seen"
+
+    @field_validator("end")
+    @classmethod
+    def _end_after_start(cls, v: Optional[str], info):
+        return _check_end_after_start(v, info)
+
+    @field_validator("bbox")
+    @classmethod
+    def _bbox_fmt(cls, v: Optional[str]):
+        return _check_bbox(v)
 
 class WFSSchemaResponse(BaseModel):
     typeNames: str
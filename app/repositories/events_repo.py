@@ -0,0 +1,52 @@
+# app/repositories/events_repo.py
+from __future__ import annotations
+from typing import Any, Dict, List, Optional, Tuple
+from pymongo import DeleteOne, ReplaceOne, UpdateMany
+from motor.motor_asyncio import AsyncIOMotorCollection
+from ..services.protocols import EventRepository
+
+# campos internos do agrupamento que não saem na API
+_PUBLIC_PROJECTION = {"cells": 0, "sum_lon": 0, "sum_lat": 0}
+
+class MongoEventRepository(EventRepository):
+    """
+    Eventos em coleção própria (`MONGODB_EVENTS_COLLECTION`); o vínculo
+    foco -> evento fica em `event_id` no documento do foco.
+    """
+    def __init__(self, events: AsyncIOMotorCollection, focos: AsyncIOMotorCollection) -> None:
+        self._events = events
+        self._focos = focos
+
+    async def assigned(self, ids: List[str]) -> set[str]:
+        cur = self._focos.find({"id": {"$in": ids}, "event_id": {"$exists": True}}, projection={"id": 1})
+        return {d["id"] async for d in cur}
+
+    async def candidates(self, cells: List[str], since: str) -> list[Dict[str, Any]]:
+        return await self._events.find({"cells": {"$in": cells}, "last_seen": {"$gte": since}}).to_list(length=None)
+
+    async def save(self, events: List[Dict[str, Any]], merged: Dict[str, str], assignments: Dict[str, str]) -> None:
+        ops: list = [ReplaceOne({"_id": e["_id"]}, e, upsert=True) for e in events]
+        ops += [DeleteOne({"_id": loser}) for loser in merged]
+        if ops:
+            await self._events.bulk_write(ops, ordered=False)
+
+        by_event: Dict[str, List[str]] = {}
+        for fid, eid in assignments.items():
+            by_event.setdefault(eid, []).append(fid)
+        focus_ops = [UpdateMany({"id": {"$in": ids}}, {"$set": {"event_id": eid}}) for eid, ids in by_event.items()]
+        focus_ops += [UpdateMany({"event_id": loser}, {"$set": {"event_id": winner}}) for loser, winner in merged.items()]
+        if focus_ops:
+            await self._focos.bulk_write(focus_ops, ordered=False)
+
+    async def find(
+        self,
+        flt: Dict[str, Any],
+        limit: int,
+        skip: int,
+        sort: List[Tuple[str, int]],
+    ) -> list[Dict[str, Any]]:
+        cur = self._events.find(flt, projection=_PUBLIC_PROJECTION).sort(sort).skip(skip).limit(limit)
+        return await cur.to_list(length=limit)
+
+    async def get(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return await self._events.find_one({"_id": event_id}, projection=_PUBLIC_PROJECTION)
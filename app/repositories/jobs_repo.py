@@ -0,0 +1,94 @@
+# app/repositories/jobs_repo.py
+from __future__ import annotations
+import asyncio
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import orjson
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from ..core.config import settings
+from ..services.protocols import JobRepository
+
+_UNFINISHED = ("queued", "running")
+
+class MongoJobRepository(JobRepository):
+    """Jobs em coleção própria (`MONGODB_JOBS_COLLECTION`), um documento por job."""
+    def __init__(self, coll: AsyncIOMotorCollection) -> None:
+        self._coll = coll
+        self._indexed = False
+
+    async def _ensure_indexes(self) -> None:
+        if not self._indexed:
+            await self._coll.create_index([("status", 1), ("created_at", -1)])
+            self._indexed = True
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        await self._ensure_indexes()
+        await self._coll.replace_one({"_id": job["_id"]}, job, upsert=True)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self._coll.find_one({"_id": job_id})
+
+    async def find(self, status: Optional[str], kind: Optional[str], limit: int, skip: int) -> list[Dict[str, Any]]:
+        flt: Dict[str, Any] = {}
+        if status:
+            flt["status"] = status
+        if kind:
+            flt["kind"] = kind
+        cur = self._coll.find(flt).sort([("created_at", -1)]).skip(skip).limit(limit)
+        return await cur.to_list(length=limit)
+
+    async def unfinished(self) -> list[Dict[str, Any]]:
+        await self._ensure_indexes()
+        cur = self._coll.find({"status": {"$in": list(_UNFINISHED)}}).sort([("created_at", 1)])
+        return await cur.to_list(length=None)
+
+class SqliteJobRepository(JobRepository):
+    """
+    Jobs numa tabela do mesmo arquivo SQLite dos focos (REPO_BACKEND=sqlite):
+    status e created_at em colunas (filtro/ordenação), o job inteiro em JSON.
+    """
+    def __init__(self, path: str | Path, table: str = "ingest_jobs") -> None:
+        self.table = table
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        self._conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                id TEXT PRIMARY KEY, kind TEXT, status TEXT, created_at TEXT, doc TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS {table}_status ON {table} (status, created_at);
+        """)
+
+    def _run(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [orjson.loads(r[0]) for r in self._conn.execute(sql, params).fetchall()]
+
+    async def save(self, job: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            self._run,
+            f"INSERT OR REPLACE INTO {self.table} (id, kind, status, created_at, doc) VALUES (?, ?, ?, ?, ?)",
+            (job["_id"], job.get("kind"), job.get("status"), job.get("created_at"), orjson.dumps(job).decode()),
+        )
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._run, f"SELECT doc FROM {self.table} WHERE id = ?", (job_id,))
+        return rows[0] if rows else None
+
+    async def find(self, status: Optional[str], kind: Optional[str], limit: int, skip: int) -> list[Dict[str, Any]]:
+        sql = f"SELECT doc FROM {self.table} WHERE (? IS NULL OR status = ?) AND (? IS NULL OR kind = ?) " \
+              "ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        return await asyncio.to_thread(self._run, sql, (status, status, kind, kind, limit, skip))
+
+    async def unfinished(self) -> list[Dict[str, Any]]:
+        sql = f"SELECT doc FROM {self.table} WHERE status IN (?, ?) ORDER BY created_at"
+        return await asyncio.to_thread(self._run, sql, _UNFINISHED)
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -1,13 +1,83 @@
 # app/repositories/mongo_repo.py
 from __future__ import annotations
-from typing import Dict, Any, Iterable, Optional, List, Tuple
+from typing import Dict, Any, AsyncIterator, Iterable, Mapping, Optional, List, Tuple
+from time import perf_counter
 from pymongo import UpdateOne
+from bson.codec_options import CodecOptions
+from bson.raw_bson import RawBSONDocument
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pydantic import BaseModel
+from ..core.metrics import MONGO_BULK_DOCS, MONGO_BULK_SECONDS
+from ..models.schemas import FocusItem
 from ..services.protocols import Repository
 
+def projection_for(model: type[BaseModel]) -> Dict[str, int]:
+    """Projeção Mongo com os campos declarados no modelo de saída (+ `_id`)."""
+    proj = {"_id": 1}
+    proj.update({name: 1 for name in model.model_fields})
+    return proj
+
+# campos efetivamente usados por /data/* (exclui o blob `properties`)
+FOCUS_PROJECTION = projection_for(FocusItem)
+
+# chave do bucket a partir da string ISO de data_hora_gmt (semana = segunda-feira)
+_BUCKET_EXPR: Dict[str, Any] = {
+    "hour": {"$substrBytes": ["$data_hora_gmt", 0, 13]},
+    "day": {"$substrBytes": ["$data_hora_gmt", 0, 10]},
+    "week": {"$dateToString": {"format": "%Y-%m-%d", "date": {"$dateTrunc": {
+        "date": {"$dateFromString": {
+            "dateString": {"$substrBytes": ["$data_hora_gmt", 0, 10]}, "format": "%Y-%m-%d",
+        }},
+        "unit": "week",
+        "startOfWeek": "monday",
+    }}}},
+}
+
 class MongoRepository(Repository):
-    def __init__(self, coll: AsyncIOMotorCollection) -> None:
+    """
+    Repositório Mongo.
+
+    Com `lean=True`, `recent`/`find` aplicam `FOCUS_PROJECTION` quando nenhuma
+    projeção é informada e devolvem `RawBSONDocument` (decodificado sob demanda),
+    evitando trafegar/decodificar o `properties` completo. `batch_size` controla
+    o tamanho dos lotes do cursor (limitado ao `limit` da consulta).
+    """
+    def __init__(
+        self,
+        coll: AsyncIOMotorCollection,
+        *,
+        lean: bool = False,
+        batch_size: Optional[int] = None,
+    ) -> None:
         self._coll = coll
+        self._lean = lean
+        self._batch_size = batch_size
+        self._read_coll = (
+            coll.with_options(codec_options=CodecOptions(document_class=RawBSONDocument))
+            if lean else coll
+        )
+
+    def _read_cursor(
+        self,
+        flt: Dict[str, Any],
+        *,
+        sort: List[Tuple[str, int]],
+        limit: int = 0,
+        skip: int = 0,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ):
+        if projection is None and self._lean:
+            projection = FOCUS_PROJECTION
+        cur = self._read_coll.find(flt, projection=projection).sort(sort)
+        if skip:
+            cur = cur.skip(skip)
+        # sem batch_size o primeiro lote do servidor tem só 101 docs: limit=1000 vira várias idas e voltas
+        batch = batch_size or self._batch_size or limit
+        if limit:
+            cur = cur.limit(limit)
+            batch = min(batch or limit, limit)
+        return cur.batch_size(batch) if batch else cur
 
     async def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
         docs = list(docs)
@@ -18,20 +88,69 @@ class MongoRepository(Repository):
             _id = d.get("_id") or d.get("id")
             assert _id, "Missing id/_id"
             ops.append(UpdateOne({"_id": _id}, {"$set": d}, upsert=True))
+        t0 = perf_counter()
         res = await self._coll.bulk_write(ops, ordered=False)
+        MONGO_BULK_SECONDS.observe(perf_counter() - t0)
+        MONGO_BULK_DOCS.labels("upserted").inc(res.upserted_count or 0)
+        MONGO_BULK_DOCS.labels("modified").inc(res.modified_count or 0)
+        MONGO_BULK_DOCS.labels("matched").inc(res.matched_count or 0)
         return (res.upserted_count or 0) + (res.modified_count or 0)
 
     async def count(self, flt: Optional[Dict[str, Any]] = None) -> int:
         return await self._coll.count_documents(flt or {})
 
-    async def recent(self, limit: int) -> list[Dict[str, Any]]:
-        cur = self._coll.find({}).sort([("data_hora_gmt", -1)]).limit(limit)
+    async def recent(self, limit: int, projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]:
+        cur = self._read_cursor({}, sort=[("data_hora_gmt", -1)], limit=limit, projection=projection)
         return await cur.to_list(length=limit)
 
-    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: List[Tuple[str, int]]) -> list[Dict[str, Any]]:
-        cur = self._coll.find(flt).sort(sort).skip(skip).limit(limit)
+    async def find(
+        self,
+        flt: Dict[str, Any],
+        limit: int,
+        skip: int,
+        sort: List[Tuple[str, int]],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> list[Dict[str, Any]]:
+        cur = self._read_cursor(flt, sort=sort, limit=limit, skip=skip, projection=projection)
         return await cur.to_list(length=limit)
 
+    async def iter_find(
+        self,
+        flt: Dict[str, Any],
+        sort: List[Tuple[str, int]],
+        *,
+        limit: int = 0,
+        skip: int = 0,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Itera o cursor lote a lote (sem `to_list`); `limit=0` = sem limite."""
+        cur = self._read_cursor(
+            flt, sort=sort, limit=limit, skip=skip, projection=projection, batch_size=batch_size,
+        )
+        async for doc in cur:
+            yield doc
+
+    async def agg_grid(self, flt: Dict[str, Any], res_field: str) -> list[Dict[str, Any]]:
+        """Contagem e soma de FRP por célula (`grid.<res_field>`, calculado na ingestão)."""
+        key = f"$grid.{res_field}"
+        pipeline = [
+            {"$match": {**flt, f"grid.{res_field}": {"$exists": True}}},
+            {"$group": {"_id": key, "count": {"$sum": 1}, "frp_sum": {"$sum": "$frp"}}},
+            {"$project": {"_id": 0, "cell": "$_id", "count": 1, "frp_sum": 1}},
+        ]
+        return await self._coll.aggregate(pipeline).to_list(length=None)
+
+    async def agg_timeseries(self, flt: Dict[str, Any], interval: str, group_by: List[str]) -> list[Dict[str, Any]]:
+        """Uma agregação: $match na faixa de data (índice) + $group por bucket e dimensões."""
+        group_id = {"bucket": _BUCKET_EXPR[interval], **{d: f"${d}" for d in group_by}}
+        pipeline = [
+            {"$match": flt},
+            {"$group": {"_id": group_id, "count": {"$sum": 1}, "frp_sum": {"$sum": "$frp"}}},
+            {"$replaceWith": {"$mergeObjects": ["$_id", {"count": "$count", "frp_sum": "$frp_sum"}]}},
+        ]
+        return await self._coll.aggregate(pipeline).to_list(length=None)
+
     async def agg_stats(self) -> Dict[str, Any]:
         pipeline = [
             {"$group": {
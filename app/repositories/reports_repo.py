@@ -0,0 +1,83 @@
+# app/repositories/reports_repo.py
+from __future__ import annotations
+import asyncio
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import orjson
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from ..core.config import settings
+from ..services.protocols import ReconcileReportRepository
+
+# a lista não traz as janelas (podem ser centenas); o detalhe vem em get()
+_LIST_PROJECTION = {"windows": 0}
+
+class MongoReconcileReportRepository(ReconcileReportRepository):
+    """Relatórios em coleção própria (`MONGODB_RECONCILE_COLLECTION`), um documento por execução."""
+    def __init__(self, coll: AsyncIOMotorCollection) -> None:
+        self._coll = coll
+
+    async def save(self, report: Dict[str, Any]) -> None:
+        await self._coll.replace_one({"_id": report["_id"]}, report, upsert=True)
+
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int) -> list[Dict[str, Any]]:
+        cur = self._coll.find(flt, projection=_LIST_PROJECTION).sort([("started_at", -1)]).skip(skip).limit(limit)
+        return await cur.to_list(length=limit)
+
+    async def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        return await self._coll.find_one({"_id": report_id})
+
+class SqliteReconcileReportRepository(ReconcileReportRepository):
+    """
+    Relatórios numa tabela do arquivo SQLite dos focos (REPO_BACKEND=sqlite):
+    layer, status e started_at em colunas, o relatório inteiro em JSON. Uma
+    conexão por operação (relatórios são raros; nada a fechar no shutdown).
+    """
+    def __init__(self, path: str | Path, table: str = "reconcile_reports") -> None:
+        self.path = str(path)
+        self.table = table
+        self._ready = False
+
+    def _run(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None)
+        try:
+            conn.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+            if not self._ready:
+                conn.executescript(f"""
+                    CREATE TABLE IF NOT EXISTS {self.table} (
+                        id TEXT PRIMARY KEY, layer TEXT, status TEXT, started_at TEXT, doc TEXT NOT NULL);
+                    CREATE INDEX IF NOT EXISTS {self.table}_started ON {self.table} (started_at);
+                """)
+                self._ready = True
+            return [orjson.loads(r[0]) for r in conn.execute(sql, params).fetchall()]
+        finally:
+            conn.close()
+
+    async def save(self, report: Dict[str, Any]) -> None:
+        await asyncio.to_thread(
+            self._run,
+            f"INSERT OR REPLACE INTO {self.table} (id, layer, status, started_at, doc) VALUES (?, ?, ?, ?, ?)",
+            (report["_id"], report.get("layer"), report.get("status"), report.get("started_at"),
+             orjson.dumps(report).decode()),
+        )
+
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int) -> list[Dict[str, Any]]:
+        """`flt` aceita só igualdade em `layer`/`status` (o que /reconcile/reports monta)."""
+        unknown = set(flt) - {"layer", "status"}
+        if unknown:
+            raise ValueError(f"filtro não suportado no SQLite: {sorted(unknown)}")
+        layer, status = flt.get("layer"), flt.get("status")
+        sql = f"SELECT doc FROM {self.table} WHERE (? IS NULL OR layer = ?) AND (? IS NULL OR status = ?) " \
+              "ORDER BY started_at DESC LIMIT ? OFFSET ?"
+        docs = await asyncio.to_thread(self._run, sql, (layer, layer, status, status, limit, skip))
+        for d in docs:
+            d.pop("windows", None)      # como _LIST_PROJECTION
+        return docs
+
+    async def get(self, report_id: str) -> Optional[Dict[str, Any]]:
+        rows = await asyncio.to_thread(self._run, f"SELECT doc FROM {self.table} WHERE id = ?", (report_id,))
+        return rows[0] if rows else None
@@ -0,0 +1,518 @@
+# app/repositories/sqlite_repo.py
+"""
+Repositório SQLite (REPO_BACKEND=sqlite): mesma interface do MongoRepository
+para rodar sem Atlas (edge/offline, testes locais rápidos).
+
+Uma tabela por coleção. Os campos filtrados/ordenados pela API viram colunas
+(data, satelite, estado, municipio, bioma, ...) com índices equivalentes aos
+do Mongo; o documento inteiro fica em `doc` (JSON), então filtros, ordenação
+e projeção em outros caminhos (`properties.x`, `grid.r1`) caem em
+`json_extract`. Geo: R*Tree (`<tabela>_geo`) mantido por triggers com o
+ponto de `geometry`; `$geoWithin` vira consulta na R*Tree (caixa) + teste
+exato nas colunas (raio pelo grande círculo, como `$centerSphere`).
+
+Banco em WAL (leitores não bloqueiam o escritor): uma conexão de escrita
+serializada por lock e uma conexão de leitura por thread. Toda chamada ao
+SQLite roda em thread (`asyncio.to_thread`); `upsert_many` lê os existentes,
+aplica a semântica do `$set` e grava só os novos/alterados com um
+`executemany` numa transação.
+
+Subconjunto de filtro suportado: igualdade, $eq/$ne/$gt/$gte/$lt/$lte,
+$in/$nin, $exists, $geoWithin ($geometry retangular ou $centerSphere) e
+$and/$or/$nor — o que os routers e serviços geram.
+"""
+from __future__ import annotations
+import asyncio
+import math
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import orjson
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..services.protocols import Repository
+
+log = get_logger()
+
+# colunas promovidas do documento (nome no documento -> coluna)
+COLUMNS: Dict[str, str] = {
+    "_id": "id", "id": "id",
+    "data_hora_gmt": "data_hora_gmt",
+    "satelite": "satelite", "estado": "estado", "municipio": "municipio", "bioma": "bioma", "pais": "pais",
+    "longitude": "longitude", "latitude": "latitude", "frp": "frp",
+    "event_id": "event_id",
+    "geometry": "geometry",
+}
+_DATA_COLUMNS = ("data_hora_gmt", "satelite", "estado", "municipio", "bioma", "pais",
+                 "longitude", "latitude", "frp", "event_id")
+_JSON_COLUMNS = {"geometry"}
+_SPARSE = {"event_id"}      # ausente na maioria dos documentos: NULL na coluna não vira chave na projeção
+_IDENT = re.compile(r"^\w+$")
+_BBOX_EPS = 1e-4        # a R*Tree guarda float32: a caixa é alargada e o teste exato usa as colunas
+_IN_CHUNK = 500
+
+_BUCKET_SQL = {
+    "hour": "substr(data_hora_gmt, 1, 13)",
+    "day": "substr(data_hora_gmt, 1, 10)",
+    # semana começando na segunda: vai ao domingo seguinte (ou o próprio) e volta 6 dias
+    "week": "date(substr(data_hora_gmt, 1, 10), 'weekday 0', '-6 days')",
+}
+
+def _schema(t: str) -> str:
+    return f"""
+    CREATE TABLE IF NOT EXISTS {t} (
+        rid INTEGER PRIMARY KEY,
+        id TEXT NOT NULL UNIQUE,
+        data_hora_gmt TEXT,
+        satelite TEXT, estado TEXT, municipio TEXT, bioma TEXT, pais TEXT,
+        longitude REAL, latitude REAL, frp REAL,
+        event_id TEXT,
+        geo_lon REAL, geo_lat REAL,
+        geometry TEXT,
+        doc TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS {t}_date ON {t}(data_hora_gmt);
+    CREATE INDEX IF NOT EXISTS {t}_estado_date ON {t}(estado, data_hora_gmt);
+    CREATE INDEX IF NOT EXISTS {t}_satelite_date ON {t}(satelite, data_hora_gmt);
+    CREATE INDEX IF NOT EXISTS {t}_bioma_date ON {t}(bioma, data_hora_gmt);
+    CREATE INDEX IF NOT EXISTS {t}_event ON {t}(event_id) WHERE event_id IS NOT NULL;
+    CREATE VIRTUAL TABLE IF NOT EXISTS {t}_geo USING rtree(rid, min_lon, max_lon, min_lat, max_lat);
+    CREATE TRIGGER IF NOT EXISTS {t}_geo_ins AFTER INSERT ON {t} WHEN new.geo_lon IS NOT NULL BEGIN
+        INSERT INTO {t}_geo VALUES (new.rid, new.geo_lon, new.geo_lon, new.geo_lat, new.geo_lat);
+    END;
+    CREATE TRIGGER IF NOT EXISTS {t}_geo_upd AFTER UPDATE OF geo_lon, geo_lat ON {t} BEGIN
+        DELETE FROM {t}_geo WHERE rid = old.rid;
+        INSERT INTO {t}_geo SELECT new.rid, new.geo_lon, new.geo_lon, new.geo_lat, new.geo_lat
+            WHERE new.geo_lon IS NOT NULL;
+    END;
+    CREATE TRIGGER IF NOT EXISTS {t}_geo_del AFTER DELETE ON {t} BEGIN
+        DELETE FROM {t}_geo WHERE rid = old.rid;
+    END;
+    """
+
+def _sphere_rad(lon1: Optional[float], lat1: Optional[float], lon2: float, lat2: float) -> Optional[float]:
+    """Distância angular (radianos) no grande círculo; registrada como função SQL."""
+    if lon1 is None or lat1 is None:
+        return None
+    p1, p2 = math.radians(lat1), math.radians(lat2)
+    dp, dl = p2 - p1, math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * math.asin(min(1.0, math.sqrt(a)))
+
+def _geo_point(doc: Mapping[str, Any]) -> Tuple[Optional[float], Optional[float]]:
+    geom = doc.get("geometry") or {}
+    coords = geom.get("coordinates") if isinstance(geom, Mapping) and geom.get("type") == "Point" else None
+    if coords and len(coords) >= 2 and coords[0] is not None and coords[1] is not None:
+        return float(coords[0]), float(coords[1])
+    return None, None
+
+# ---------- filtro Mongo -> SQL ----------
+def _path_sql(path: str) -> str:
+    if path in COLUMNS and path not in _JSON_COLUMNS:
+        return COLUMNS[path]
+    parts = path.split(".")
+    if not all(_IDENT.match(p) for p in parts):
+        raise ValueError(f"campo inválido: {path!r}")
+    return "json_extract(doc, '$." + ".".join(parts) + "')"
+
+def _exists_sql(path: str) -> str:
+    parts = path.split(".")
+    if not all(_IDENT.match(p) for p in parts):
+        raise ValueError(f"campo inválido: {path!r}")
+    return "json_type(doc, '$." + ".".join(parts) + "')"
+
+def _geo_sql(table: str, spec: Mapping[str, Any], params: List[Any]) -> str:
+    if "$centerSphere" in spec:
+        (clon, clat), radians = spec["$centerSphere"]
+        dlat = math.degrees(radians)
+        cos_lat = math.cos(math.radians(clat))
+        min_lat, max_lat = max(-90.0, clat - dlat), min(90.0, clat + dlat)
+        if cos_lat > 1e-6 and dlat / cos_lat < 180.0 and max_lat < 90.0 and min_lat > -90.0:
+            dlon = dlat / cos_lat
+            min_lon, max_lon = clon - dlon, clon + dlon
+        else:
+            min_lon, max_lon = -180.0, 180.0
+        params += [min_lon - _BBOX_EPS, max_lon + _BBOX_EPS, min_lat - _BBOX_EPS, max_lat + _BBOX_EPS,
+                   clon, clat, radians]
+        return (f"(rid IN (SELECT rid FROM {table}_geo WHERE min_lon >= ? AND max_lon <= ? "
+                f"AND min_lat >= ? AND max_lat <= ?) AND sphere_rad(geo_lon, geo_lat, ?, ?) <= ?)")
+    # os polígonos gerados por utils.geo são retângulos: caixa envolvente do anel
+    ring = spec["$geometry"]["coordinates"][0]
+    lons, lats = [c[0] for c in ring], [c[1] for c in ring]
+    box = (min(lons), max(lons), min(lats), max(lats))
+    params += [box[0] - _BBOX_EPS, box[1] + _BBOX_EPS, box[2] - _BBOX_EPS, box[3] + _BBOX_EPS, *box]
+    return (f"(rid IN (SELECT rid FROM {table}_geo WHERE min_lon >= ? AND max_lon <= ? "
+            f"AND min_lat >= ? AND max_lat <= ?) AND geo_lon BETWEEN ? AND ? AND geo_lat BETWEEN ? AND ?)")
+
+def _cond_sql(table: str, path: str, cond: Any, params: List[Any]) -> str:
+    if not (isinstance(cond, Mapping) and cond and all(str(k).startswith("$") for k in cond)):
+        cond = {"$eq": cond}
+    col = _path_sql(path)
+    out: List[str] = []
+    for op, arg in cond.items():
+        if op == "$eq":
+            if arg is None:
+                out.append(f"{col} IS NULL")
+            else:
+                out.append(f"{col} = ?")
+                params.append(arg)
+        elif op == "$ne":
+            if arg is None:
+                out.append(f"{col} IS NOT NULL")
+            else:
+                out.append(f"({col} IS NULL OR {col} != ?)")
+                params.append(arg)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            out.append(f"{col} {({'$gt': '>', '$gte': '>=', '$lt': '<', '$lte': '<='})[op]} ?")
+            params.append(arg)
+        elif op in ("$in", "$nin"):
+            values = [a for a in arg if a is not None]
+            has_null = len(values) != len(arg)
+            inner = f"{col} IN ({', '.join('?' * len(values))})" if values else "0"
+            params += values
+            if op == "$in":
+                out.append(f"({inner} OR {col} IS NULL)" if has_null else inner)
+            else:
+                out.append(f"(NOT {inner} AND {col} IS NOT NULL)" if has_null else f"({col} IS NULL OR NOT {inner})")
+        elif op == "$exists":
+            out.append(f"{_exists_sql(path)} IS {'NOT ' if arg else ''}NULL")
+        elif op == "$geoWithin":
+            out.append(_geo_sql(table, arg, params))
+        else:
+            raise NotImplementedError(f"SqliteRepository: operador {op} não suportado")
+    return " AND ".join(out)
+
+def where_sql(table: str, flt: Optional[Mapping[str, Any]], params: List[Any]) -> str:
+    """Cláusula WHERE (sem a palavra) para o subconjunto de filtro Mongo da API; '1' se vazio."""
+    parts: List[str] = []
+    for key, cond in (flt or {}).items():
+        if key in ("$and", "$or", "$nor"):
+            subs = [f"({where_sql(table, f, params)})" for f in cond] or ["1"]
+            joined = (" AND " if key == "$and" else " OR ").join(subs)
+            parts.append(f"NOT ({joined})" if key == "$nor" else f"({joined})")
+        else:
+            parts.append(_cond_sql(table, key, cond, params))
+    return " AND ".join(parts) or "1"
+
+def _order_sql(sort: Sequence[Tuple[str, int]]) -> str:
+    if not sort:
+        return ""
+    return " ORDER BY " + ", ".join(f"{_path_sql(f)} {'DESC' if d < 0 else 'ASC'}" for f, d in sort)
+
+# ---------- projeção ----------
+def _columns_for(projection: Optional[Mapping[str, Any]]) -> Optional[List[str]]:
+    """Campos de uma projeção de inclusão que estão todos em colunas (dispensa decodificar `doc`)."""
+    if not projection:
+        return None
+    include = [k for k, v in projection.items() if v and k != "_id"]
+    if not include or any(not v for k, v in projection.items() if k != "_id"):
+        return None
+    if not all(k in COLUMNS for k in include):
+        return None
+    if projection.get("_id", 1):
+        include.append("_id")
+    return include
+
+_MISSING = object()
+
+def _get(doc: Mapping[str, Any], parts: Sequence[str]) -> Any:
+    cur: Any = doc
+    for p in parts:
+        if not isinstance(cur, Mapping) or p not in cur:
+            return _MISSING
+        cur = cur[p]
+    return cur
+
+def _project(doc: Dict[str, Any], projection: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Projeção Mongo (inclusão ou exclusão, caminhos com ponto) sobre o documento decodificado."""
+    if not projection:
+        return doc
+    include = [k for k, v in projection.items() if v and k != "_id"]
+    if include:
+        out: Dict[str, Any] = {}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        for path in include:
+            parts = path.split(".")
+            value = _get(doc, parts)
+            if value is _MISSING:
+                continue
+            cur = out
+            for p in parts[:-1]:
+                cur = cur.setdefault(p, {})
+            cur[parts[-1]] = value
+        return out
+    out = dict(doc)
+    for path, v in projection.items():
+        if not v:
+            parts = path.split(".")
+            cur: Any = out
+            for p in parts[:-1]:
+                cur = cur.get(p) if isinstance(cur, dict) else None
+            if isinstance(cur, dict):
+                cur.pop(parts[-1], None)
+    return out
+
+class SqliteRepository(Repository):
+    """
+    Repositório de focos em SQLite (ver docstring do módulo).
+
+    `path=":memory:"` não serve para vários threads; para testes use um arquivo
+    temporário. `batch_size` é o tamanho dos lotes lidos do cursor em `iter_find`.
+    """
+    def __init__(self, path: str | Path, table: Optional[str] = None, *, batch_size: Optional[int] = None) -> None:
+        self.path = str(path)
+        self.table = table or settings.mongodb_coll
+        if not _IDENT.match(self.table):
+            raise ValueError(f"nome de tabela inválido: {self.table!r}")
+        self.batch_size = batch_size or settings.mongodb_batch_size or 1000
+        self._write_lock = threading.Lock()
+        self._local = threading.local()
+        self._writer: Optional[sqlite3.Connection] = None
+        self._readers: List[sqlite3.Connection] = []
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        with self._write_lock:
+            self._writer = self._connect()
+            self._writer.executescript(_schema(self.table))
+
+    # ---------- conexões ----------
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")       # seguro em WAL; fsync só no checkpoint
+        conn.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{int(settings.sqlite_cache_mb) * 1024}")
+        conn.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_mb) * 1024 * 1024}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.create_function("sphere_rad", 4, _sphere_rad, deterministic=True)
+        return conn
+
+    def _reader(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._local.conn = self._connect()
+            with self._write_lock:
+                self._readers.append(conn)
+        return conn
+
+    def close(self) -> None:
+        with self._write_lock:
+            for conn in [self._writer, *self._readers]:
+                if conn is not None:
+                    conn.close()
+            self._writer, self._readers = None, []
+        self._local = threading.local()
+
+    # ---------- escrita ----------
+    def _row(self, d: Mapping[str, Any]) -> Tuple[Any, ...]:
+        geo_lon, geo_lat = _geo_point(d)
+        geom = d.get("geometry")
+        return (
+            str(d.get("_id") or d.get("id")),
+            *(d.get(c) for c in _DATA_COLUMNS),
+            geo_lon, geo_lat,
+            orjson.dumps(geom).decode() if geom is not None else None,
+            orjson.dumps(d).decode(),
+        )
+
+    def _upsert(self, docs: List[Dict[str, Any]]) -> int:
+        t = self.table
+        by_id: Dict[str, Dict[str, Any]] = {}
+        for d in docs:
+            _id = d.get("_id") or d.get("id")
+            assert _id, "Missing id/_id"
+            old = by_id.get(str(_id))
+            by_id[str(_id)] = {**old, **d} if old is not None else d
+        with self._write_lock:
+            conn = self._writer
+            assert conn is not None, "repositório fechado"
+            ids = list(by_id)
+            existing: Dict[str, Dict[str, Any]] = {}
+            for i in range(0, len(ids), _IN_CHUNK):
+                chunk = ids[i:i + _IN_CHUNK]
+                for _id, raw in conn.execute(
+                    f"SELECT id, doc FROM {t} WHERE id IN ({', '.join('?' * len(chunk))})", chunk,
+                ):
+                    existing[_id] = orjson.loads(raw)
+            changed: List[Dict[str, Any]] = []
+            for _id, d in by_id.items():
+                old = existing.get(_id)
+                new = {**old, **d} if old is not None else d        # $set
+                if new != old:
+                    changed.append(new)
+            if not changed:
+                return 0
+            cols = ("id", *_DATA_COLUMNS, "geo_lon", "geo_lat", "geometry", "doc")
+            sql = (
+                f"INSERT INTO {t} ({', '.join(cols)}) VALUES ({', '.join('?' * len(cols))}) "
+                f"ON CONFLICT(id) DO UPDATE SET " + ", ".join(f"{c} = excluded.{c}" for c in cols[1:])
+            )
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany(sql, (self._row(d) for d in changed))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return len(changed)
+
+    async def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int:
+        docs = list(docs)
+        if not docs:
+            return 0
+        return await asyncio.to_thread(self._upsert, docs)
+
+    # ---------- leitura ----------
+    def _select(
+        self,
+        flt: Optional[Mapping[str, Any]],
+        sort: Sequence[Tuple[str, int]],
+        limit: int,
+        skip: int,
+        projection: Optional[Mapping[str, Any]],
+    ) -> Tuple[str, List[Any], Optional[List[str]]]:
+        params: List[Any] = []
+        fields = _columns_for(projection)
+        cols = ", ".join(COLUMNS[f] for f in fields) if fields else "doc"
+        sql = f"SELECT {cols} FROM {self.table} WHERE {where_sql(self.table, flt, params)}{_order_sql(sort)}"
+        if limit or skip:
+            sql += " LIMIT ? OFFSET ?"
+            params += [limit or -1, skip]
+        return sql, params, fields
+
+    @staticmethod
+    def _decode(row: Tuple[Any, ...], fields: Optional[List[str]], projection: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+        if fields is None:
+            return _project(orjson.loads(row[0]), projection)
+        out: Dict[str, Any] = {}
+        for f, v in zip(fields, row):
+            if f in _JSON_COLUMNS and v is not None:
+                v = orjson.loads(v)
+            if v is not None or f not in _SPARSE:
+                out[f] = v
+        return out
+
+    def _fetch(self, flt, sort, limit, skip, projection) -> List[Dict[str, Any]]:
+        sql, params, fields = self._select(flt, sort, limit, skip, projection)
+        return [self._decode(r, fields, projection) for r in self._reader().execute(sql, params)]
+
+    def _scalar(self, sql: str, params: Sequence[Any]) -> Any:
+        return self._reader().execute(sql, params).fetchone()
+
+    def _all(self, sql: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        return self._reader().execute(sql, params).fetchall()
+
+    async def count(self, flt: Optional[Dict[str, Any]] = None) -> int:
+        params: List[Any] = []
+        sql = f"SELECT count(*) FROM {self.table} WHERE {where_sql(self.table, flt, params)}"
+        return (await asyncio.to_thread(self._scalar, sql, params))[0]
+
+    async def recent(self, limit: int, projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]:
+        return await self.find({}, limit=limit, skip=0, sort=[("data_hora_gmt", -1)], projection=projection)
+
+    async def find(
+        self,
+        flt: Dict[str, Any],
+        limit: int,
+        skip: int,
+        sort: List[Tuple[str, int]],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> list[Dict[str, Any]]:
+        return await asyncio.to_thread(self._fetch, flt, sort, limit, skip, projection)
+
+    async def iter_find(
+        self,
+        flt: Dict[str, Any],
+        sort: List[Tuple[str, int]],
+        *,
+        limit: int = 0,
+        skip: int = 0,
+        projection: Optional[Dict[str, Any]] = None,
+        batch_size: Optional[int] = None,
+    ) -> AsyncIterator[Mapping[str, Any]]:
+        """Itera o resultado em lotes de `batch_size` (conexão própria; memória de um lote)."""
+        sql, params, fields = self._select(flt, sort, limit, skip, projection)
+        size = batch_size or self.batch_size
+        conn = await asyncio.to_thread(self._connect)
+        try:
+            cur = await asyncio.to_thread(conn.execute, sql, params)
+            while True:
+                rows = await asyncio.to_thread(cur.fetchmany, size)
+                if not rows:
+                    break
+                for r in rows:
+                    yield self._decode(r, fields, projection)
+        finally:
+            conn.close()
+
+    async def find_one_sorted(
+        self,
+        query: Dict[str, Any],
+        sort: List[Tuple[str, int]],
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Optional[Dict[str, Any]]:
+        out = await self.find(query, limit=1, skip=0, sort=sort, projection=projection)
+        return out[0] if out else None
+
+    async def agg_grid(self, flt: Dict[str, Any], res_field: str) -> list[Dict[str, Any]]:
+        """Contagem e soma de FRP por célula (`grid.<res_field>`, calculado na ingestão)."""
+        cell = _path_sql(f"grid.{res_field}")
+        params: List[Any] = []
+        sql = (f"SELECT {cell} AS cell, count(*), total(frp) FROM {self.table} "
+               f"WHERE {where_sql(self.table, flt, params)} AND {cell} IS NOT NULL GROUP BY cell")
+        rows = await asyncio.to_thread(self._all, sql, params)
+        return [{"cell": c, "count": n, "frp_sum": s} for c, n, s in rows]
+
+    async def agg_timeseries(self, flt: Dict[str, Any], interval: str, group_by: List[str]) -> list[Dict[str, Any]]:
+        """Uma consulta: faixa de data (índice) + GROUP BY bucket e dimensões."""
+        dims = [_path_sql(d) for d in group_by]
+        params: List[Any] = []
+        keys = ", ".join([_BUCKET_SQL[interval], *dims])
+        sql = (f"SELECT {keys}, count(*), total(frp) FROM {self.table} "
+               f"WHERE {where_sql(self.table, flt, params)} AND data_hora_gmt IS NOT NULL GROUP BY {keys}")
+        rows = await asyncio.to_thread(self._all, sql, params)
+        n = len(group_by)
+        return [
+            {"bucket": r[0], **dict(zip(group_by, r[1:1 + n])), "count": r[1 + n], "frp_sum": r[2 + n]}
+            for r in rows
+        ]
+
+    async def agg_stats(self) -> Dict[str, Any]:
+        def run() -> Dict[str, Any]:
+            total, lo, hi = self._scalar(f"SELECT count(*), min(data_hora_gmt), max(data_hora_gmt) FROM {self.table}", ())
+            if not total:
+                return {"total": 0, "min_data_hora_gmt": None, "max_data_hora_gmt": None, "by_satelite": []}
+            by_sat = self._all(
+                f"SELECT satelite, count(*) AS n FROM {self.table} GROUP BY satelite ORDER BY n DESC LIMIT 100", (),
+            )
+            return {
+                "total": total,
+                "min_data_hora_gmt": lo,
+                "max_data_hora_gmt": hi,
+                "by_satelite": [{"satelite": s, "count": n} for s, n in by_sat],
+            }
+        return await asyncio.to_thread(run)
+
+_repos: Dict[str, SqliteRepository] = {}
+_repos_lock = threading.Lock()
+
+def sqlite_repo(table: Optional[str] = None) -> SqliteRepository:
+    """Repositório da tabela `table` (padrão MONGODB_COLLECTION) em SQLITE_PATH; um por tabela no processo."""
+    table = table or settings.mongodb_coll
+    with _repos_lock:
+        repo = _repos.get(table)
+        if repo is None:
+            repo = _repos[table] = SqliteRepository(settings.sqlite_path, table)
+            log.info("sqlite.opened", path=settings.sqlite_path, table=table)
+        return repo
+
+def close_sqlite() -> None:
+    with _repos_lock:
+        for repo in _repos.values():
+            repo.close()
+        _repos.clear()
@@ -0,0 +1,433 @@
+# app/services/archive.py
+"""
+Arquivo frio em Parquet: meses fechados exportados do Mongo para disco local,
+particionados por ano/mês (`ARCHIVE_DIR/year=2024/month=09/focos.parquet`),
+para consultas analíticas longas (tendência sazonal por bioma, anos de série)
+sem varrer o Atlas.
+
+Exportação (`Archive.export_closed_months`): um mês é "fechado" quando
+terminou há mais de ARCHIVE_CLOSE_AFTER_DAYS dias (o INPE ainda corrige focos
+recentes). O cursor do Mongo é lido em ordem de `data_hora_gmt` (índice) e
+gravado em row groups de ARCHIVE_ROW_GROUP_ROWS linhas: a memória fica em um
+row group e o min/max de data de cada row group é estreito, então um filtro
+por data pula row groups inteiros. Categóricas (satelite, estado, bioma, ...)
+vão com dictionary encoding; compressão ARCHIVE_COMPRESSION. A partição é
+escrita num temporário e trocada de forma atômica; `_manifest.json` registra
+o que foi exportado (linhas, faixa de datas, row groups, quando).
+
+Leitura (`Archive.stats` / `Archive.timeseries`): `pyarrow.dataset` com
+particionamento hive. Cada consulta lê só as colunas de que precisa e empurra
+o filtro para o scanner: ano/mês eliminam partições (diretórios) e
+data/satelite/estado/bioma eliminam row groups pelas estatísticas do Parquet.
+A agregação é feita lote a lote (memória constante). `plan()` mostra o que uma
+consulta vai ler (arquivos, row groups, colunas).
+
+pyarrow é opcional (`pip install pyarrow` ou o extra `archive`): sem ele (ou
+sem ARCHIVE_DIR) o resto do serviço funciona e as operações do arquivo
+levantam `ArchiveUnavailable`.
+"""
+from __future__ import annotations
+import asyncio
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+import orjson
+
+from .protocols import Repository
+from .timeseries import _bucket_dt, bucket_of, buckets_between, next_bucket
+from ..core.config import settings
+from ..core.logging_config import get_logger
+
+log = get_logger()
+
+FILE_NAME = "focos.parquet"
+MANIFEST = "_manifest.json"          # prefixo "_": o dataset ignora
+CATEGORICAL = ("satelite", "municipio", "estado", "pais", "bioma")
+NUMERIC_PROPS = ("risco_fogo", "numero_dias_sem_chuva", "precipitacao")
+FILTER_FIELDS = ("satelite", "estado", "bioma")
+
+# campos lidos do Mongo na exportação (sem geometry/grid: lat/lon bastam)
+EXPORT_PROJECTION: Dict[str, Any] = {
+    "_id": 1, "data_hora_gmt": 1, "latitude": 1, "longitude": 1, "frp": 1,
+    **{c: 1 for c in CATEGORICAL},
+    **{f"properties.{p}": 1 for p in NUMERIC_PROPS},
+}
+
+_BUCKET_FMT = {"hour": "%Y-%m-%dT%H", "day": "%Y-%m-%d", "week": "%Y-%m-%d"}
+
+class ArchiveUnavailable(RuntimeError):
+    """pyarrow não instalado ou ARCHIVE_DIR não configurado."""
+
+def _arrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+        import pyarrow.dataset as ds
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise ArchiveUnavailable("pyarrow não instalado (pip install pyarrow)") from exc
+    return pa, pc, ds, pq
+
+def _schema(pa):
+    return pa.schema(
+        [("foco_id", pa.string()), ("data_hora_gmt", pa.timestamp("s", tz="UTC")),
+         ("latitude", pa.float64()), ("longitude", pa.float64())]
+        + [(c, pa.string()) for c in CATEGORICAL]
+        + [("frp", pa.float64())]
+        + [(p, pa.float64()) for p in NUMERIC_PROPS]
+    )
+
+# ---------- meses ----------
+def month_bounds(month: str) -> Tuple[str, str]:
+    """'YYYY-MM' -> [início, início do mês seguinte) como strings ISO (faixa do índice de data)."""
+    y, m = int(month[:4]), int(month[5:7])
+    ny, nm = (y + 1, 1) if m == 12 else (y, m + 1)
+    return f"{y:04d}-{m:02d}-01T00:00:00Z", f"{ny:04d}-{nm:02d}-01T00:00:00Z"
+
+def months_between(first: str, last: str) -> List[str]:
+    """Meses 'YYYY-MM' de `first` a `last` (inclusive; aceita datas/ISO)."""
+    y, m = int(first[:4]), int(first[5:7])
+    out: List[str] = []
+    while f"{y:04d}-{m:02d}" <= last[:7]:
+        out.append(f"{y:04d}-{m:02d}")
+        y, m = (y + 1, 1) if m == 12 else (y, m + 1)
+    return out
+
+def last_closed_month(now: Optional[datetime] = None, close_after_days: Optional[int] = None) -> str:
+    """Último mês que terminou há mais de `close_after_days` dias."""
+    now = now or datetime.now(timezone.utc)
+    days = settings.archive_close_after_days if close_after_days is None else close_after_days
+    ref = now - timedelta(days=days)
+    first_of_month = ref.replace(day=1)
+    return (first_of_month - timedelta(days=1)).strftime("%Y-%m")
+
+# ---------- conversão ----------
+def _float(v: Any) -> Optional[float]:
+    try:
+        return None if v is None or v == "" else float(v)
+    except (TypeError, ValueError):
+        return None
+
+def _utc(value: str) -> datetime:
+    """ISO com ou sem fração de segundo/fuso ('Z', '+03:00') -> datetime UTC; ValueError se inválido."""
+    dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+def _doc_ts(value: Any) -> Optional[datetime]:
+    try:
+        return _utc(value) if value else None
+    except (TypeError, ValueError):
+        return None
+
+def _columns(docs: Sequence[Mapping[str, Any]]) -> Dict[str, List[Any]]:
+    cols: Dict[str, List[Any]] = {
+        "foco_id": [str(d["_id"]) for d in docs],
+        "data_hora_gmt": [_doc_ts(d.get("data_hora_gmt")) for d in docs],
+        "latitude": [_float(d.get("latitude")) for d in docs],
+        "longitude": [_float(d.get("longitude")) for d in docs],
+    }
+    for c in CATEGORICAL:
+        cols[c] = [d.get(c) for d in docs]
+    cols["frp"] = [_float(d.get("frp")) for d in docs]
+    for p in NUMERIC_PROPS:
+        cols[p] = [_float((d.get("properties") or {}).get(p)) for d in docs]
+    return cols
+
+def _table(docs: Sequence[Mapping[str, Any]]):
+    pa, _, _, _ = _arrow()
+    cols = _columns(docs)
+    schema = _schema(pa)
+    # timestamp("s"): a fração de segundo é truncada
+    return pa.table([pa.array(cols[f.name], f.type) for f in schema], schema=schema)
+
+# ---------- filtros ----------
+def _ts(value: str, *, end: bool = False) -> datetime:
+    """'YYYY-MM-DD' (início/fim do dia) ou ISO -> datetime UTC; ValueError se inválido."""
+    if "T" not in value:
+        value = f"{value.strip()}T{'23:59:59' if end else '00:00:00'}"
+    return _utc(value)
+
+def _iso(value: str, *, end: bool = False) -> str:
+    return _ts(value, end=end).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def build_expression(start: Optional[str] = None, end: Optional[str] = None, **eq: Optional[str]):
+    """
+    Expressão do scanner: faixa de `data_hora_gmt` (+ o mesmo limite em
+    year/month, que é o que permite descartar partições inteiras) e igualdades
+    em satelite/estado/bioma.
+    """
+    _, pc, ds, _ = _arrow()
+    year, month, ts = ds.field("year"), ds.field("month"), ds.field("data_hora_gmt")
+    parts = []
+    if start:
+        lo = _ts(start)
+        parts += [ts >= lo, (year > lo.year) | ((year == lo.year) & (month >= lo.month))]
+    if end:
+        hi = _ts(end, end=True)
+        parts += [ts <= hi, (year < hi.year) | ((year == hi.year) & (month <= hi.month))]
+    for name, value in eq.items():
+        if value:
+            parts.append(ds.field(name) == value)
+    expr = None
+    for p in parts:
+        expr = p if expr is None else expr & p
+    return expr
+
+def bucket_bounds(start: Optional[str], end: Optional[str], interval: str) -> Tuple[Optional[str], Optional[str]]:
+    """Alarga [start, end] para buckets inteiros (mesma semântica de /data/timeseries)."""
+    iso = "%Y-%m-%dT%H:%M:%SZ"
+    lo = _bucket_dt(bucket_of(_iso(start), interval), interval).strftime(iso) if start else None
+    hi = None
+    if end:
+        nxt = next_bucket(bucket_of(_iso(end, end=True), interval), interval)
+        hi = (_bucket_dt(nxt, interval) - timedelta(seconds=1)).strftime(iso)
+    return lo, hi
+
+# ---------- arquivo ----------
+class Archive:
+    """Partições Parquet em `root` (exportação e leitura)."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        *,
+        row_group_rows: Optional[int] = None,
+        compression: Optional[str] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.row_group_rows = row_group_rows or settings.archive_row_group_rows
+        self.compression = compression or settings.archive_compression
+        self._lock = threading.Lock()
+
+    # ---------- manifesto ----------
+    def manifest(self) -> Dict[str, Dict[str, Any]]:
+        path = self.root / MANIFEST
+        return orjson.loads(path.read_bytes()) if path.exists() else {}
+
+    def _record(self, month: str, info: Dict[str, Any]) -> None:
+        with self._lock:
+            data = self.manifest()
+            data[month] = info
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp = self.root / f".{MANIFEST}.tmp"
+            tmp.write_bytes(orjson.dumps(dict(sorted(data.items())), option=orjson.OPT_INDENT_2))
+            os.replace(tmp, self.root / MANIFEST)
+
+    def partition_path(self, month: str) -> Path:
+        return self.root / f"year={month[:4]}" / f"month={month[5:7]}" / FILE_NAME
+
+    # ---------- exportação ----------
+    async def export_month(self, repo: Repository, month: str) -> Dict[str, Any]:
+        """Exporta um mês (substitui a partição, se existir). Mês sem focos não gera arquivo."""
+        _, _, _, pq = _arrow()
+        lo, hi = month_bounds(month)
+        path = self.partition_path(month)
+        # nome único: duas exportações do mesmo mês não escrevem no mesmo temporário
+        tmp = path.with_name(f".{FILE_NAME}.tmp{os.getpid()}.{uuid.uuid4().hex[:8]}")
+        writer = None
+        rows = 0
+        first = last = None
+        chunk: List[Mapping[str, Any]] = []
+
+        async def flush() -> None:
+            nonlocal writer
+            table = await asyncio.to_thread(_table, chunk)
+            if writer is None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                writer = pq.ParquetWriter(
+                    tmp, table.schema,
+                    compression=self.compression,
+                    use_dictionary=list(CATEGORICAL),
+                    write_statistics=True,
+                )
+            await asyncio.to_thread(writer.write_table, table, row_group_size=self.row_group_rows)
+            chunk.clear()
+
+        try:
+            async for doc in repo.iter_find(
+                {"data_hora_gmt": {"$gte": lo, "$lt": hi}},
+                [("data_hora_gmt", 1)],
+                projection=EXPORT_PROJECTION,
+                batch_size=settings.export_batch_size,
+            ):
+                chunk.append(doc)
+                rows += 1
+                first = first or doc.get("data_hora_gmt")
+                last = doc.get("data_hora_gmt") or last
+                if len(chunk) >= self.row_group_rows:
+                    await flush()
+            if chunk:
+                await flush()
+        except BaseException:
+            if writer is not None:
+                writer.close()
+            tmp.unlink(missing_ok=True)
+            raise
+        info: Dict[str, Any] = {
+            "rows": rows,
+            "min_data_hora_gmt": first,
+            "max_data_hora_gmt": last,
+            "exported_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        }
+        if writer is not None:
+            writer.close()
+            os.replace(tmp, path)
+            info.update(
+                path=str(path.relative_to(self.root)),
+                bytes=path.stat().st_size,
+                row_groups=pq.ParquetFile(path).num_row_groups,
+            )
+        else:
+            path.unlink(missing_ok=True)      # mês esvaziado desde a última exportação
+        self._record(month, info)
+        log.info("archive.month_exported", month=month, **{k: v for k, v in info.items() if k != "exported_at"})
+        return {"month": month, **info}
+
+    async def export_closed_months(
+        self,
+        repo: Repository,
+        *,
+        months: Optional[Sequence[str]] = None,
+        force: bool = False,
+        now: Optional[datetime] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Exporta os meses fechados ainda ausentes do manifesto (`force` reexporta),
+        do mês do foco mais antigo no Mongo até `last_closed_month()`.
+        `months` restringe a lista (meses abertos são ignorados).
+        """
+        _arrow()
+        last = last_closed_month(now)
+        if months is None:
+            oldest = await repo.find_one_sorted({}, [("data_hora_gmt", 1)], projection={"data_hora_gmt": 1})
+            if not oldest or not oldest.get("data_hora_gmt"):
+                return []
+            months = months_between(oldest["data_hora_gmt"], last)
+        done = self.manifest()
+        todo = [m for m in months if m <= last and (force or m not in done)]
+        skipped = [m for m in months if m > last]
+        if skipped:
+            log.info("archive.open_months_skipped", months=skipped, last_closed=last)
+        out = []
+        for m in todo:
+            out.append(await self.export_month(repo, m))
+        return out
+
+    # ---------- leitura ----------
+    def dataset(self):
+        pa, _, ds, _ = _arrow()
+        if not self.root.exists():
+            raise ArchiveUnavailable(f"arquivo vazio: {self.root}")
+        partitioning = ds.partitioning(pa.schema([("year", pa.int16()), ("month", pa.int8())]), flavor="hive")
+        return ds.dataset(self.root, format="parquet", partitioning=partitioning)
+
+    def plan(self, columns: Sequence[str], expr) -> Dict[str, Any]:
+        """O que o scanner lê para `expr`: arquivos (após poda de partições) e row groups (após estatísticas)."""
+        dataset = self.dataset()
+        total_files = total_rgs = files = rgs = 0
+        for frag in dataset.get_fragments():
+            total_files += 1
+            total_rgs += frag.metadata.num_row_groups
+        for frag in dataset.get_fragments(filter=expr):
+            kept = frag.split_by_row_group(expr, schema=dataset.schema) if expr is not None else [frag]
+            if kept:
+                files += 1
+                rgs += sum(f.metadata.num_row_groups for f in kept) if expr is None else len(kept)
+        return {
+            "columns": list(columns),
+            "files": files, "total_files": total_files,
+            "row_groups": rgs, "total_row_groups": total_rgs,
+        }
+
+    def _batches(self, columns: Sequence[str], expr) -> Iterator[Any]:
+        scanner = self.dataset().scanner(columns=list(columns), filter=expr, batch_size=self.row_group_rows)
+        for batch in scanner.to_batches():
+            if batch.num_rows:
+                yield batch
+
+    def stats(self, start: Optional[str] = None, end: Optional[str] = None, **eq: Optional[str]) -> Dict[str, Any]:
+        """Mesmo formato de `Repository.agg_stats` (+ `scan`), lendo só data e satélite."""
+        pa, pc, _, _ = _arrow()
+        expr = build_expression(start, end, **eq)
+        columns = ("data_hora_gmt", "satelite")
+        total = 0
+        lo = hi = None
+        by_sat: Dict[Optional[str], int] = {}
+        for batch in self._batches(columns, expr):
+            total += batch.num_rows
+            mm = pc.min_max(batch.column("data_hora_gmt"))
+            bmin, bmax = mm["min"].as_py(), mm["max"].as_py()
+            lo = bmin if lo is None or (bmin and bmin < lo) else lo
+            hi = bmax if hi is None or (bmax and bmax > hi) else hi
+            counts = pc.value_counts(batch.column("satelite"))
+            for v, n in zip(counts.field("values").to_pylist(), counts.field("counts").to_pylist()):
+                by_sat[v] = by_sat.get(v, 0) + n
+        iso = lambda d: d.strftime("%Y-%m-%dT%H:%M:%SZ") if d else None
+        return {
+            "total": total,
+            "min_data_hora_gmt": iso(lo),
+            "max_data_hora_gmt": iso(hi),
+            "by_satelite": [{"satelite": s, "count": n} for s, n in sorted(by_sat.items(), key=lambda kv: -kv[1])],
+            "scan": self.plan(columns, expr),
+        }
+
+    def timeseries(
+        self,
+        *,
+        interval: str,
+        group_by: Sequence[str] = (),
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        **eq: Optional[str],
+    ) -> Dict[str, Any]:
+        """
+        Linhas {bucket, <dims>, count, frp_sum} (mesmo formato de
+        services/timeseries.py) e `scan`; lê data, frp e as dimensões pedidas.
+        """
+        pa, pc, _, _ = _arrow()
+        start = _iso(start) if start else None
+        end = _iso(end, end=True) if end else None
+        if start and end:
+            buckets_between(start, end, interval)      # ValueError acima de MAX_BUCKETS
+        expr = build_expression(*bucket_bounds(start, end, interval), **eq)
+        dims = list(group_by)
+        columns = ("data_hora_gmt", "frp", *dims)
+        acc: Dict[Tuple[Any, ...], List[float]] = {}
+        for batch in self._batches(columns, expr):
+            floored = pc.floor_temporal(batch.column("data_hora_gmt"), unit=interval, week_starts_monday=True)
+            bucket = pc.strftime(floored, format=_BUCKET_FMT[interval])
+            table = pa.table(
+                [bucket, batch.column("frp"), *(batch.column(d) for d in dims)],
+                names=["bucket", "frp", *dims],
+            )
+            grouped = table.group_by(["bucket", *dims]).aggregate([([], "count_all"), ("frp", "sum")])
+            keys = list(zip(*(grouped.column(k).to_pylist() for k in ["bucket", *dims])))
+            for key, n, frp in zip(keys, grouped.column("count_all").to_pylist(), grouped.column("frp_sum").to_pylist()):
+                cur = acc.setdefault(key, [0, 0.0])
+                cur[0] += n
+                cur[1] += frp or 0.0
+        rows = [
+            {"bucket": key[0], **dict(zip(dims, key[1:])), "count": n, "frp_sum": frp}
+            for key, (n, frp) in sorted(acc.items(), key=lambda kv: tuple(str(k or "") for k in kv[0]))
+        ]
+        return {"rows": rows, "scan": self.plan(columns, expr)}
+
+_archive: Optional[Archive] = None
+
+def default_archive() -> Archive:
+    """Arquivo configurado em ARCHIVE_DIR (singleton); levanta ArchiveUnavailable se desligado."""
+    global _archive
+    if not settings.archive_dir:
+        raise ArchiveUnavailable("arquivo frio desligado: defina ARCHIVE_DIR")
+    if _archive is None:
+        _archive = Archive(settings.archive_dir)
+    return _archive
+
+async def archive_scheduled() -> None:
+    """Job do agendador: exporta os meses fechados que faltam no arquivo."""
+    from ..core.deps import get_read_repo
+    await default_archive().export_closed_months(await get_read_repo())
@@ -0,0 +1,250 @@
+# app/services/clustering.py
+"""
+Agrupamento incremental de focos em eventos de fogo.
+
+Dois focos pertencem ao mesmo evento quando caem na mesma célula ou em
+células vizinhas (3x3) de uma grade de EVENTS_CELL_KM e o horário do foco
+está a até EVENTS_GAP_HOURS da janela [first_seen, last_seen] do evento.
+
+Incremental: para cada lote ingerido só são carregados os eventos que
+ocupam células vizinhas aos focos novos e seguem ativos; focos já
+atribuídos (`event_id` no documento do foco) são ignorados. Um foco que
+liga dois eventos funde os dois no mais antigo. Com lotes em ordem de tempo
+(caso da ingestão) o resultado é o mesmo de agrupar o histórico inteiro;
+lotes fora de ordem podem dividir alguns eventos de outra forma.
+"""
+from __future__ import annotations
+import asyncio
+import math
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..utils.grid import point_of
+from .ingest_events import on_batch_written
+from .protocols import EventRepository
+
+log = get_logger()
+
+KM_PER_DEG = 111.32
+
+def _ts(s: str) -> float:
+    dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _iso(epoch: float) -> str:
+    return datetime.fromtimestamp(epoch, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+@dataclass
+class FireEvent:
+    id: str
+    first_seen: str
+    last_seen: str
+    count: int = 0
+    frp_max: Optional[float] = None
+    frp_sum: float = 0.0
+    sum_lon: float = 0.0
+    sum_lat: float = 0.0
+    extent: List[float] = field(default_factory=lambda: [math.inf, math.inf, -math.inf, -math.inf])
+    cells: Set[str] = field(default_factory=set)
+    satelites: Set[str] = field(default_factory=set)
+    estado: Optional[str] = None
+    bioma: Optional[str] = None
+
+    def add(self, lon: float, lat: float, ts: str, cell: str, d: Mapping[str, Any]) -> None:
+        self.count += 1
+        self.sum_lon += lon
+        self.sum_lat += lat
+        e = self.extent
+        self.extent = [min(e[0], lon), min(e[1], lat), max(e[2], lon), max(e[3], lat)]
+        self.first_seen = min(self.first_seen, ts)
+        self.last_seen = max(self.last_seen, ts)
+        self.cells.add(cell)
+        frp = d.get("frp")
+        if frp is not None:
+            frp = float(frp)
+            self.frp_sum += frp
+            self.frp_max = frp if self.frp_max is None else max(self.frp_max, frp)
+        if d.get("satelite"):
+            self.satelites.add(d["satelite"])
+        self.estado = self.estado or d.get("estado")
+        self.bioma = self.bioma or d.get("bioma")
+
+    def absorb(self, other: "FireEvent") -> None:
+        self.count += other.count
+        self.sum_lon += other.sum_lon
+        self.sum_lat += other.sum_lat
+        a, b = self.extent, other.extent
+        self.extent = [min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3])]
+        self.first_seen = min(self.first_seen, other.first_seen)
+        self.last_seen = max(self.last_seen, other.last_seen)
+        self.cells |= other.cells
+        self.satelites |= other.satelites
+        self.frp_sum += other.frp_sum
+        if other.frp_max is not None:
+            self.frp_max = other.frp_max if self.frp_max is None else max(self.frp_max, other.frp_max)
+        self.estado = self.estado or other.estado
+        self.bioma = self.bioma or other.bioma
+
+    def to_doc(self) -> Dict[str, Any]:
+        return {
+            "_id": self.id,
+            "id": self.id,
+            "centroid": {"type": "Point", "coordinates": [self.sum_lon / self.count, self.sum_lat / self.count]},
+            "extent": self.extent,
+            "first_seen": self.first_seen,
+            "last_seen": self.last_seen,
+            "count": self.count,
+            "frp_max": self.frp_max,
+            "frp_sum": round(self.frp_sum, 3),
+            "satelites": sorted(self.satelites),
+            "estado": self.estado,
+            "bioma": self.bioma,
+            "cells": sorted(self.cells),
+            "sum_lon": self.sum_lon,
+            "sum_lat": self.sum_lat,
+        }
+
+    @classmethod
+    def from_doc(cls, d: Mapping[str, Any]) -> "FireEvent":
+        return cls(
+            id=d["_id"],
+            first_seen=d["first_seen"],
+            last_seen=d["last_seen"],
+            count=d["count"],
+            frp_max=d.get("frp_max"),
+            frp_sum=d.get("frp_sum") or 0.0,
+            sum_lon=d["sum_lon"],
+            sum_lat=d["sum_lat"],
+            extent=list(d["extent"]),
+            cells=set(d.get("cells") or ()),
+            satelites=set(d.get("satelites") or ()),
+            estado=d.get("estado"),
+            bioma=d.get("bioma"),
+        )
+
+@dataclass
+class ClusterResult:
+    events: List[FireEvent]          # eventos criados/alterados (a gravar)
+    merged: Dict[str, str]           # evento absorvido -> evento vencedor
+    assignments: Dict[str, str]      # id do foco -> id do evento
+
+class EventClusterer:
+    """Motor puro (sem I/O): grade espacial + adjacência temporal."""
+
+    def __init__(self, cell_km: float, gap_hours: float) -> None:
+        self.cell_deg = cell_km / KM_PER_DEG
+        self.gap_s = gap_hours * 3600.0
+
+    def cell_of(self, lon: float, lat: float) -> Tuple[int, int]:
+        return math.floor(lon / self.cell_deg), math.floor(lat / self.cell_deg)
+
+    @staticmethod
+    def _neighbours(ix: int, iy: int) -> List[str]:
+        return [f"{ix + dx}:{iy + dy}" for dx in (-1, 0, 1) for dy in (-1, 0, 1)]
+
+    def detections(self, docs: Iterable[Mapping[str, Any]]) -> List[Tuple[str, float, float, str, Mapping[str, Any]]]:
+        """(id, lon, lat, ts, doc) dos focos com ponto e data, sem repetidos, em ordem de tempo."""
+        seen: Dict[str, Tuple[str, float, float, str, Mapping[str, Any]]] = {}
+        for d in docs:
+            fid, ts, pt = d.get("id") or d.get("_id"), d.get("data_hora_gmt"), point_of(d)
+            if fid and ts and pt is not None:
+                seen[str(fid)] = (str(fid), pt[0], pt[1], ts, d)
+        return sorted(seen.values(), key=lambda r: r[3])
+
+    def search_cells(self, dets: Sequence[Tuple[str, float, float, str, Mapping[str, Any]]]) -> List[str]:
+        cells: Set[str] = set()
+        for _, lon, lat, _, _ in dets:
+            cells.update(self._neighbours(*self.cell_of(lon, lat)))
+        return sorted(cells)
+
+    def cluster(
+        self,
+        dets: Sequence[Tuple[str, float, float, str, Mapping[str, Any]]],
+        candidates: Iterable[FireEvent],
+    ) -> ClusterResult:
+        events: Dict[str, FireEvent] = {e.id: e for e in candidates}
+        persisted = set(events)
+        by_cell: Dict[str, Set[str]] = {}
+        for e in events.values():
+            for c in e.cells:
+                by_cell.setdefault(c, set()).add(e.id)
+
+        touched: Set[str] = set()
+        merged: Dict[str, str] = {}
+        assignments: Dict[str, str] = {}
+        for fid, lon, lat, ts, d in dets:
+            ix, iy = self.cell_of(lon, lat)
+            cell = f"{ix}:{iy}"
+            t = _ts(ts)
+            lo, hi = _iso(t - self.gap_s), _iso(t + self.gap_s)
+            matches = {
+                eid
+                for c in self._neighbours(ix, iy)
+                for eid in by_cell.get(c, ())
+                if events[eid].last_seen >= lo and events[eid].first_seen <= hi
+            }
+            if not matches:
+                ev = events[f"evt-{fid}"] = FireEvent(id=f"evt-{fid}", first_seen=ts, last_seen=ts)
+            else:
+                # vence o evento mais antigo; os demais são absorvidos
+                ordered = sorted((events[eid] for eid in matches), key=lambda e: (e.first_seen, e.id))
+                ev = ordered[0]
+                for loser in ordered[1:]:
+                    ev.absorb(loser)
+                    for c in loser.cells:
+                        ids = by_cell[c]
+                        ids.discard(loser.id)
+                        ids.add(ev.id)
+                    del events[loser.id]
+                    touched.discard(loser.id)
+                    if loser.id in persisted:
+                        merged[loser.id] = ev.id
+                    for k, v in merged.items():
+                        if v == loser.id:
+                            merged[k] = ev.id
+                    for k, v in assignments.items():
+                        if v == loser.id:
+                            assignments[k] = ev.id
+            ev.add(lon, lat, ts, cell, d)
+            by_cell.setdefault(cell, set()).add(ev.id)
+            touched.add(ev.id)
+            assignments[fid] = ev.id
+
+        return ClusterResult([events[eid] for eid in sorted(touched)], merged, assignments)
+
+_lock = asyncio.Lock()
+
+async def cluster_batch(store: EventRepository, docs: Sequence[Mapping[str, Any]], engine: Optional[EventClusterer] = None) -> ClusterResult:
+    """Atribui os focos de um lote a eventos (novos ou existentes) e grava o resultado."""
+    engine = engine or EventClusterer(settings.events_cell_km, settings.events_gap_hours)
+    # um lote por vez no processo: dois lotes vizinhos não criam eventos duplicados
+    async with _lock:
+        dets = engine.detections(docs)
+        if dets:
+            done = await store.assigned([fid for fid, *_ in dets])
+            dets = [r for r in dets if r[0] not in done]
+        if not dets:
+            return ClusterResult([], {}, {})
+        since = _iso(_ts(dets[0][3]) - engine.gap_s)
+        candidates = [FireEvent.from_doc(d) for d in await store.candidates(engine.search_cells(dets), since)]
+        result = engine.cluster(dets, candidates)
+        await store.save([e.to_doc() for e in result.events], result.merged, result.assignments)
+        return result
+
+@on_batch_written
+async def _cluster_events(docs: Sequence[Dict[str, Any]]) -> None:
+    if not settings.events_enabled or settings.repo_backend != "mongo":
+        return      # eventos vivem no Mongo (EventRepository); sem Atlas não há agrupamento
+    from ..core.deps import get_events_repo    # evita import circular (deps -> services)
+    from ..core.db import get_mongo
+    result = await cluster_batch(get_events_repo(await get_mongo()), docs)
+    if result.assignments:
+        log.info("events.clustered",
+                 detections=len(result.assignments),
+                 events=len(result.events),
+                 merged=len(result.merged))
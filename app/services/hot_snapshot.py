@@ -0,0 +1,235 @@
+# app/services/hot_snapshot.py
+"""
+Snapshot colunar em memória da janela quente (últimas HOT_WINDOW_HOURS).
+
+A camada 48h tem de milhares a dezenas de milhares de focos: cabe inteira em
+arrays NumPy (lon, lat, frp, epoch) + categorias codificadas em dicionário
+(satelite/estado/bioma/municipio). Filtros viram máscaras vetorizadas e
+bbox/raio usam um índice de grade uniforme (células ordenadas + searchsorted).
+
+- carga: preguiçosa na primeira consulta (ou no bootstrap), recarga periódica
+  (HOT_SNAPSHOT_REFRESH_S) para pegar escritas de outras instâncias;
+- patch: após cada lote ingerido (`on_batch_written`), só se algum foco cair na janela.
+
+/data/recent e /data/find usam o snapshot quando a consulta cabe na janela
+e caem no repositório caso contrário.
+"""
+from __future__ import annotations
+import asyncio
+import math
+from datetime import datetime, timedelta, timezone
+from time import monotonic, perf_counter
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..core.metrics import REGISTRY
+from ..models.schemas import QueryParams
+from ..repositories.mongo_repo import FOCUS_PROJECTION
+from ..utils.fast_json import focus_item_dict
+from ..utils.geo import EARTH_RADIUS_KM, parse_bbox
+from .ingest_events import on_batch_written
+from .protocols import Repository
+
+log = get_logger()
+
+CATEGORICAL = ("satelite", "estado", "bioma", "municipio")
+
+def _epoch(ts: Optional[str]) -> float:
+    if not ts:
+        return math.nan
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return math.nan
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+def _bound(ts: str, *, end: bool = False) -> float:
+    """Mesma regra do filtro Mongo: `end` só com data inclui o dia inteiro."""
+    if "T" not in ts:
+        ts = f"{ts}T{'23:59:59Z' if end else '00:00:00Z'}"
+    return _epoch(ts)
+
+def _encode(values: Sequence[Optional[str]]) -> Tuple[np.ndarray, Dict[str, int]]:
+    vocab: Dict[str, int] = {}
+    codes = np.fromiter(
+        (-1 if v is None else vocab.setdefault(v, len(vocab)) for v in values),
+        dtype=np.int32, count=len(values),
+    )
+    return codes, vocab
+
+class HotSnapshot:
+    def __init__(self, window_hours: float, cell_deg: float) -> None:
+        self.window = timedelta(hours=window_hours)
+        self.cell_deg = cell_deg
+        self._ncols = int(math.ceil(360.0 / cell_deg)) + 1
+        self._rows: Dict[str, Dict[str, Any]] = {}
+        self._lock = asyncio.Lock()
+        self.loaded = False
+        self.loaded_at = 0.0
+        self.window_start = ""      # ISO do início da janela no último build
+        self._build(datetime.now(timezone.utc))
+
+    # ---------- build ----------
+    def _build(self, now: datetime) -> None:
+        start = now - self.window
+        self.window_start = start.strftime("%Y-%m-%dT%H:%M:%SZ")
+        min_t = start.timestamp()
+
+        items = [it for it in self._rows.values() if it["_t"] >= min_t]
+        self._rows = {it["id"]: it for it in items}
+        n = len(items)
+
+        self.items = items
+        self.t = np.fromiter((it["_t"] for it in items), dtype=np.float64, count=n)
+        self.lon = np.array([np.nan if it["longitude"] is None else it["longitude"] for it in items], dtype=np.float64)
+        self.lat = np.array([np.nan if it["latitude"] is None else it["latitude"] for it in items], dtype=np.float64)
+        self.frp = np.array([np.nan if it["frp"] is None else it["frp"] for it in items], dtype=np.float64)
+        self.codes: Dict[str, np.ndarray] = {}
+        self.vocab: Dict[str, Dict[str, int]] = {}
+        for field in CATEGORICAL:
+            self.codes[field], self.vocab[field] = _encode([it[field] for it in items])
+
+        # índice de grade: células ordenadas; pontos sem coordenada ficam fora (-1)
+        has_xy = ~(np.isnan(self.lon) | np.isnan(self.lat))
+        ix = np.floor((np.nan_to_num(self.lon) + 180.0) / self.cell_deg).astype(np.int64)
+        iy = np.floor((np.nan_to_num(self.lat) + 90.0) / self.cell_deg).astype(np.int64)
+        cells = np.where(has_xy, iy * self._ncols + ix, -1)
+        self._cell_order = np.argsort(cells, kind="stable")
+        self._sorted_cells = cells[self._cell_order]
+        # ordem por tempo desc para /recent
+        self._recent_order = np.argsort(-self.t, kind="stable")
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @staticmethod
+    def _item(doc: Mapping[str, Any]) -> Dict[str, Any]:
+        it = focus_item_dict(doc)
+        it["_t"] = _epoch(it["data_hora_gmt"])
+        return it
+
+    async def load(self, repo: Repository, *, seen_at: Optional[float] = None) -> None:
+        """
+        (Re)carrega a janela a partir do repositório. `seen_at` é o `loaded_at`
+        que o chamador viu antes de esperar o lock: se outro chamador recarregou
+        nesse meio-tempo, não repete a carga.
+        """
+        async with self._lock:
+            if seen_at is not None and self.loaded and self.loaded_at != seen_at:
+                return
+            t0 = perf_counter()
+            now = datetime.now(timezone.utc)
+            start = (now - self.window).strftime("%Y-%m-%dT%H:%M:%SZ")
+            rows: Dict[str, Dict[str, Any]] = {}
+            async for d in repo.iter_find(
+                {"data_hora_gmt": {"$gte": start}}, [("data_hora_gmt", -1)], projection=FOCUS_PROJECTION,
+            ):
+                it = self._item(d)
+                rows[it["id"]] = it
+            self._rows = rows
+            self._build(now)
+            self.loaded = True
+            self.loaded_at = monotonic()
+            log.info("hot_snapshot.loaded", rows=len(self), duration_ms=int((perf_counter() - t0) * 1000))
+
+    async def ensure_loaded(self, repo: Repository) -> bool:
+        if not settings.hot_snapshot_enabled:
+            return False
+        seen_at = self.loaded_at
+        stale = monotonic() - seen_at > settings.hot_snapshot_refresh_s
+        if not self.loaded or stale:
+            if self._lock.locked() and self.loaded:
+                return True     # recarga em andamento: serve o snapshot atual
+            await self.load(repo, seen_at=seen_at)
+        return True
+
+    def patch(self, docs: Sequence[Mapping[str, Any]]) -> int:
+        now = datetime.now(timezone.utc)
+        min_t = (now - self.window).timestamp()
+        changed = 0
+        for d in docs:
+            it = self._item(d)
+            if it["_t"] >= min_t:
+                self._rows[it["id"]] = it
+                changed += 1
+        if changed:
+            self._build(now)
+        return changed
+
+    # ---------- consultas ----------
+    def covers(self, q: QueryParams) -> bool:
+        """A consulta só enxerga a janela quente? (exige `start` dentro dela)."""
+        return bool(q.start) and _bound(q.start) >= _epoch(self.window_start)
+
+    def recent(self, limit: int) -> Optional[List[Dict[str, Any]]]:
+        """Mais recentes; None se o snapshot tiver menos de `limit` linhas."""
+        if len(self) < limit:
+            return None
+        return [self.items[i] for i in self._recent_order[:limit]]
+
+    def _grid_candidates(self, min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> np.ndarray:
+        d = self.cell_deg
+        ix0, ix1 = int((max(min_lon, -180.0) + 180.0) // d), int((min(max_lon, 180.0) + 180.0) // d)
+        iy0, iy1 = int((max(min_lat, -90.0) + 90.0) // d), int((min(max_lat, 90.0) + 90.0) // d)
+        parts = []
+        for iy in range(iy0, iy1 + 1):
+            lo = np.searchsorted(self._sorted_cells, iy * self._ncols + ix0, side="left")
+            hi = np.searchsorted(self._sorted_cells, iy * self._ncols + ix1, side="right")
+            if hi > lo:
+                parts.append(self._cell_order[lo:hi])
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def find(self, q: QueryParams, *, limit: int, skip: int = 0) -> List[Dict[str, Any]]:
+        idx: Optional[np.ndarray] = None
+        if q.bbox:
+            min_lon, min_lat, max_lon, max_lat = parse_bbox(q.bbox)
+            idx = self._grid_candidates(min_lon, min_lat, max_lon, max_lat)
+        elif q.near_lon is not None and q.near_lat is not None and q.near_km:
+            dlat = math.degrees(q.near_km / EARTH_RADIUS_KM)
+            dlon = dlat / max(math.cos(math.radians(q.near_lat)), 1e-6)
+            idx = self._grid_candidates(q.near_lon - dlon, q.near_lat - dlat, q.near_lon + dlon, q.near_lat + dlat)
+        if idx is None:
+            idx = np.arange(len(self), dtype=np.int64)
+
+        mask = np.ones(idx.shape[0], dtype=bool)
+        for field in CATEGORICAL:
+            value = getattr(q, field)
+            if value:
+                code = self.vocab[field].get(value)
+                if code is None:
+                    return []
+                mask &= self.codes[field][idx] == code
+        t = self.t[idx]
+        if q.start:
+            mask &= t >= _bound(q.start)
+        if q.end:
+            mask &= t <= _bound(q.end, end=True)
+        if q.bbox:
+            lon, lat = self.lon[idx], self.lat[idx]
+            mask &= (lon >= min_lon) & (lon <= max_lon) & (lat >= min_lat) & (lat <= max_lat)
+        elif q.near_lon is not None and q.near_lat is not None and q.near_km:
+            lon, lat = np.radians(self.lon[idx]), np.radians(self.lat[idx])
+            lon0, lat0 = math.radians(q.near_lon), math.radians(q.near_lat)
+            a = np.sin((lat - lat0) / 2) ** 2 + math.cos(lat0) * np.cos(lat) * np.sin((lon - lon0) / 2) ** 2
+            mask &= 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a)) <= q.near_km
+
+        sel = idx[mask]
+        order = np.argsort(self.t[sel], kind="stable")
+        if q.sort.startswith("-"):
+            order = order[::-1]
+        return [self.items[i] for i in sel[order][skip:skip + limit]]
+
+hot_snapshot = HotSnapshot(settings.hot_window_hours, settings.hot_grid_deg)
+REGISTRY.gauge("inpe_hot_snapshot_rows", "Focos no snapshot em memória da janela quente.", fn=lambda: len(hot_snapshot))
+
+@on_batch_written
+async def _patch_snapshot(docs: Sequence[Dict[str, Any]]) -> None:
+    if hot_snapshot.loaded:
+        changed = hot_snapshot.patch(docs)
+        if changed:
+            log.debug("hot_snapshot.patched", rows=changed, size=len(hot_snapshot))
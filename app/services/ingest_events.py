@@ -0,0 +1,31 @@
+# app/services/ingest_events.py
+"""
+Ganchos pós-escrita da ingestão.
+
+Módulos que mantêm estado derivado dos focos (caches, snapshots, etc.)
+registram uma coroutine com `@on_batch_written`; a ingestão chama
+`publish_batch(docs)` depois de cada `upsert_many`. Falha de um gancho é
+logada e não interrompe a ingestão.
+"""
+from __future__ import annotations
+from typing import Any, Awaitable, Callable, Dict, Sequence
+
+from ..core.logging_config import get_logger
+
+log = get_logger()
+
+BatchHook = Callable[[Sequence[Dict[str, Any]]], Awaitable[None]]
+
+_hooks: list[BatchHook] = []
+
+def on_batch_written(fn: BatchHook) -> BatchHook:
+    """Decorator: registra `fn(docs)` para rodar após cada lote gravado."""
+    _hooks.append(fn)
+    return fn
+
+async def publish_batch(docs: Sequence[Dict[str, Any]]) -> None:
+    for hook in _hooks:
+        try:
+            await hook(docs)
+        except Exception:
+            log.exception("ingest.hook_failed", hook=getattr(hook, "__qualname__", repr(hook)))
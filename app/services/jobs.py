@@ -0,0 +1,413 @@
+# app/services/jobs.py
+"""
+Jobs de ingestão em segundo plano.
+
+`POST /ingest/*?background=true` enfileira um job e responde na hora com o id;
+um pool de JOBS_WORKERS workers (limite global de jobs rodando ao mesmo
+tempo) consome a fila. Cada job é uma `LayerSpec` (camada do registro ou
+derivada do endpoint: initial/incremental/48h) executada pelo caminho normal
+(`_ingest_features` sobre a fonte e o pool HTTP do `layer_runner`).
+
+Numa camada `range` a janela é dividida em fatias de `chunk_days`; as fatias
+rodam em grupos de `concurrency` e cada grupo concluído é um checkpoint
+gravado no repositório de jobs (MONGODB_JOBS_COLLECTION, ou tabela no
+SQLITE_PATH). Num reinício, jobs `queued`/`running` voltam para a fila e o
+backfill continua da primeira fatia não concluída (o grupo interrompido é
+refeito: upsert idempotente).
+
+Progresso ao vivo (features buscadas/gravadas, taxa, ETA) vem do job em
+memória; o documento gravado é atualizado a cada JOBS_SAVE_INTERVAL_S. Os
+jobs pertencem ao processo que os roda (como o agendador): desligados por
+padrão (JOBS_ENABLED); com vários workers do uvicorn, habilite-os num só.
+Se o repositório de jobs não responde no start, ele é refeito com backoff
+(em segundo plano e na próxima requisição a /jobs ou ?background=true).
+"""
+from __future__ import annotations
+import asyncio
+import uuid
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .layers import LayerRunner, LayerSpec, day_chunks, layer_runner, merge_streams
+from .protocols import JobRepository
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..utils.time_windows import window_from_last
+
+log = get_logger()
+
+_CHECKPOINTED = ("chunks_done", "fetched", "written", "upserted")
+_START_BACKOFF_MAX_S = 60.0
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+class QueueFull(RuntimeError):
+    """Fila de jobs cheia (JOBS_MAX_QUEUED)."""
+
+@dataclass
+class JobProgress:
+    """Contadores atualizados por `_ingest_features` (fetched por feature, written/upserted por lote)."""
+    fetched: int = 0
+    written: int = 0
+    upserted: int = 0
+    chunks_done: int = 0
+    chunks_total: int = 0
+    expected: Optional[int] = None      # resultType=hits da janela inteira, se a fonte sabe contar
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    spec: LayerSpec
+    start: Optional[str] = None
+    end: Optional[str] = None
+    dry_run: bool = False
+    status: str = "queued"
+    created_at: str = field(default_factory=_now)
+    started_at: Optional[str] = None
+    finished_at: Optional[str] = None
+    attempts: int = 0
+    last_seen: Optional[str] = None
+    error: Optional[str] = None
+    progress: JobProgress = field(default_factory=JobProgress)
+    checkpoint: Dict[str, int] = field(default_factory=dict)
+    elapsed_s: float = 0.0              # tempo rodando em execuções anteriores (antes de reinícios)
+    requested: Optional[Tuple[Optional[str], Optional[str]]] = None   # (start, end) como submetidos
+    _t0: Optional[float] = field(default=None, repr=False)
+    _task: Optional[asyncio.Task] = field(default=None, repr=False)
+    _cancel: bool = field(default=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.requested is None:
+            self.requested = (self.start, self.end)
+
+    @property
+    def key(self) -> tuple:
+        """
+        Jobs equivalentes (mesma camada, janela pedida e dry_run) não são
+        enfileirados duas vezes. Usa a janela submetida, não a que `_ingest`
+        fixa depois (senão um incremental rodando não casaria com o repetido).
+        """
+        return (self.kind, self.spec.name, self.spec.typename, self.spec.collection, *self.requested, self.dry_run)
+
+    def running_s(self) -> float:
+        return self.elapsed_s + (monotonic() - self._t0 if self._t0 is not None else 0.0)
+
+    def eta_s(self, running: float) -> Optional[float]:
+        p = self.progress
+        if self.status != "running" or running <= 0:
+            return None
+        if p.expected and p.fetched:
+            return max(p.expected - p.fetched, 0) * running / p.fetched
+        if p.chunks_total and p.chunks_done:
+            return (p.chunks_total - p.chunks_done) * running / p.chunks_done
+        return None
+
+    def to_doc(self) -> Dict[str, Any]:
+        running = self.running_s()
+        p = self.progress
+        return {
+            "_id": self.id,
+            "kind": self.kind,
+            "layer": self.spec.name,
+            "spec": asdict(self.spec),
+            "start": self.start,
+            "end": self.end,
+            "requested": list(self.requested),
+            "dry_run": self.dry_run,
+            "status": self.status,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "attempts": self.attempts,
+            "last_seen": self.last_seen,
+            "error": self.error,
+            "progress": asdict(p),
+            "checkpoint": self.checkpoint,
+            "elapsed_s": round(running, 3),
+            "rate_per_s": round(p.fetched / running, 1) if running > 0 else None,
+            "eta_s": round(eta, 1) if (eta := self.eta_s(running)) is not None else None,
+        }
+
+    @classmethod
+    def from_doc(cls, doc: Dict[str, Any]) -> "Job":
+        return cls(
+            id=doc["_id"],
+            kind=doc["kind"],
+            spec=LayerSpec(**doc["spec"]),
+            start=doc.get("start"),
+            end=doc.get("end"),
+            requested=tuple(doc["requested"]) if doc.get("requested") else (doc.get("start"), doc.get("end")),
+            dry_run=doc.get("dry_run", False),
+            status=doc.get("status", "queued"),
+            created_at=doc["created_at"],
+            started_at=doc.get("started_at"),
+            attempts=doc.get("attempts", 0),
+            last_seen=doc.get("last_seen"),
+            progress=JobProgress(**doc.get("progress") or {}),
+            checkpoint=dict(doc.get("checkpoint") or {}),
+            elapsed_s=doc.get("elapsed_s") or 0.0,
+        )
+
+class JobManager:
+    """
+    Fila + pool de workers dos jobs de ingestão.
+
+    `repo_factory()` devolve o repositório de jobs (injetável; padrão
+    `get_jobs_repo`); `runner` fornece fonte e repositório de destino de cada
+    `LayerSpec` (padrão: o `layer_runner` global).
+    """
+    def __init__(
+        self,
+        *,
+        workers: Optional[int] = None,
+        max_queued: Optional[int] = None,
+        runner: LayerRunner = layer_runner,
+        repo_factory: Optional[Callable[[], Awaitable[JobRepository]]] = None,
+    ) -> None:
+        self.workers = workers or settings.jobs_workers
+        self.max_queued = max_queued if max_queued is not None else settings.jobs_max_queued
+        self.runner = runner
+        self._repo_factory = repo_factory
+        self.repo: Optional[JobRepository] = None
+        self.jobs: Dict[str, Job] = {}          # jobs não terminados deste processo
+        self._queue: asyncio.Queue[Job] = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._start_lock = asyncio.Lock()
+        self._retry: Optional[asyncio.Task] = None
+        self._backoff = 0.0
+        self._next_try = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    @property
+    def queued(self) -> int:
+        """Jobs vivos esperando worker (cancelados na fila não contam, embora sigam no Queue)."""
+        return sum(1 for j in self.jobs.values() if j.status == "queued" and not j._cancel)
+
+    # ---------- ciclo de vida ----------
+    async def start(self) -> None:
+        """Abre o repositório, recoloca na fila os jobs interrompidos e sobe os workers."""
+        async with self._start_lock:
+            if self._tasks:
+                return
+            if self._repo_factory is None:
+                from ..core.deps import get_jobs_repo
+                self._repo_factory = get_jobs_repo
+            repo = await self._repo_factory()
+            resumed = [Job.from_doc(doc) for doc in await repo.unfinished()]
+            self.repo = repo
+            for job in resumed:
+                job.status = "queued"
+                self.jobs[job.id] = job
+                self._queue.put_nowait(job)
+            self._tasks = [asyncio.create_task(self._worker(i), name=f"ingest-job-{i}") for i in range(self.workers)]
+            self._backoff = 0.0
+            log.info("jobs.started", workers=self.workers, resumed=len(resumed))
+
+    async def ensure_started(self) -> bool:
+        """
+        True se os workers estão de pé. Com JOBS_ENABLED, tenta (re)fazer o
+        start que falhou, respeitando o backoff entre tentativas.
+        """
+        if self._tasks:
+            return True
+        if not settings.jobs_enabled or monotonic() < self._next_try:
+            return False
+        try:
+            await self.start()
+        except Exception:
+            self._backoff = min(max(self._backoff * 2, 1.0), _START_BACKOFF_MAX_S)
+            self._next_try = monotonic() + self._backoff
+            log.exception("jobs.start_failed", retry_in_s=self._backoff)
+            return False
+        return True
+
+    def start_in_background(self) -> None:
+        """Insiste no start com backoff até subir (repositório fora do ar no boot)."""
+        async def _loop() -> None:
+            while not await self.ensure_started():
+                await asyncio.sleep(max(self._next_try - monotonic(), 0.1))
+            self._retry = None
+
+        if self._retry is None and not self._tasks:
+            self._retry = asyncio.create_task(_loop(), name="ingest-jobs-start")
+
+    async def stop(self) -> None:
+        """Cancela os workers; jobs em andamento ficam `queued` (com checkpoint) para o próximo start."""
+        if self._retry is not None:
+            self._retry.cancel()
+            await asyncio.gather(self._retry, return_exceptions=True)
+            self._retry = None
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        close = getattr(self.repo, "close", None)
+        if close is not None:
+            close()
+        self.repo = None
+        self.jobs.clear()
+        self._queue = asyncio.Queue()
+
+    # ---------- API ----------
+    async def submit(
+        self,
+        kind: str,
+        spec: LayerSpec,
+        *,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        dry_run: bool = False,
+    ) -> Job:
+        """Enfileira (ou devolve o job equivalente ainda não terminado). QueueFull acima de JOBS_MAX_QUEUED."""
+        job = Job(id=uuid.uuid4().hex, kind=kind, spec=spec, start=start, end=end, dry_run=dry_run)
+        for other in self.jobs.values():
+            if other.key == job.key:
+                return other
+        if (queued := self.queued) >= self.max_queued:
+            raise QueueFull(f"{queued} jobs na fila")
+        self.jobs[job.id] = job
+        await self._save(job)
+        self._queue.put_nowait(job)
+        log.info("jobs.queued", job_id=job.id, kind=kind, layer=spec.name, start=start, end=end)
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self.jobs.get(job_id)
+        if job is not None:
+            return job.to_doc()
+        return await self.repo.get(job_id) if self.repo is not None else None
+
+    async def find(self, status: Optional[str] = None, kind: Optional[str] = None, limit: int = 50, skip: int = 0) -> list[Dict[str, Any]]:
+        """Jobs gravados (mais recentes primeiro); os deste processo com o progresso ao vivo."""
+        docs = await self.repo.find(status, kind, limit, skip) if self.repo is not None else []
+        return [self.jobs[d["_id"]].to_doc() if d["_id"] in self.jobs else d for d in docs]
+
+    async def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancela um job na fila ou rodando; job terminado volta como está. None se não existe."""
+        job = self.jobs.get(job_id)
+        if job is None:
+            return await self.get(job_id)
+        job._cancel = True
+        if job._task is not None:
+            job._task.cancel()              # o worker grava o estado `cancelled`
+            await asyncio.gather(job._task, return_exceptions=True)
+        else:
+            await self._finish(job, "cancelled")
+        return job.to_doc()
+
+    # ---------- execução ----------
+    async def _save(self, job: Job) -> None:
+        if self.repo is None:
+            return
+        try:
+            await self.repo.save(job.to_doc())
+        except Exception:
+            log.exception("jobs.save_failed", job_id=job.id)
+
+    async def _finish(self, job: Job, status: str, error: Optional[str] = None) -> None:
+        job.elapsed_s = job.running_s()
+        job._t0 = None
+        job.status, job.error, job.finished_at = status, error, _now()
+        self.jobs.pop(job.id, None)
+        await self._save(job)
+        log.info("jobs.finished", job_id=job.id, kind=job.kind, status=status, error=error,
+                 elapsed_s=round(job.elapsed_s, 1), **asdict(job.progress))
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            job = await self._queue.get()
+            if job.status != "queued" or job._cancel:
+                continue
+            job._task = asyncio.create_task(self._execute(job), name=f"ingest-job-{job.id}")
+            try:
+                await asyncio.shield(job._task)
+            except asyncio.CancelledError:
+                if not job._task.done():        # desligando: interrompe o job, que volta a `queued`
+                    job._task.cancel()
+                    await asyncio.gather(job._task, return_exceptions=True)
+                    raise
+            finally:
+                job._task = None
+
+    async def _saver(self, job: Job) -> None:
+        while True:
+            await asyncio.sleep(settings.jobs_save_interval_s)
+            await self._save(job)
+
+    async def _execute(self, job: Job) -> None:
+        job.status, job.attempts = "running", job.attempts + 1
+        job.started_at = job.started_at or _now()
+        job._t0 = monotonic()
+        # retoma do último checkpoint: o trecho depois dele é refeito, os contadores também
+        for k in _CHECKPOINTED:
+            setattr(job.progress, k, job.checkpoint.get(k, 0))
+        await self._save(job)
+        saver = asyncio.create_task(self._saver(job))
+        try:
+            await self._ingest(job)
+        except asyncio.CancelledError:
+            saver.cancel()
+            if job._cancel:
+                await self._finish(job, "cancelled")
+            else:
+                job.elapsed_s, job._t0, job.status = job.running_s(), None, "queued"
+                await self._save(job)
+                log.info("jobs.interrupted", job_id=job.id, **job.checkpoint)
+            raise
+        except Exception as exc:
+            saver.cancel()
+            log.exception("jobs.failed", job_id=job.id, kind=job.kind)
+            await self._finish(job, "error", f"{type(exc).__name__}: {exc}")
+        else:
+            saver.cancel()
+            await self._finish(job, "ok")
+
+    def _checkpoint(self, job: Job) -> None:
+        job.checkpoint = {k: getattr(job.progress, k) for k in _CHECKPOINTED}
+
+    async def _ingest(self, job: Job) -> None:
+        from ..api.v1.routers.ingest import _ingest_features   # import tardio: o router importa este módulo
+
+        spec, p = job.spec, job.progress
+        source = self.runner.source_for(spec)
+        repo = await self.runner.repo_for(spec)
+        if spec.mode == "48h":
+            p.chunks_total = 1
+            await _ingest_features(repo, source.iter_48h(), spec.name, dry_run=job.dry_run,
+                                   publish=spec.publishes, progress=p)
+            p.chunks_done = 1
+            return
+        if job.start is None or job.end is None:
+            # janela fixada na primeira execução: a retomada não a recalcula
+            if job.start is None:
+                job.last_seen = await self.runner._last_seen(repo, spec)
+            window = window_from_last(job.last_seen, days=spec.lookback_days)
+            job.start, job.end = job.start or window[0], job.end or window[1]
+        chunks = day_chunks(job.start, job.end, spec.chunk_days)
+        p.chunks_total = len(chunks)
+        if p.expected is None and hasattr(source, "count"):
+            try:
+                p.expected = await source.count(job.start, job.end, typename=spec.typename)  # type: ignore[attr-defined]
+            except Exception as exc:
+                log.warning("jobs.count_failed", job_id=job.id, error=str(exc))
+        await self._save(job)
+        for i in range(p.chunks_done, len(chunks), spec.concurrency):
+            group = chunks[i:i + spec.concurrency]
+            feats = merge_streams(
+                [lambda a=a, b=b: source.iter_range(a, b, typename=spec.typename) for a, b in group],
+                spec.concurrency,
+            )
+            await _ingest_features(repo, feats, spec.name, dry_run=job.dry_run,
+                                   publish=spec.publishes, progress=p)
+            p.chunks_done = i + len(group)
+            self._checkpoint(job)
+            await self._save(job)
+
+job_manager = JobManager()
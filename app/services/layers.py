@@ -0,0 +1,328 @@
+# app/services/layers.py
+"""
+Registro de camadas WFS e sincronização concorrente de várias camadas.
+
+Cada camada (`LayerSpec`) tem typeName, campo de data, ordenação, coleção de
+destino, agenda (cron) e um orçamento de concorrência próprio. O registro vem
+de WFS_LAYERS (JSON: lista de objetos com os campos de `LayerSpec`, ou o
+caminho de um arquivo .json); sem ele, é derivado de WFS_TYPENAME /
+WFS_TYPENAME_HIST / SCHEDULE_CRON (comportamento anterior).
+
+`LayerRunner` sincroniza as camadas em paralelo sobre um único pool HTTP
+(limite global WFS_MAX_CONNECTIONS). Numa camada `range`, a janela é dividida
+em fatias de `chunk_days` e até `concurrency` fatias paginam ao mesmo tempo;
+as features são gravadas por um único consumidor (o mesmo `_ingest_features`
+dos endpoints /ingest/*). Uma camada nunca roda duas vezes ao mesmo tempo
+(agenda + chamada manual): a segunda execução volta como `skipped`.
+"""
+from __future__ import annotations
+import asyncio
+import json
+from dataclasses import asdict, dataclass, fields
+from datetime import date, timedelta
+from pathlib import Path
+from time import perf_counter
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Literal, Optional, Sequence
+
+import httpx
+
+from .protocols import FireSource, Repository
+from .wfs_service import WfsFireSource
+from ..core.config import settings
+from ..core.db import focus_indexes, get_mongo
+from ..core.logging_config import get_logger
+from ..repositories.mongo_repo import MongoRepository
+from ..utils.time_windows import window_from_last
+
+log = get_logger()
+
+@dataclass
+class LayerSpec:
+    """
+    Uma camada WFS sincronizada.
+
+    - `mode="48h"`: camada já recortada no servidor (sem CQL, pagina tudo);
+      `mode="range"`: janela por data desde o último foco gravado na coleção
+      (ou `lookback_days` se vazia), em fatias de `chunk_days`.
+    - `collection`: coleção de destino (padrão MONGODB_COLLECTION). Só a
+      coleção principal aciona os ganchos pós-escrita (snapshot, caches, push).
+    - `schedule`: cron de 5 campos; vazio = só sob demanda.
+    - `concurrency`: fatias paginando ao mesmo tempo nesta camada.
+    - `retention_hours`: o typename só guarda as últimas N horas (ex.: a
+      camada 48h do INPE); a reconciliação não olha dias anteriores a isso.
+    """
+    name: str
+    typename: str
+    mode: Literal["48h", "range"] = "range"
+    collection: str = ""
+    date_field: str = "data_hora_gmt"
+    sortby: str = ""
+    schedule: Optional[str] = None
+    concurrency: int = 1
+    chunk_days: int = 1
+    lookback_days: int = 7
+    retention_hours: Optional[int] = None
+    enabled: bool = True
+
+    def __post_init__(self) -> None:
+        self.collection = self.collection or settings.mongodb_coll
+        self.sortby = self.sortby or self.date_field
+        if self.mode not in ("48h", "range"):
+            raise ValueError(f"camada {self.name!r}: mode deve ser '48h' ou 'range'")
+        if self.concurrency < 1 or self.chunk_days < 1:
+            raise ValueError(f"camada {self.name!r}: concurrency e chunk_days devem ser >= 1")
+
+    @property
+    def publishes(self) -> bool:
+        return self.collection == settings.mongodb_coll
+
+    @property
+    def date_path(self) -> str:
+        # _doc_from_feature só promove data_hora_gmt; outros campos ficam em properties
+        return "data_hora_gmt" if self.date_field == "data_hora_gmt" else f"properties.{self.date_field}"
+
+@dataclass
+class LayerResult:
+    layer: str
+    typename: str
+    collection: str
+    status: Literal["ok", "error", "skipped"]
+    total_upserted: int = 0
+    range: Optional[List[str]] = None
+    last_seen: Optional[str] = None
+    chunks: int = 0
+    duration_ms: int = 0
+    error: Optional[str] = None
+
+def _default_layers() -> List[LayerSpec]:
+    return [
+        LayerSpec(name="48h", typename=settings.wfs_typename, mode="48h"),
+        LayerSpec(
+            name="incremental",
+            typename=settings.wfs_typename_hist or settings.wfs_typename,
+            mode="range",
+            schedule=settings.schedule_cron,
+            # sem camada histórica, o "incremental" lê a de 48h
+            retention_hours=None if settings.wfs_typename_hist else 48,
+        ),
+    ]
+
+def load_layers(raw: Optional[str]) -> List[LayerSpec]:
+    """WFS_LAYERS (JSON ou caminho de arquivo .json) -> lista de `LayerSpec`."""
+    if not raw:
+        return _default_layers()
+    text = raw if raw.lstrip().startswith("[") else Path(raw).read_text(encoding="utf-8")
+    known = {f.name for f in fields(LayerSpec)}
+    layers: List[LayerSpec] = []
+    for item in json.loads(text):
+        unknown = set(item) - known
+        if unknown:
+            raise ValueError(f"WFS_LAYERS: campos desconhecidos {sorted(unknown)} em {item.get('name')!r}")
+        layers.append(LayerSpec(**item))
+    names = [layer.name for layer in layers]
+    if len(set(names)) != len(names):
+        raise ValueError("WFS_LAYERS: nomes de camada repetidos")
+    return layers
+
+def day_chunks(start: str, end: str, days: int) -> List[tuple[str, str]]:
+    """[start, end] (datas inclusivas) em fatias de `days` dias."""
+    lo, hi = date.fromisoformat(start[:10]), date.fromisoformat(end[:10])
+    out = []
+    while lo <= hi:
+        top = min(hi, lo + timedelta(days=days - 1))
+        out.append((lo.isoformat(), top.isoformat()))
+        lo = top + timedelta(days=1)
+    return out
+
+_DONE = object()
+
+async def merge_streams(
+    factories: Sequence[Callable[[], AsyncIterator[Dict[str, Any]]]],
+    workers: int,
+    *,
+    buffer: int = 8,
+    chunk: int = 500,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Consome até `workers` iteradores ao mesmo tempo e devolve as features num
+    único fluxo (ordem entre fatias não garantida). A fila guarda blocos de
+    `chunk` features (no máximo `buffer` blocos): produtor rápido espera o
+    consumidor. Erro em qualquer fatia cancela as demais e sobe no consumidor.
+    """
+    pending = list(reversed(factories))
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+
+    async def worker() -> None:
+        try:
+            while pending:
+                block: List[Dict[str, Any]] = []
+                async for feat in pending.pop()():
+                    block.append(feat)
+                    if len(block) >= chunk:
+                        await queue.put(block)
+                        block = []
+                if block:
+                    await queue.put(block)
+            await queue.put(_DONE)
+        except Exception as exc:
+            await queue.put(exc)
+
+    tasks = [asyncio.create_task(worker()) for _ in range(max(1, min(workers, len(factories))))]
+    try:
+        alive = len(tasks)
+        while alive:
+            item = await queue.get()
+            if item is _DONE:
+                alive -= 1
+                continue
+            if isinstance(item, Exception):
+                raise item
+            for feat in item:
+                yield feat
+    finally:
+        for t in tasks:
+            t.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+_indexed: set[str] = set()
+
+async def repo_for_collection(collection: str) -> Repository:
+    """Repositório da coleção de destino no backend configurado (REPO_BACKEND)."""
+    if settings.repo_backend == "sqlite":
+        from ..repositories.sqlite_repo import sqlite_repo
+        return sqlite_repo(collection)
+    return await mongo_repo_for(collection)
+
+async def mongo_repo_for(collection: str) -> Repository:
+    """Repositório da coleção de destino (cliente de escrita); índices de focos na primeira vez."""
+    db, coll = await get_mongo()
+    if collection != coll.name:
+        coll = db[collection]
+        if collection not in _indexed:
+            await coll.create_indexes(focus_indexes())
+            _indexed.add(collection)
+    return MongoRepository(coll, lean=settings.mongodb_lean_reads, batch_size=settings.mongodb_batch_size)
+
+class LayerRunner:
+    """
+    Sincroniza camadas do registro, várias ao mesmo tempo.
+
+    `repo_factory(collection)` e `source_factory(spec)` são injetáveis
+    (benchmarks: `MockRepository` e o stand-in do WFS); o padrão é Mongo e
+    `WfsFireSource` sobre o cliente HTTP compartilhado.
+    """
+    def __init__(
+        self,
+        layers: List[LayerSpec],
+        *,
+        repo_factory: Callable[[str], Awaitable[Repository]] = repo_for_collection,
+        source_factory: Optional[Callable[[LayerSpec], FireSource]] = None,
+    ) -> None:
+        self.layers: Dict[str, LayerSpec] = {layer.name: layer for layer in layers}
+        self._repo_factory = repo_factory
+        self._source_factory = source_factory or self._wfs_source
+        self._locks: Dict[str, asyncio.Lock] = {name: asyncio.Lock() for name in self.layers}
+        self._client: Optional[httpx.AsyncClient] = None
+        self.last: Dict[str, LayerResult] = {}
+
+    def client(self) -> httpx.AsyncClient:
+        """Pool HTTP único de todas as camadas (WFS_MAX_CONNECTIONS; espera por conexão sem timeout)."""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(30.0, pool=None),
+                limits=httpx.Limits(max_connections=settings.wfs_max_connections,
+                                    max_keepalive_connections=settings.wfs_max_connections),
+            )
+        return self._client
+
+    def _wfs_source(self, spec: LayerSpec) -> FireSource:
+        return WfsFireSource(
+            typename_48h=spec.typename,
+            typename_hist=spec.typename,
+            date_field=spec.date_field,
+            sortby=spec.sortby,
+            client=self.client(),
+        )
+
+    async def repo_for(self, spec: LayerSpec) -> Repository:
+        return await self._repo_factory(spec.collection)
+
+    def source_for(self, spec: LayerSpec) -> FireSource:
+        return self._source_factory(spec)
+
+    def select(self, names: Optional[Sequence[str]] = None) -> List[LayerSpec]:
+        """Camadas pedidas (KeyError se alguma não existir) ou todas as habilitadas."""
+        if not names:
+            return [layer for layer in self.layers.values() if layer.enabled]
+        missing = [n for n in names if n not in self.layers]
+        if missing:
+            raise KeyError(", ".join(missing))
+        return [self.layers[n] for n in dict.fromkeys(names)]
+
+    async def _last_seen(self, repo: Repository, spec: LayerSpec) -> Optional[str]:
+        doc = await repo.find_one_sorted(
+            query={spec.date_path: {"$ne": None}},
+            sort=[(spec.date_path, -1)],
+            projection={"_id": 0, spec.date_path: 1},
+        )
+        for part in spec.date_path.split("."):
+            doc = (doc or {}).get(part)
+        return doc
+
+    async def run_layer(
+        self,
+        name: str,
+        *,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        dry_run: bool = False,
+    ) -> LayerResult:
+        """Sincroniza uma camada; erros viram `status="error"` (não propagam)."""
+        from ..api.v1.routers.ingest import _ingest_features   # import tardio: o router importa este módulo
+
+        spec = self.layers[name]
+        result = LayerResult(layer=name, typename=spec.typename, collection=spec.collection, status="ok")
+        lock = self._locks[name]
+        if lock.locked():
+            result.status, result.error = "skipped", "already running"
+            return result
+        t0 = perf_counter()
+        async with lock:
+            try:
+                repo = await self.repo_for(spec)
+                source = self.source_for(spec)
+                if spec.mode == "48h":
+                    feats = source.iter_48h()
+                    result.chunks = 1
+                else:
+                    if start is None:
+                        result.last_seen = await self._last_seen(repo, spec)
+                    window = window_from_last(result.last_seen, days=spec.lookback_days)
+                    start, end = start or window[0], end or window[1]
+                    chunks = day_chunks(start, end, spec.chunk_days)
+                    result.range, result.chunks = [start, end], len(chunks)
+                    feats = merge_streams(
+                        [lambda a=a, b=b: source.iter_range(a, b, typename=spec.typename) for a, b in chunks],
+                        spec.concurrency,
+                    )
+                result.total_upserted = await _ingest_features(
+                    repo, feats, name, dry_run=dry_run, publish=spec.publishes,
+                )
+            except Exception as exc:
+                result.status, result.error = "error", f"{type(exc).__name__}: {exc}"
+                log.exception("ingest.layer.failed", layer=name, typename=spec.typename)
+        result.duration_ms = int((perf_counter() - t0) * 1000)
+        self.last[name] = result
+        log.info("ingest.layer.done", **asdict(result))
+        return result
+
+    async def run(self, names: Optional[Sequence[str]] = None, **kwargs: Any) -> List[LayerResult]:
+        """Sincroniza as camadas em paralelo; um resultado por camada, na ordem pedida."""
+        return list(await asyncio.gather(*(self.run_layer(spec.name, **kwargs) for spec in self.select(names))))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+layer_runner = LayerRunner(load_layers(settings.wfs_layers))
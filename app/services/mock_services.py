@@ -1,10 +1,125 @@
 # app/services/mock_services.py
 from __future__ import annotations
-from typing import Dict, Any, Iterable, AsyncIterator, Optional
+from typing import Dict, Any, Iterable, AsyncIterator, Mapping, Optional, List, Tuple
 from .protocols import FireSource, Repository
 import asyncio
+import math
 from datetime import datetime, timezone
 
+from ..utils.geo import EARTH_RADIUS_KM
+
+_MISSING = object()
+
+def _get_path(doc: Mapping[str, Any], path: str) -> Any:
+    cur: Any = doc
+    for part in path.split("."):
+        if not isinstance(cur, Mapping) or part not in cur:
+            return _MISSING
+        cur = cur[part]
+    return cur
+
+def _point(value: Any) -> Optional[Tuple[float, float]]:
+    if isinstance(value, Mapping) and value.get("type") == "Point":
+        lon, lat = value["coordinates"][:2]
+        return float(lon), float(lat)
+    return None
+
+def _geo_within(value: Any, spec: Mapping[str, Any]) -> bool:
+    pt = _point(value)
+    if pt is None:
+        return False
+    lon, lat = pt
+    if "$centerSphere" in spec:
+        (clon, clat), radians = spec["$centerSphere"]
+        p1, p2 = math.radians(lat), math.radians(clat)
+        dp, dl = p2 - p1, math.radians(clon - lon)
+        a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+        return 2 * math.asin(min(1.0, math.sqrt(a))) <= radians
+    ring = spec["$geometry"]["coordinates"][0]
+    # os polígonos gerados por utils.geo são retângulos: testa pela caixa envolvente
+    lons, lats = [c[0] for c in ring], [c[1] for c in ring]
+    return min(lons) <= lon <= max(lons) and min(lats) <= lat <= max(lats)
+
+def _compare(value: Any, op: str, arg: Any) -> bool:
+    if value is _MISSING or value is None:
+        return False
+    try:
+        if op == "$gt":
+            return value > arg
+        if op == "$gte":
+            return value >= arg
+        if op == "$lt":
+            return value < arg
+        return value <= arg
+    except TypeError:
+        return False
+
+def _eq(value: Any, arg: Any) -> bool:
+    if isinstance(value, list) and not isinstance(arg, list):
+        return arg in value         # igualdade em array: basta conter
+    if value is _MISSING:
+        return arg is None
+    return value == arg
+
+def _match_cond(value: Any, cond: Any) -> bool:
+    if not (isinstance(cond, Mapping) and cond and all(str(k).startswith("$") for k in cond)):
+        return _eq(value, cond)
+    for op, arg in cond.items():
+        if op == "$eq":
+            ok = _eq(value, arg)
+        elif op == "$ne":
+            ok = not _eq(value, arg)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = _compare(value, op, arg)
+        elif op == "$in":
+            ok = any(_eq(value, a) for a in arg)
+        elif op == "$nin":
+            ok = not any(_eq(value, a) for a in arg)
+        elif op == "$exists":
+            ok = (value is not _MISSING) == bool(arg)
+        elif op == "$geoWithin":
+            ok = _geo_within(value, arg)
+        else:
+            raise NotImplementedError(f"MockRepository: operador {op} não suportado")
+        if not ok:
+            return False
+    return True
+
+def matches(doc: Mapping[str, Any], flt: Optional[Mapping[str, Any]]) -> bool:
+    """Subconjunto do filtro Mongo usado pela API (igualdade, comparação, $in, $exists, $geoWithin, $and/$or)."""
+    for key, cond in (flt or {}).items():
+        if key == "$and":
+            ok = all(matches(doc, f) for f in cond)
+        elif key == "$or":
+            ok = any(matches(doc, f) for f in cond)
+        elif key == "$nor":
+            ok = not any(matches(doc, f) for f in cond)
+        else:
+            ok = _match_cond(_get_path(doc, key), cond)
+        if not ok:
+            return False
+    return True
+
+def _sorted(docs: List[Dict[str, Any]], sort: List[Tuple[str, int]]) -> List[Dict[str, Any]]:
+    # ordenação estável, da última chave para a primeira; nulos/ausentes primeiro (como no Mongo)
+    for field, direction in reversed(sort or []):
+        def key(d: Dict[str, Any], field: str = field) -> Tuple[int, Any]:
+            v = _get_path(d, field)
+            return (0, "") if v is _MISSING or v is None else (1, v)
+        docs.sort(key=key, reverse=direction < 0)
+    return docs
+
+def _project(doc: Dict[str, Any], projection: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    if not projection:
+        return doc
+    include = {k for k, v in projection.items() if v and k != "_id"}
+    if include:
+        out = {k: doc[k] for k in include if k in doc}
+        if projection.get("_id", 1) and "_id" in doc:
+            out["_id"] = doc["_id"]
+        return out
+    return {k: v for k, v in doc.items() if k not in projection}
+
 class MockFireSource(FireSource):
     async def iter_48h(self, page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
         # Emula 3 itens
@@ -18,6 +133,11 @@ class MockFireSource(FireSource):
             yield it
 
 class MockRepository(Repository):
+    """
+    Repositório em memória com a semântica do Mongo que a API usa: filtros
+    (ver `matches`), ordenação, skip/limit, projeção e upsert que só conta
+    documentos novos ou alterados (upserted + modified, como o MongoRepository).
+    """
     def __init__(self) -> None:
         self._mem: dict[str, Dict[str, Any]] = {}
 
@@ -26,22 +146,57 @@ class MockRepository(Repository):
         for d in docs:
             _id = d.get("_id") or d.get("id")
             if _id:
-                self._mem[_id] = d
-                cnt += 1
+                old = self._mem.get(_id)
+                new = {**old, **d} if old is not None else d     # $set
+                if new != old:
+                    cnt += 1
+                self._mem[_id] = new
         return cnt
 
     async def count(self, flt: Optional[Dict[str, Any]] = None) -> int:
-        return len(self._mem)
+        if not flt:
+            return len(self._mem)
+        return sum(1 for d in self._mem.values() if matches(d, flt))
+
+    async def recent(self, limit: int, projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]:
+        return await self.find({}, limit=limit, skip=0, sort=[("data_hora_gmt", -1)], projection=projection)
+
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: list[tuple[str, int]], projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]:
+        arr = _sorted([d for d in self._mem.values() if matches(d, flt)], sort)
+        arr = arr[skip:skip + limit] if limit else arr[skip:]
+        return [_project(d, projection) for d in arr]
+
+    async def iter_find(self, flt: Dict[str, Any], sort: list[tuple[str, int]], *, limit: int = 0, skip: int = 0, projection: Optional[Dict[str, Any]] = None, batch_size: Optional[int] = None) -> AsyncIterator[Mapping[str, Any]]:
+        for d in await self.find(flt, limit=limit, skip=skip, sort=sort, projection=projection):
+            yield d
+
+    async def find_one_sorted(self, query: Dict[str, Any], sort: List[Tuple[str, int]], projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        out = await self.find(query, limit=1, skip=0, sort=sort, projection=projection)
+        return out[0] if out else None
 
-    async def recent(self, limit: int) -> list[Dict[str, Any]]:
-        arr = list(self._mem.values())
-        arr.sort(key=lambda x: x.get("data_hora_gmt") or "", reverse=True)
-        return arr[:limit]
+    async def agg_grid(self, flt: Dict[str, Any], res_field: str) -> list[Dict[str, Any]]:
+        cells: dict[str, Dict[str, Any]] = {}
+        for d in await self.find(flt, limit=len(self._mem), skip=0, sort=[]):
+            key = (d.get("grid") or {}).get(res_field)
+            if key is None:
+                continue
+            c = cells.setdefault(key, {"cell": key, "count": 0, "frp_sum": 0.0})
+            c["count"] += 1
+            c["frp_sum"] += d.get("frp") or 0.0
+        return list(cells.values())
 
-    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: list[tuple[str, int]]) -> list[Dict[str, Any]]:
-        arr = list(self._mem.values())
-        # filtro simplificado para demo
-        return arr[skip:skip+limit]
+    async def agg_timeseries(self, flt: Dict[str, Any], interval: str, group_by: list[str]) -> list[Dict[str, Any]]:
+        from .timeseries import bucket_of
+        rows: dict[tuple, Dict[str, Any]] = {}
+        for d in await self.find(flt, limit=len(self._mem), skip=0, sort=[]):
+            ts = d.get("data_hora_gmt")
+            if not ts:
+                continue
+            key = (bucket_of(ts, interval), *(d.get(g) for g in group_by))
+            r = rows.setdefault(key, {"bucket": key[0], **{g: d.get(g) for g in group_by}, "count": 0, "frp_sum": 0.0})
+            r["count"] += 1
+            r["frp_sum"] += d.get("frp") or 0.0
+        return list(rows.values())
 
     async def agg_stats(self) -> Dict[str, Any]:
         total = len(self._mem)
@@ -0,0 +1,254 @@
+# app/services/page_journal.py
+"""
+Diário das páginas brutas do WFS em disco local, para refazer a transformação
+sem rede (mudança em `_doc_from_feature`, correção de bug de mapeamento).
+
+Layout em JOURNAL_DIR:
+  objects/ab/abcdef....json.gz   corpo da página (gzip), endereçado pelo
+                                 sha256 do corpo: páginas idênticas (ex.: 48h
+                                 sem mudança) são guardadas uma vez só;
+  pages/AAAA-MM-DD.jsonl         uma linha por página buscada: quando, execução
+                                 (`run`), camada, URL, startIndex, CQL, sha256,
+                                 bytes e número de features.
+
+`replay()` relê as páginas na ordem em que foram buscadas (cada corpo uma vez
+por replay), com leitura e descompressão em thread; objeto ausente (apagado à
+mão, disco trocado) é logado, pulado e contado em `ReplayStats.missing`.
+Retenção: metadados mais antigos que JOURNAL_RETENTION_DAYS são apagados e os
+objetos que ninguém mais referencia são removidos (`prune`, também chamado a
+cada 6h durante a escrita, sob o mesmo lock da escrita: objeto novo nunca é
+apagado antes de sua linha de metadados existir).
+"""
+from __future__ import annotations
+import asyncio
+import gzip
+import hashlib
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+import orjson
+
+from .protocols import FireSource
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..utils.procpool import ordered_map
+
+log = get_logger()
+
+_PRUNE_EVERY_S = 6 * 3600
+
+def new_run_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+@dataclass
+class PruneResult:
+    pages_files: int = 0
+    objects: int = 0
+    bytes: int = 0
+
+@dataclass
+class ReplayStats:
+    pages: int = 0
+    missing: int = 0
+    features: int = 0
+
+class PageJournal:
+    def __init__(self, root: str | Path, *, retention_days: Optional[float] = None, compresslevel: int = 6) -> None:
+        self.root = Path(root)
+        self.retention_days = retention_days
+        self.compresslevel = compresslevel
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+        self._prune_task: Optional[asyncio.Future] = None
+
+    # ---------- escrita ----------
+    def _object_path(self, sha: str) -> Path:
+        return self.root / "objects" / sha[:2] / f"{sha}.json.gz"
+
+    def _write(self, entry: Dict[str, Any], body: bytes) -> None:
+        path = self._object_path(entry["sha256"])
+        data = None if path.exists() else gzip.compress(body, compresslevel=self.compresslevel)
+        pages = self.root / "pages"
+        # objeto + linha sob o lock do prune: entre os dois o objeto ainda não é referenciado
+        with self._lock:
+            if data is not None and not path.exists():
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_suffix(f".tmp{os.getpid()}.{threading.get_ident()}")
+                tmp.write_bytes(data)
+                os.replace(tmp, path)       # atômico: um replay nunca lê objeto pela metade
+                entry["stored"] = path.stat().st_size
+            pages.mkdir(parents=True, exist_ok=True)
+            with open(pages / f"{entry['ts'][:10]}.jsonl", "ab") as fh:
+                fh.write(orjson.dumps(entry) + b"\n")
+
+    async def record(self, layer: str, url: str, body: bytes, *, features: int, **meta: Any) -> None:
+        """Guarda a página (corpo + metadados). Falha de disco é logada, não interrompe a ingestão."""
+        entry = {
+            "ts": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ"),
+            "layer": layer,
+            "url": url,
+            "sha256": hashlib.sha256(body).hexdigest(),
+            "bytes": len(body),
+            "features": features,
+            **meta,
+        }
+        try:
+            await asyncio.to_thread(self._write, entry, body)
+        except OSError as exc:
+            log.warning("journal.write_failed", layer=layer, error=str(exc))
+            return
+        if self.retention_days and time.monotonic() - self._last_prune > _PRUNE_EVERY_S:
+            self._last_prune = time.monotonic()
+            self._prune_task = asyncio.ensure_future(asyncio.to_thread(self.prune))
+            self._prune_task.add_done_callback(self._pruned)
+
+    def _pruned(self, fut: asyncio.Future) -> None:
+        self._prune_task = None
+        if not fut.cancelled() and fut.exception() is not None:
+            log.warning("journal.prune_failed", error=str(fut.exception()))
+
+    # ---------- leitura ----------
+    def entries(
+        self,
+        *,
+        layer: Optional[str] = None,
+        since: Optional[str] = None,
+        until: Optional[str] = None,
+        run: Optional[str] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """Metadados das páginas em ordem de busca; `since`/`until` comparam com `ts` (ISO, prefixo)."""
+        pages = self.root / "pages"
+        if not pages.exists():
+            return
+        for path in sorted(pages.glob("*.jsonl")):
+            day = path.stem
+            if (since and day < since[:10]) or (until and day > until[:10]):
+                continue
+            with open(path, "rb") as fh:
+                for line in fh:
+                    if not line.strip():
+                        continue
+                    entry = orjson.loads(line)
+                    if layer and entry["layer"] != layer:
+                        continue
+                    if run and entry.get("run") != run:
+                        continue
+                    if (since and entry["ts"] < since) or (until and entry["ts"][: len(until)] > until):
+                        continue
+                    yield entry
+
+    def runs(self, **filters: Any) -> List[Dict[str, Any]]:
+        """Execuções registradas (uma por iter_48h/iter_range) com páginas e features."""
+        out: Dict[str, Dict[str, Any]] = {}
+        for e in self.entries(**filters):
+            r = out.setdefault(e.get("run") or "-", {
+                "run": e.get("run"), "layer": e["layer"], "started": e["ts"], "pages": 0, "features": 0,
+                "cql": e.get("cql"),
+            })
+            r["pages"] += 1
+            r["features"] += e["features"]
+            r["finished"] = e["ts"]
+        return list(out.values())
+
+    def load(self, sha: str) -> List[Dict[str, Any]]:
+        """Features da página `sha` (descomprime e decodifica; roda em thread no replay)."""
+        data = orjson.loads(gzip.decompress(self._object_path(sha).read_bytes()))
+        return (data or {}).get("features") or []
+
+    def _load_or_none(self, sha: str) -> Optional[List[Dict[str, Any]]]:
+        try:
+            return self.load(sha)
+        except FileNotFoundError:
+            return None
+
+    async def replay(
+        self, *, prefetch: int = 4, stats: Optional[ReplayStats] = None, **filters: Any,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Features das páginas do diário, na ordem original; corpo repetido é
+        lido uma vez só. Páginas lidas/ausentes são somadas em `stats`.
+        """
+        stats = stats if stats is not None else ReplayStats()
+        seen: set[str] = set()
+
+        def shas() -> Iterator[tuple[str]]:
+            for e in self.entries(**filters):
+                if e["sha256"] not in seen:
+                    seen.add(e["sha256"])
+                    yield (e["sha256"],)
+
+        async for sha, feats in ordered_map(lambda sha: (sha, self._load_or_none(sha)), shas(), max_inflight=prefetch):
+            if feats is None:
+                stats.missing += 1
+                log.warning("journal.object_missing", sha256=sha)
+                continue
+            stats.pages += 1
+            stats.features += len(feats)
+            for feat in feats:
+                yield feat
+
+    # ---------- retenção ----------
+    def prune(self, retention_days: Optional[float] = None) -> PruneResult:
+        """Apaga metadados fora da retenção e objetos não referenciados."""
+        days = retention_days if retention_days is not None else self.retention_days
+        result = PruneResult()
+        pages = self.root / "pages"
+        if not days or not pages.exists():
+            return result
+        cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).strftime("%Y-%m-%d")
+        with self._lock:
+            for path in pages.glob("*.jsonl"):
+                if path.stem < cutoff:
+                    path.unlink(missing_ok=True)
+                    result.pages_files += 1
+            live = {e["sha256"] for e in self.entries()}
+            for obj in (self.root / "objects").glob("*/*.json.gz"):
+                if obj.name[: -len(".json.gz")] not in live:
+                    result.bytes += obj.stat().st_size
+                    obj.unlink(missing_ok=True)
+                    result.objects += 1
+        log.info("journal.pruned", retention_days=days, **vars(result))
+        return result
+
+class JournalFireSource(FireSource):
+    """
+    FireSource que relê o diário (sem rede). `iter_48h` devolve todas as
+    páginas que passam nos filtros; `iter_range` filtra as features por
+    `data_hora_gmt`.
+    """
+    def __init__(self, journal: PageJournal, **filters: Any) -> None:
+        self.journal = journal
+        self.filters = filters
+        self.stats = ReplayStats()      # somado entre as chamadas
+
+    async def iter_48h(self) -> AsyncIterator[Dict[str, Any]]:
+        async for feat in self.journal.replay(stats=self.stats, **self.filters):
+            yield feat
+
+    async def iter_range(self, start_date: str, end_date: str, typename: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        lo = start_date if "T" in start_date else f"{start_date}T00:00:00Z"
+        hi = end_date if "T" in end_date else f"{end_date}T23:59:59Z"
+        filters = dict(self.filters, layer=typename or self.filters.get("layer"))
+        async for feat in self.journal.replay(stats=self.stats, **filters):
+            ts = (feat.get("properties") or {}).get("data_hora_gmt") or ""
+            if lo <= ts <= hi:
+                yield feat
+
+_journal: Optional[PageJournal] = None
+
+def default_journal() -> Optional[PageJournal]:
+    """Diário configurado em JOURNAL_DIR (singleton), ou None se desligado."""
+    global _journal
+    if _journal is None and settings.journal_dir:
+        _journal = PageJournal(
+            settings.journal_dir,
+            retention_days=settings.journal_retention_days,
+            compresslevel=settings.journal_compresslevel,
+        )
+    return _journal
@@ -1,6 +1,6 @@
 # app/services/protocols.py
 from __future__ import annotations
-from typing import Protocol, Iterable, AsyncIterator, Dict, Any, Optional, List, Tuple
+from typing import Protocol, Iterable, AsyncIterator, Dict, Any, Mapping, Optional, List, Tuple
 
 class FireSource(Protocol):
     """Contrato do serviço que coleta dados do servidor (WFS/INPE)."""
@@ -15,7 +15,35 @@ class Repository(Protocol):
     """Contrato do repositório (persistência em Mongo)."""
     async def upsert_many(self, docs: Iterable[Dict[str, Any]]) -> int: ...
     async def count(self, flt: Optional[Dict[str, Any]] = None) -> int: ...
-    async def recent(self, limit: int) -> list[Dict[str, Any]]: ...
-    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: list[tuple[str, int]]) -> list[Dict[str, Any]]: ...
+    async def recent(self, limit: int, projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]: ...
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: list[tuple[str, int]], projection: Optional[Dict[str, Any]] = None) -> list[Dict[str, Any]]: ...
+    def iter_find(self, flt: Dict[str, Any], sort: list[tuple[str, int]], *, limit: int = 0, skip: int = 0, projection: Optional[Dict[str, Any]] = None, batch_size: Optional[int] = None) -> AsyncIterator[Mapping[str, Any]]: ...
+    async def agg_grid(self, flt: Dict[str, Any], res_field: str) -> list[Dict[str, Any]]: ...
+    async def agg_timeseries(self, flt: Dict[str, Any], interval: str, group_by: List[str]) -> list[Dict[str, Any]]: ...
     async def agg_stats(self) -> Dict[str, Any]: ...
     async def find_one_sorted(self, query: Dict[str, Any], sort: List[Tuple[str, int]], projection: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]: ...
+
+class EventRepository(Protocol):
+    """Contrato da persistência de eventos de fogo (agrupamentos de focos)."""
+    async def assigned(self, ids: List[str]) -> set[str]: ...
+    async def candidates(self, cells: List[str], since: str) -> list[Dict[str, Any]]: ...
+    async def save(self, events: List[Dict[str, Any]], merged: Dict[str, str], assignments: Dict[str, str]) -> None: ...
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int, sort: List[Tuple[str, int]]) -> list[Dict[str, Any]]: ...
+    async def get(self, event_id: str) -> Optional[Dict[str, Any]]: ...
+
+class HitsSource(Protocol):
+    """Fonte que sabe contar features numa janela de datas sem baixá-las (WFS `resultType=hits`)."""
+    async def count(self, start: str, end: str, typename: Optional[str] = None) -> int: ...
+
+class ReconcileReportRepository(Protocol):
+    """Contrato da persistência dos relatórios de reconciliação (WFS x Mongo)."""
+    async def save(self, report: Dict[str, Any]) -> None: ...
+    async def find(self, flt: Dict[str, Any], limit: int, skip: int) -> list[Dict[str, Any]]: ...
+    async def get(self, report_id: str) -> Optional[Dict[str, Any]]: ...
+
+class JobRepository(Protocol):
+    """Contrato da persistência dos jobs de ingestão em segundo plano (estado sobrevive a reinícios)."""
+    async def save(self, job: Dict[str, Any]) -> None: ...
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]: ...
+    async def find(self, status: Optional[str], kind: Optional[str], limit: int, skip: int) -> list[Dict[str, Any]]: ...
+    async def unfinished(self) -> list[Dict[str, Any]]: ...
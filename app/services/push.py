@@ -0,0 +1,193 @@
+# app/services/push.py
+"""
+Entrega push de focos novos/alterados (SSE / WebSocket).
+
+Um único fan-out (`broadcaster`) atende todos os assinantes:
+- cada foco é serializado uma vez (JSON do FocusItem) e deduplicado por
+  impressão digital do conteúdo: reingestões da mesma janela sem mudança
+  não geram push;
+- cada assinante tem filtro próprio (bbox/estado/satélite) e fila limitada
+  (PUSH_QUEUE_SIZE); cliente lento perde os mais antigos e é avisado.
+
+Fonte (PUSH_SOURCE):
+- `ingest`: resultados de escrita da ingestão (gancho `on_batch_written`);
+- `changestream`: change stream do Mongo (vê escritas de todas as instâncias);
+- `auto`: tenta o change stream e cai para `ingest` se o servidor não suportar
+  (standalone sem replica set).
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..core.metrics import REGISTRY
+from ..utils.fast_json import dumps, focus_item_dict
+from .ingest_events import on_batch_written
+
+log = get_logger()
+
+CHANGE_PIPELINE = [{"$match": {"operationType": {"$in": ["insert", "update", "replace"]}}}]
+
+@dataclass
+class PushFilter:
+    bbox: Optional[Tuple[float, float, float, float]] = None
+    estado: Optional[str] = None
+    satelite: Optional[str] = None
+
+    def matches(self, item: Mapping[str, Any]) -> bool:
+        if self.estado and item.get("estado") != self.estado:
+            return False
+        if self.satelite and item.get("satelite") != self.satelite:
+            return False
+        if self.bbox:
+            lon, lat = item.get("longitude"), item.get("latitude")
+            if lon is None or lat is None:
+                return False
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            return min_lon <= lon <= max_lon and min_lat <= lat <= max_lat
+        return True
+
+@dataclass(eq=False)
+class Subscriber:
+    flt: PushFilter
+    maxlen: int
+    queue: Deque[bytes] = field(init=False)
+    wakeup: asyncio.Event = field(default_factory=asyncio.Event)
+    dropped: int = 0
+
+    def __post_init__(self) -> None:
+        self.queue = deque(maxlen=self.maxlen)
+
+    def offer(self, payload: bytes) -> None:
+        if len(self.queue) == self.maxlen:
+            self.dropped += 1       # deque com maxlen descarta o mais antigo
+        self.queue.append(payload)
+        self.wakeup.set()
+
+    async def next_batch(self, timeout: float) -> Tuple[List[bytes], int]:
+        """Espera itens (ou timeout) e devolve (payloads, descartados desde a última leitura)."""
+        if not self.queue:
+            self.wakeup.clear()
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        items = list(self.queue)
+        self.queue.clear()
+        dropped, self.dropped = self.dropped, 0
+        return items, dropped
+
+class Broadcaster:
+    def __init__(self, queue_size: int = 1000, max_subscribers: int = 500, dedupe_size: int = 200_000) -> None:
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._subs: Set[Subscriber] = set()
+        self._fingerprints: "OrderedDict[str, bytes]" = OrderedDict()
+        self._dedupe_size = dedupe_size
+        self._watch_task: Optional[asyncio.Task] = None
+        self.change_stream_active = False
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subs)
+
+    def subscribe(self, flt: PushFilter) -> Subscriber:
+        if len(self._subs) >= self.max_subscribers:
+            raise OverflowError("too many subscribers")
+        sub = Subscriber(flt, self.queue_size)
+        self._subs.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscriber) -> None:
+        self._subs.discard(sub)
+
+    def _changed(self, fid: str, payload: bytes) -> bool:
+        fp = hashlib.blake2b(payload, digest_size=8).digest()
+        if self._fingerprints.get(fid) == fp:
+            self._fingerprints.move_to_end(fid)
+            return False
+        self._fingerprints[fid] = fp
+        self._fingerprints.move_to_end(fid)
+        while len(self._fingerprints) > self._dedupe_size:
+            self._fingerprints.popitem(last=False)
+        return True
+
+    def publish(self, docs: Sequence[Mapping[str, Any]]) -> int:
+        """Serializa cada foco uma vez e entrega aos assinantes cujo filtro casa."""
+        sent = 0
+        for d in docs:
+            item = focus_item_dict(d)
+            payload = dumps(item)
+            if not self._changed(item["id"], payload):
+                continue
+            sent += 1
+            for sub in self._subs:
+                if sub.flt.matches(item):
+                    sub.offer(payload)
+        return sent
+
+    # ---------- change stream ----------
+    async def ensure_source(self) -> None:
+        """Sobe o change stream (uma vez) quando PUSH_SOURCE permite."""
+        if settings.push_source == "ingest" or self._watch_task is not None:
+            return
+        from ..core.db import get_mongo    # import tardio: só quem assina precisa do Mongo
+        try:
+            _, coll = await get_mongo()
+        except Exception:
+            log.exception("push.changestream_unavailable", source=settings.push_source)
+            return
+        self._watch_task = asyncio.create_task(self._watch(coll), name="push-changestream")
+
+    async def _watch(self, coll) -> None:
+        resume_token = None
+        while True:
+            try:
+                async with coll.watch(CHANGE_PIPELINE, full_document="updateLookup", resume_after=resume_token) as stream:
+                    self.change_stream_active = True
+                    log.info("push.changestream_started")
+                    while True:
+                        change = await stream.next()
+                        batch = [change]
+                        # micro-lote: junta o que já chegou antes de publicar
+                        while len(batch) < 500:
+                            more = await stream.try_next()
+                            if more is None:
+                                break
+                            batch.append(more)
+                        resume_token = stream.resume_token
+                        self.publish([c["fullDocument"] for c in batch if c.get("fullDocument")])
+            except OperationFailure as exc:
+                # sem replica set não há change stream: fica com o gancho da ingestão
+                self.change_stream_active = False
+                log.warning("push.changestream_unsupported", code=exc.code, error=str(exc))
+                return
+            except PyMongoError as exc:
+                self.change_stream_active = False
+                log.warning("push.changestream_retry", error=str(exc))
+                await asyncio.sleep(1.0)
+
+    async def stop(self) -> None:
+        if self._watch_task is not None:
+            self._watch_task.cancel()
+            try:
+                await self._watch_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            self._watch_task = None
+            self.change_stream_active = False
+
+broadcaster = Broadcaster(queue_size=settings.push_queue_size, max_subscribers=settings.push_max_subscribers)
+REGISTRY.gauge("inpe_push_subscribers", "Assinantes conectados em /stream.", fn=lambda: broadcaster.subscribers)
+
+@on_batch_written
+async def _push_batch(docs: Sequence[Dict[str, Any]]) -> None:
+    # com change stream ativo os mesmos focos chegam por lá
+    if broadcaster.subscribers and not broadcaster.change_stream_active:
+        broadcaster.publish(docs)
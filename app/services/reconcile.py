@@ -0,0 +1,200 @@
+# app/services/reconcile.py
+"""
+Reconciliação WFS x Mongo por janela de tempo.
+
+Para cada dia (ou hora) de [start, end] compara a contagem da fonte
+(`resultType=hits` com CQL de data: o GeoServer só conta) com a contagem
+indexada no Mongo para a mesma janela. Dias divergentes são refinados por
+hora (`refine`) e só as janelas que divergem são reingeridas, em paralelo,
+pelo caminho normal (`_ingest_features`). Manter um histórico longo correto
+custa algumas centenas de contagens em vez de um backfill completo.
+
+Janela com mais documentos no Mongo do que na fonte (foco removido/reclassificado
+pelo INPE) não é corrigível por upsert: entra no relatório como `extra`.
+Camada com `retention_hours` (ex.: o "incremental" padrão sem
+WFS_TYPENAME_HIST, que lê a camada 48h) só é comparada nos dias inteiros que
+a fonte ainda guarda; o resto seria `extra` falso. A reingestão segura o lock
+da camada no `LayerRunner` (não corre junto com a sincronização dela).
+Cada execução grava um relatório (MONGODB_RECONCILE_COLLECTION).
+"""
+from __future__ import annotations
+import asyncio
+import uuid
+from datetime import datetime, time, timedelta, timezone
+from time import perf_counter
+from typing import Any, Dict, List, Literal, Optional, Sequence, Tuple
+
+from .layers import LayerRunner, LayerSpec, day_chunks, layer_runner, merge_streams
+from .protocols import HitsSource, ReconcileReportRepository, Repository
+from ..core.config import settings
+from ..core.logging_config import get_logger
+
+log = get_logger()
+
+Granularity = Literal["day", "hour"]
+Window = Tuple[str, str]
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def day_windows(start: str, end: str) -> List[Window]:
+    return [(f"{d}T00:00:00Z", f"{d}T23:59:59Z") for d, _ in day_chunks(start, end, 1)]
+
+def hour_windows(day: str) -> List[Window]:
+    return [(f"{day}T{h:02d}:00:00Z", f"{day}T{h:02d}:59:59Z") for h in range(24)]
+
+def windows(start: str, end: str, granularity: Granularity) -> List[Window]:
+    days = day_windows(start, end)
+    if granularity == "day":
+        return days
+    return [w for lo, _ in days for w in hour_windows(lo[:10])]
+
+def retained_range(spec: LayerSpec, start: str, end: str) -> Window:
+    """[start, end] com o início recortado ao primeiro dia inteiro dentro de `retention_hours`."""
+    if not spec.retention_hours:
+        return start, end
+    oldest = datetime.now(timezone.utc) - timedelta(hours=spec.retention_hours)
+    first = oldest.date() if oldest.time() == time(0) else oldest.date() + timedelta(days=1)
+    return max(start[:10], first.isoformat()), end
+
+class Reconciler:
+    """
+    Reconcilia camadas do registro (`LayerRunner`: mesma fonte, pool HTTP e
+    coleção de destino da sincronização). `concurrency` limita contagens e
+    fatias reingeridas simultâneas.
+    """
+    def __init__(
+        self,
+        runner: LayerRunner,
+        reports: Optional[ReconcileReportRepository] = None,
+        *,
+        concurrency: Optional[int] = None,
+    ) -> None:
+        self.runner = runner
+        self.reports = reports
+        self.concurrency = concurrency or settings.reconcile_concurrency
+
+    async def _counts(
+        self, source: HitsSource, repo: Repository, spec: LayerSpec, wins: Sequence[Window],
+    ) -> List[Dict[str, Any]]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(lo: str, hi: str) -> Dict[str, Any]:
+            async with sem:
+                wfs, mongo = await asyncio.gather(
+                    source.count(lo, hi, typename=spec.typename),
+                    repo.count({spec.date_path: {"$gte": lo, "$lte": hi}}),
+                )
+            return {"window": [lo, hi], "wfs": wfs, "mongo": mongo}
+
+        return list(await asyncio.gather(*(one(lo, hi) for lo, hi in wins)))
+
+    async def _mongo_counts(self, repo: Repository, spec: LayerSpec, rows: Sequence[Dict[str, Any]]) -> List[int]:
+        sem = asyncio.Semaphore(self.concurrency)
+
+        async def one(lo: str, hi: str) -> int:
+            async with sem:
+                return await repo.count({spec.date_path: {"$gte": lo, "$lte": hi}})
+
+        return list(await asyncio.gather(*(one(*r["window"]) for r in rows)))
+
+    async def run(
+        self,
+        layer: str,
+        start: str,
+        end: str,
+        *,
+        granularity: Granularity = "day",
+        refine: bool = True,
+        repair: bool = True,
+    ) -> Dict[str, Any]:
+        """Reconcilia `layer` em [start, end] (datas inclusivas); devolve (e grava) o relatório."""
+        from ..api.v1.routers.ingest import _ingest_features   # import tardio: o router importa layers
+
+        spec = self.runner.layers[layer]
+        t0 = perf_counter()
+        report: Dict[str, Any] = {
+            "_id": uuid.uuid4().hex,
+            "layer": layer,
+            "typename": spec.typename,
+            "collection": spec.collection,
+            "granularity": granularity,
+            "refine": refine,
+            "repair": repair,
+            "range": [start, end],
+            "started_at": _now(),
+            "status": "running",
+            "windows": [],
+        }
+        summary = report["summary"] = {
+            "checked": 0, "matched": 0, "wfs_total": 0, "mongo_total": 0, "hits_requests": 0,
+            "drift": 0, "missing": 0, "extra": 0, "repaired": 0, "still_drifting": 0, "reingested_docs": 0,
+        }
+        lo, _ = retained_range(spec, start, end)
+        if lo != start[:10]:
+            # janela vazia (todo o pedido fora da retenção) termina como `skipped`
+            report["note"] = f"{spec.typename} guarda só {spec.retention_hours}h: início recortado para {lo}"
+            report["range"][0] = start = lo
+        try:
+            source = self.runner.source_for(spec)
+            if not hasattr(source, "count"):
+                raise TypeError(f"fonte da camada {layer!r} não suporta contagem (resultType=hits)")
+            repo = await self.runner.repo_for(spec)
+
+            rows = await self._counts(source, repo, spec, windows(start, end, granularity))  # type: ignore[arg-type]
+            summary["checked"] = summary["hits_requests"] = len(rows)
+            summary["wfs_total"] = sum(r["wfs"] for r in rows)
+            summary["mongo_total"] = sum(r["mongo"] for r in rows)
+            drift = [r for r in rows if r["wfs"] != r["mongo"]]
+            summary["matched"] = len(rows) - len(drift)
+            if refine and granularity == "day" and drift:
+                # reingere só as horas que divergem dentro dos dias divergentes
+                hourly = await self._counts(source, repo, spec, [w for r in drift for w in hour_windows(r["window"][0][:10])])  # type: ignore[arg-type]
+                summary["hits_requests"] += len(hourly)
+                drift = [r for r in hourly if r["wfs"] != r["mongo"]] or drift
+            for r in drift:
+                r["status"] = "missing" if r["wfs"] > r["mongo"] else "extra"
+            missing = [r for r in drift if r["status"] == "missing"]
+            summary.update(drift=len(drift), missing=len(missing), extra=len(drift) - len(missing))
+
+            if repair and missing:
+                feats = merge_streams(
+                    [lambda lo=r["window"][0], hi=r["window"][1]: source.iter_range(lo, hi, typename=spec.typename)
+                     for r in missing],
+                    self.concurrency,
+                )
+                async with self.runner._locks[layer]:     # espera a sincronização da camada, se rodando
+                    summary["reingested_docs"] = await _ingest_features(repo, feats, "reconcile", publish=spec.publishes)
+                for r, after in zip(missing, await self._mongo_counts(repo, spec, missing)):
+                    r["mongo_after"] = after
+                    r["status"] = "repaired" if after >= r["wfs"] else "drifting"
+                summary["repaired"] = sum(r["status"] == "repaired" for r in missing)
+            summary["still_drifting"] = summary["drift"] - summary["repaired"]
+            report["windows"] = drift
+            report["status"] = "ok" if not drift else ("repaired" if not summary["still_drifting"] else "drift")
+            if not rows:
+                report["status"] = "skipped"
+        except Exception as exc:
+            report["status"], report["error"] = "error", f"{type(exc).__name__}: {exc}"
+            log.exception("reconcile.failed", layer=layer)
+        report["finished_at"] = _now()
+        report["duration_ms"] = int((perf_counter() - t0) * 1000)
+        if self.reports is not None:
+            await self.reports.save(report)
+        log.info("reconcile.done", layer=layer, range=[start, end], status=report["status"],
+                 duration_ms=report["duration_ms"], **summary)
+        return report
+
+def default_range(days: Optional[int] = None) -> Tuple[str, str]:
+    """Últimos `days` dias (RECONCILE_DAYS) até hoje."""
+    today = datetime.now(timezone.utc).date()
+    return (today - timedelta(days=days or settings.reconcile_days)).isoformat(), today.isoformat()
+
+async def reconcile_scheduled() -> None:
+    """Job do agendador: reconcilia as camadas `range` habilitadas nos últimos RECONCILE_DAYS dias."""
+    from ..core.deps import get_reports_repo
+    reconciler = Reconciler(layer_runner, await get_reports_repo())
+    start, end = default_range()
+    for spec in layer_runner.select():
+        if spec.mode == "range":
+            await reconciler.run(spec.name, start, end)
@@ -0,0 +1,259 @@
+# app/services/tiles.py
+"""
+Vector tiles (MVT) de focos, com cache por tile.
+
+- Render: consulta bbox no índice 2dsphere (`Repository.iter_find`) e codifica
+  pontos (ou clusters em zoom baixo) com `utils.mvt`.
+- Cache: LRU em memória + diretório opcional em disco, chaveados pela versão
+  do dataset (TILES_DATASET_VERSION). Só os tiles que contêm focos de um lote
+  ingerido são invalidados (gancho `on_batch_written`).
+"""
+from __future__ import annotations
+import asyncio
+import hashlib
+import math
+import re
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..utils.geo import within_bbox
+from ..utils.grid import point_of
+from ..utils.mvt import encode_point_layer, encode_tile, lonlat_to_tile_px, lonlat_to_world, tile_bounds
+from .ingest_events import on_batch_written
+from .protocols import Repository
+
+log = get_logger()
+
+MVT_MEDIA_TYPE = "application/vnd.mapbox-vector-tile"
+LAYER_NAME = "focos"
+EXTENT = 4096
+BUFFER_PX = 64  # margem (em unidades do tile) para símbolos na borda
+
+TILE_PROJECTION = {
+    "_id": 1, "id": 1, "geometry": 1, "longitude": 1, "latitude": 1,
+    "data_hora_gmt": 1, "satelite": 1, "estado": 1, "bioma": 1, "frp": 1,
+}
+
+TileKey = Tuple[int, int, int, bool]
+
+@dataclass(frozen=True)
+class CachedTile:
+    data: bytes
+    etag: str
+
+def _etag(version: str, data: bytes) -> str:
+    return '"' + hashlib.blake2b(version.encode() + data, digest_size=8).hexdigest() + '"'
+
+# ---------- render ----------
+def _point_features(docs: Iterable[Mapping[str, Any]], z: int, x: int, y: int):
+    for d in docs:
+        pt = point_of(d)
+        if pt is None:
+            continue
+        px, py = lonlat_to_tile_px(pt[0], pt[1], z, x, y, EXTENT)
+        if -BUFFER_PX <= px <= EXTENT + BUFFER_PX and -BUFFER_PX <= py <= EXTENT + BUFFER_PX:
+            yield px, py, d
+
+def _clustered(points, cell_px: int):
+    """Agrupa pontos em células de `cell_px` unidades; emite um ponto por célula."""
+    bins: Dict[Tuple[int, int], list] = {}
+    for px, py, d in points:
+        b = bins.get((px // cell_px, py // cell_px))
+        frp = float(d.get("frp") or 0.0)
+        if b is None:
+            bins[(px // cell_px, py // cell_px)] = [1, px, py, frp, frp]
+        else:
+            b[0] += 1
+            b[1] += px
+            b[2] += py
+            b[3] += frp
+            b[4] = max(b[4], frp)
+    for n, sx, sy, frp_sum, frp_max in bins.values():
+        props = {"point_count": n, "frp_sum": round(frp_sum, 1), "frp_max": frp_max}
+        yield round(sx / n), round(sy / n), props, None
+
+def _detail(points):
+    for px, py, d in points:
+        frp = d.get("frp")
+        props = {
+            "id": str(d.get("id") or d.get("_id")),
+            "data_hora_gmt": d.get("data_hora_gmt"),
+            "satelite": d.get("satelite"),
+            "estado": d.get("estado"),
+            "bioma": d.get("bioma"),
+            "frp": None if frp is None else float(frp),
+        }
+        yield px, py, props, None
+
+async def render_tile(repo: Repository, z: int, x: int, y: int, cluster: bool) -> bytes:
+    min_lon, min_lat, max_lon, max_lat = tile_bounds(z, x, y)
+    pad_lon = (max_lon - min_lon) * BUFFER_PX / EXTENT
+    pad_lat = (max_lat - min_lat) * BUFFER_PX / EXTENT
+    # z0/z1 passam de um hemisfério: polígono inválido no 2dsphere, varre tudo
+    flt: Dict[str, Any] = {}
+    if z >= 2:
+        flt["geometry"] = within_bbox((
+            max(-180.0, min_lon - pad_lon), max(-90.0, min_lat - pad_lat),
+            min(180.0, max_lon + pad_lon), min(90.0, max_lat + pad_lat),
+        ))
+    docs = [
+        d async for d in repo.iter_find(
+            flt,
+            [("data_hora_gmt", -1)],    # no teto de features, mantém os mais recentes
+            limit=settings.tiles_max_features,
+            projection=TILE_PROJECTION,
+        )
+    ]
+    points = _point_features(docs, z, x, y)
+    feats = list(_clustered(points, settings.tiles_cluster_px) if cluster else _detail(points))
+    return encode_tile([encode_point_layer(LAYER_NAME, feats, EXTENT)]) if feats else b""
+
+# ---------- cache ----------
+
+# margem em frações de tile, com folga para o arredondamento de lonlat_to_tile_px
+_PAD = (BUFFER_PX + 1) / EXTENT
+
+def _tile_span(f: float, n: int) -> range:
+    """Índices t (0..n-1) com -BUFFER_PX <= (f - t) * EXTENT <= EXTENT + BUFFER_PX."""
+    return range(max(0, math.ceil(f - 1 - _PAD)), min(n - 1, math.floor(f + _PAD)) + 1)
+
+
+class TileCache:
+    """LRU em memória + diretório opcional, chaveado por versão do dataset."""
+
+    def __init__(
+        self,
+        version: str,
+        *,
+        maxsize: int = 2048,
+        max_zoom: int = 12,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        self.version = version
+        self.maxsize = maxsize
+        self.max_zoom = max_zoom
+        self._mem: "OrderedDict[TileKey, CachedTile]" = OrderedDict()
+        self._dir = Path(cache_dir) / re.sub(r"[^\w.-]", "_", version) if cache_dir else None
+        self._inflight: Dict[TileKey, asyncio.Future] = {}
+
+    def cacheable(self, z: int) -> bool:
+        return z <= self.max_zoom
+
+    def _path(self, key: TileKey) -> Path:
+        z, x, y, cluster = key
+        return self._dir / str(z) / str(x) / f"{y}{'-c' if cluster else ''}.mvt"  # type: ignore[operator]
+
+    def _remember(self, key: TileKey, tile: CachedTile) -> None:
+        self._mem[key] = tile
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.maxsize:
+            self._mem.popitem(last=False)
+
+    def _read_disk(self, key: TileKey) -> Optional[bytes]:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def _write_disk(self, key: TileKey, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+
+    def _unlink_disk(self, keys: Sequence[TileKey]) -> None:
+        for key in keys:
+            self._path(key).unlink(missing_ok=True)
+
+    async def get_or_render(
+        self, repo: Repository, z: int, x: int, y: int, cluster: bool, *, cache_repo: Optional[Repository] = None,
+    ) -> CachedTile:
+        """Tile do cache ou renderizado; o que vai para o cache é lido de `cache_repo` (primário), se dado."""
+        key = (z, x, y, cluster)
+        if not self.cacheable(z):
+            data = await render_tile(repo, z, x, y, cluster)
+            return CachedTile(data, _etag(self.version, data))
+
+        hit = self._mem.get(key)
+        if hit is not None:
+            self._mem.move_to_end(key)
+            return hit
+        # requisições simultâneas pelo mesmo tile esperam um único render
+        pending = self._inflight.get(key)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            data = await asyncio.to_thread(self._read_disk, key) if self._dir else None
+            rendered = data is None
+            if rendered:
+                data = await render_tile(cache_repo or repo, z, x, y, cluster)
+            tile = CachedTile(data, _etag(self.version, data))
+            # invalidado durante o render? devolve, mas não guarda (nem em disco)
+            if self._inflight.get(key) is fut:
+                if rendered and self._dir:
+                    await asyncio.to_thread(self._write_disk, key, data)
+                    if self._inflight.get(key) is not fut:
+                        # invalidado durante a escrita: o unlink pode ter vindo antes dela
+                        await asyncio.to_thread(self._unlink_disk, [key])
+                if self._inflight.get(key) is fut:
+                    self._remember(key, tile)
+            fut.set_result(tile)
+            return tile
+        except BaseException as exc:
+            fut.set_exception(exc)
+            fut.exception()  # evita "exception was never retrieved" sem aguardantes
+            raise
+        finally:
+            if self._inflight.get(key) is fut:
+                del self._inflight[key]
+
+    def touched_tiles(self, points: Iterable[Tuple[float, float]]) -> set[Tuple[int, int, int]]:
+        """
+        Tiles que desenham algum dos pontos: o que o contém e os vizinhos em
+        cuja margem (BUFFER_PX) ele cai, como em `_point_features`.
+        """
+        tiles: set[Tuple[int, int, int]] = set()
+        for lon, lat in points:
+            wx, wy = lonlat_to_world(lon, lat)
+            for z in range(self.max_zoom + 1):
+                n = 1 << z
+                for x in _tile_span(wx * n, n):
+                    for y in _tile_span(wy * n, n):
+                        tiles.add((z, x, y))
+        return tiles
+
+    async def invalidate_points(self, points: Iterable[Tuple[float, float]]) -> int:
+        """Remove (memória e disco) só os tiles que desenham algum dos pontos."""
+        keys = [(z, x, y, c) for (z, x, y) in self.touched_tiles(points) for c in (False, True)]
+        for key in keys:
+            self._mem.pop(key, None)
+            self._inflight.pop(key, None)
+        if self._dir and keys:
+            await asyncio.to_thread(self._unlink_disk, keys)
+        return len(keys) // 2
+
+    def clear(self) -> None:
+        self._mem.clear()
+        self._inflight.clear()
+
+tile_cache = TileCache(
+    settings.tiles_dataset_version,
+    maxsize=settings.tiles_cache_size,
+    max_zoom=settings.tiles_max_cached_zoom,
+    cache_dir=settings.tiles_cache_dir,
+)
+
+@on_batch_written
+async def _invalidate_tiles(docs: Sequence[Dict[str, Any]]) -> None:
+    points = [pt for pt in (point_of(d) for d in docs) if pt is not None]
+    if points:
+        n = await tile_cache.invalidate_points(points)
+        log.debug("tiles.invalidated", tiles=n, points=len(points))
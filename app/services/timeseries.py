@@ -0,0 +1,177 @@
+# app/services/timeseries.py
+"""
+Séries temporais de focos (contagem e FRP por hora/dia/semana).
+
+Buckets são prefixos de `data_hora_gmt` ("YYYY-MM-DDTHH" para hora,
+"YYYY-MM-DD" para dia e para semana — segunda-feira), então um bucket vira
+um intervalo de strings [início, próximo) no índice de data.
+
+Buckets fechados (anteriores ao bucket corrente) ficam em cache sem TTL; só
+o bucket aberto é recalculado a cada chamada. A ingestão invalida os buckets
+que receberam focos (gancho `on_batch_written`), o que cobre reprocessamentos
+de janelas antigas.
+"""
+from __future__ import annotations
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from ..core.logging_config import get_logger
+from .ingest_events import on_batch_written
+from .protocols import Repository
+
+log = get_logger()
+
+INTERVALS = ("hour", "day", "week")
+MAX_BUCKETS = 10_000
+DEFAULT_SPAN = {"hour": timedelta(hours=48), "day": timedelta(days=30), "week": timedelta(weeks=26)}
+
+# ---------- buckets ----------
+def _norm_ts(ts: str, *, end: bool = False) -> str:
+    """'YYYY-MM-DD' vira início/fim do dia; ISO completo passa direto."""
+    if "T" in ts:
+        return ts
+    return f"{ts}T{'23:59:59Z' if end else '00:00:00Z'}"
+
+def bucket_of(ts: str, interval: str) -> str:
+    if interval == "hour":
+        return ts[:13]
+    if interval == "day":
+        return ts[:10]
+    d = datetime.strptime(ts[:10], "%Y-%m-%d")
+    return (d - timedelta(days=d.weekday())).strftime("%Y-%m-%d")
+
+def _bucket_dt(bucket: str, interval: str) -> datetime:
+    fmt = "%Y-%m-%dT%H" if interval == "hour" else "%Y-%m-%d"
+    return datetime.strptime(bucket, fmt)
+
+def next_bucket(bucket: str, interval: str) -> str:
+    step = {"hour": timedelta(hours=1), "day": timedelta(days=1), "week": timedelta(weeks=1)}[interval]
+    fmt = "%Y-%m-%dT%H" if interval == "hour" else "%Y-%m-%d"
+    return (_bucket_dt(bucket, interval) + step).strftime(fmt)
+
+def buckets_between(start: str, end: str, interval: str) -> List[str]:
+    """Buckets de `start` a `end` (inclusive). Levanta ValueError acima de MAX_BUCKETS."""
+    b, last = bucket_of(_norm_ts(start), interval), bucket_of(_norm_ts(end, end=True), interval)
+    out: List[str] = []
+    while b <= last:
+        out.append(b)
+        if len(out) > MAX_BUCKETS:
+            raise ValueError(f"too many buckets (> {MAX_BUCKETS}); narrow the window or use a larger interval")
+        b = next_bucket(b, interval)
+    return out
+
+def bucket_range(first: str, last: str, interval: str) -> Dict[str, str]:
+    """Filtro de `data_hora_gmt` cobrindo os buckets [first, last]."""
+    return {"$gte": first, "$lt": next_bucket(last, interval)}
+
+# ---------- cache ----------
+CacheKey = Tuple[str, Tuple[str, ...], Tuple[Tuple[str, Any], ...]]
+
+class TimeSeriesCache:
+    """Buckets fechados por (intervalo, group_by, filtros); LRU por chave."""
+
+    def __init__(self, max_keys: int = 256) -> None:
+        self.max_keys = max_keys
+        # incrementa a cada invalidação: resultados lidos antes dela não entram no cache
+        self.generation = 0
+        self._entries: "OrderedDict[CacheKey, Dict[str, List[Dict[str, Any]]]]" = OrderedDict()
+
+    def entry(self, key: CacheKey) -> Dict[str, List[Dict[str, Any]]]:
+        e = self._entries.get(key)
+        if e is None:
+            e = self._entries[key] = {}
+            while len(self._entries) > self.max_keys:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+        return e
+
+    def invalidate(self, timestamps: Sequence[str]) -> int:
+        self.generation += 1
+        dropped = 0
+        for interval in INTERVALS:
+            buckets = {bucket_of(ts, interval) for ts in timestamps}
+            for (iv, _, _), e in self._entries.items():
+                if iv != interval:
+                    continue
+                for b in buckets:
+                    if e.pop(b, None) is not None:
+                        dropped += 1
+        return dropped
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+ts_cache = TimeSeriesCache()
+
+@on_batch_written
+async def _invalidate_buckets(docs: Sequence[Dict[str, Any]]) -> None:
+    stamps = [d["data_hora_gmt"] for d in docs if d.get("data_hora_gmt")]
+    if stamps:
+        dropped = ts_cache.invalidate(stamps)
+        if dropped:
+            log.debug("timeseries.invalidated", buckets=dropped)
+
+# ---------- consulta ----------
+async def timeseries(
+    repo: Repository,
+    *,
+    interval: str,
+    group_by: Sequence[str],
+    filters: Dict[str, Any],
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+    now: Optional[datetime] = None,
+    cache_repo: Optional[Repository] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Linhas {bucket, <dims>, count, frp_sum} ordenadas por bucket.
+    `filters` são igualdades simples (satelite/estado/bioma). Buckets fechados
+    ficam no cache para sempre: são lidos de `cache_repo` (o primário; uma
+    secundária atrasada congelaria contagens incompletas), o corrente de `repo`.
+    """
+    now = now or datetime.now(timezone.utc)
+    end = end or now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    start = start or (now - DEFAULT_SPAN[interval]).strftime("%Y-%m-%dT%H:%M:%SZ")
+    buckets = buckets_between(start, end, interval)
+    if not buckets:
+        return []
+
+    open_b = bucket_of(now.strftime("%Y-%m-%dT%H:%M:%SZ"), interval)
+    closed = [b for b in buckets if b < open_b]
+    current = [b for b in buckets if b >= open_b]
+
+    key: CacheKey = (interval, tuple(group_by), tuple(sorted(filters.items())))
+    entry = ts_cache.entry(key)
+
+    async def _query(source: Repository, first: str, last: str) -> Dict[str, List[Dict[str, Any]]]:
+        flt = {**filters, "data_hora_gmt": bucket_range(first, last, interval)}
+        rows = await source.agg_timeseries(flt, interval, list(group_by))
+        by_bucket: Dict[str, List[Dict[str, Any]]] = {}
+        for r in rows:
+            by_bucket.setdefault(r["bucket"], []).append(r)
+        return by_bucket
+
+    missing = [b for b in closed if b not in entry]
+    fetched: Dict[str, List[Dict[str, Any]]] = {}
+    if missing:
+        gen = ts_cache.generation
+        fetched = await _query(cache_repo or repo, missing[0], missing[-1])
+        if gen == ts_cache.generation:
+            # buckets fechados sem focos também entram no cache (lista vazia)
+            for b in closed:
+                if missing[0] <= b <= missing[-1]:
+                    entry[b] = fetched.get(b, [])
+        log.debug("timeseries.closed_fetched", buckets=len(missing), interval=interval)
+
+    live = await _query(repo, current[0], current[-1]) if current else {}
+
+    out: List[Dict[str, Any]] = []
+    for b in buckets:
+        if b >= open_b:
+            rows = live.get(b, [])
+        else:
+            rows = entry[b] if b in entry else fetched.get(b, [])
+        out.extend(sorted(rows, key=lambda r: tuple(str(r.get(d) or "") for d in group_by)))
+    return out
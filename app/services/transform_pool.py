@@ -0,0 +1,54 @@
+# app/services/transform_pool.py
+"""
+Executor da transformação feature -> documento (TRANSFORM_EXECUTOR).
+
+`inline` (padrão) converte no event loop, como sempre foi. `thread` e
+`process` recebem páginas inteiras (TRANSFORM_PAGE_SIZE features por tarefa,
+`utils.features.docs_from_page`) e devolvem os documentos na ordem de
+chegada. O pool é um por processo, criado na primeira ingestão e reutilizado:
+subir processos com `spawn` custa caro perto de uma sincronização de 48h. Um
+pool quebrado (worker morto: OOM, SIGKILL -> BrokenProcessPool) é descartado
+pela ingestão que o encontrou; a próxima cria outro.
+"""
+from __future__ import annotations
+import threading
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Optional
+
+from ..core.config import settings
+from ..core.logging_config import get_logger
+from ..utils.procpool import default_workers, process_pool
+
+log = get_logger()
+
+_pool: Optional[Executor] = None
+_lock = threading.Lock()
+
+def transform_workers() -> int:
+    return settings.transform_workers or default_workers()
+
+def transform_pool() -> Optional[Executor]:
+    """Executor configurado; None = transformação inline no event loop."""
+    global _pool
+    if settings.transform_executor == "inline":
+        return None
+    with _lock:
+        if _pool is None:
+            workers = transform_workers()
+            if settings.transform_executor == "process":
+                # 1 worker não justifica um processo (IPC sem paralelismo): uma thread
+                _pool = process_pool(workers) or ThreadPoolExecutor(1, thread_name_prefix="transform")
+            else:
+                _pool = ThreadPoolExecutor(workers, thread_name_prefix="transform")
+            log.info("transform.pool.started", executor=settings.transform_executor, workers=workers)
+        return _pool
+
+def close_transform_pool(broken: Optional[Executor] = None) -> None:
+    """Encerra o pool (shutdown). Com `broken`, só se ele ainda for o pool atual."""
+    global _pool
+    with _lock:
+        if _pool is not None and (broken is None or _pool is broken):
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+            if broken is not None:
+                log.warning("transform.pool.discarded", executor=settings.transform_executor)
@@ -1,15 +1,19 @@
 # app/services/wfs_service.py
 from __future__ import annotations
-from typing import AsyncIterator, Dict, Any, Optional
+import re
+from typing import AsyncIterator, Callable, Dict, Any, Optional
+from time import perf_counter
 from urllib.parse import urlencode, quote_plus, quote
 import httpx
 # from pybreaker import CircuitBreaker   # alterar para aiobreaker
 import pybreaker
 from tenacity import AsyncRetrying, stop_after_attempt, wait_exponential, retry_if_exception_type, wait_exponential_jitter
 
+from .page_journal import PageJournal, default_journal, new_run_id
 from .protocols import FireSource
 from ..core.config import settings
 from ..core.logging_config import get_logger
+from ..core.metrics import REGISTRY, WFS_PAGE_BYTES, WFS_PAGE_FEATURES, WFS_REQUEST_SECONDS, WFS_RETRIES
 
 log = get_logger()
 
@@ -20,6 +24,26 @@ breaker = pybreaker.CircuitBreaker(    # pybreaker.CircuitBreaker
     # name="wfs-http",
 )
 
+_BREAKER_STATES = {"closed": 0, "half-open": 1, "open": 2}
+REGISTRY.gauge(
+    "inpe_wfs_breaker_state", "Estado do circuit breaker do WFS (0=closed, 1=half-open, 2=open).",
+    fn=lambda: _BREAKER_STATES.get(breaker.current_state, -1),
+)
+REGISTRY.gauge(
+    "inpe_wfs_breaker_failures", "Falhas consecutivas contadas pelo breaker do WFS.",
+    fn=lambda: breaker.fail_counter,
+)
+
+_NUMBER_MATCHED = re.compile(r'numberMatched="(\d+)"')
+
+def _number_matched(r: httpx.Response) -> int:
+    """`numberMatched` da resposta de hits (XML do WFS 2.0; JSON se o servidor responder assim)."""
+    m = _NUMBER_MATCHED.search(r.text)
+    if m:
+        return int(m.group(1))
+    data = r.json()
+    return int(data.get("numberMatched", data.get("totalFeatures")))
+
 def _norm_iso(day_or_iso: str, *, end: bool = False) -> str:
     """Aceita 'YYYY-MM-DD' ou ISO completo; completa hora se vier só a data."""
     if "T" in day_or_iso:
@@ -45,6 +69,8 @@ class WfsFireSource(FireSource):
         date_field: str | None = None,
         page_size: int | None = None,
         sortby: str | None = None,
+        client: httpx.AsyncClient | None = None,
+        journal: PageJournal | None = None,
     ) -> None:
         # self.base = settings.wfs_base.rstrip("/")
         # self.path = settings.wfs_service_path
@@ -62,7 +88,10 @@ class WfsFireSource(FireSource):
         self.date_field = date_field or settings.wfs_date_field
         self.page_size = page_size or settings.wfs_page_size
         self.sortby = sortby or settings.wfs_sortby
-        self._client = httpx.AsyncClient(timeout=30.0)
+        # cliente injetável (ex.: stand-in local via httpx.ASGITransport nos benchmarks)
+        self._client = client or httpx.AsyncClient(timeout=30.0)
+        # diário das páginas brutas (JOURNAL_DIR); None = não grava
+        self.journal = journal if journal is not None else default_journal()
     
     def _url(self, *, start_index: int = 0, cql: Optional[str] = None) -> str:
         params = {
@@ -80,7 +109,8 @@ class WfsFireSource(FireSource):
             params["cql_filter"] = cql
         return f"{self.base}{self.path}?{urlencode(params, quote_via=quote_plus)}"
 
-    async def _get_json(self, url: str) -> Dict[str, Any]:
+    async def _get(self, url: str, layer: str, parse: Callable[[httpx.Response], Any]) -> Any:
+        """GET com retry/breaker; `parse(resposta)` roda dentro da tentativa (corpo inválido também é retentado)."""
         async for attempt in AsyncRetrying(
             stop=stop_after_attempt(settings.retry_max_attempts),
             wait=wait_exponential(
@@ -91,10 +121,46 @@ class WfsFireSource(FireSource):
             reraise=True,
         ):
             with attempt:
-                r = await breaker.call_async(self._client.get, url)      # .call(self._client.get, url, timeout=60)
-                r.raise_for_status()
-                return r.json()
-    
+                if attempt.retry_state.attempt_number > 1:
+                    WFS_RETRIES.labels(layer).inc()
+                t0 = perf_counter()
+                try:
+                    r = await breaker.call_async(self._client.get, url)      # .call(self._client.get, url, timeout=60)
+                    r.raise_for_status()
+                except Exception:
+                    WFS_REQUEST_SECONDS.labels(layer, "error").observe(perf_counter() - t0)
+                    raise
+                WFS_REQUEST_SECONDS.labels(layer, "ok").observe(perf_counter() - t0)
+                return r, parse(r)
+
+    async def _get_json(self, url: str, layer: str = "unknown", meta: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Página GeoJSON; com diário e `meta` (run, startIndex, CQL), guarda o corpo bruto."""
+        r, data = await self._get(url, layer, lambda r: r.json())
+        WFS_PAGE_BYTES.labels(layer).observe(len(r.content))
+        if meta is not None and self.journal is not None:
+            await self.journal.record(
+                layer, url, r.content, features=len((data or {}).get("features") or []), **meta,
+            )
+        return data
+
+    async def count(self, start: str, end: str, typename: Optional[str] = None) -> int:
+        """
+        Número de features com o campo de data em [start, end] (datas ou ISO),
+        via `resultType=hits`: o GeoServer só conta, sem serializar features.
+        """
+        chosen_typename = typename or self.typename_hist or self.typename_48h
+        params = {
+            "service": "WFS",
+            "version": "2.0.0",
+            "request": "GetFeature",
+            "typeNames": chosen_typename,
+            "resultType": "hits",
+            "cql_filter": f"{self.date_field} BETWEEN {_norm_iso(start)} AND {_norm_iso(end, end=True)}",
+        }
+        url = f"{self.base}{self.service_path}?{urlencode(params, safe=' :,<>=T')}"
+        _, matched = await self._get(url, chosen_typename, _number_matched)
+        return matched
+
     def _base_params(self, typename: str) -> Dict[str, Any]:
         return dict(
             service="WFS",
@@ -104,7 +170,7 @@ class WfsFireSource(FireSource):
             srsName=settings.wfs_srid,
             outputFormat="application/json",
             count=self.page_size,
-            sortBy=self.date_field,
+            sortBy=self.sortby,
         )
     
     async def _paginate(self, *, cql: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
@@ -154,12 +220,14 @@ class WfsFireSource(FireSource):
         typename = self.typename_48h
         start = 0
         total = 0
+        run = new_run_id()
         while True:
             params = self._base_params(typename)
             params["startIndex"] = start
             url = f"{self.base}{self.service_path}?{urlencode(params, safe=':,')}"
-            data = await self._get_json(url)
+            data = await self._get_json(url, typename, {"run": run, "start_index": start})
             feats = (data or {}).get("features") or []
+            WFS_PAGE_FEATURES.labels(typename).observe(len(feats))
             log.info("wfs.response", start_index=start, received=len(feats))
             if not feats:
                 break
@@ -187,14 +255,16 @@ class WfsFireSource(FireSource):
         """
         Faz paginação por intervalo arbitrário via CQL_FILTER:
           data_hora_gmt BETWEEN startT00:00:00Z AND endT23:59:59Z
+        (`start_date`/`end_date` também aceitam ISO completo, ex. janelas de uma hora).
         Usa typename histórico se disponível, senão cai no typename_48h.
         """
         chosen_typename = typename or self.typename_hist or self.typename_48h
         start_idx = 0
         total = 0
+        run = new_run_id()
 
         # CQL para o campo de data configurado
-        cql = f"{self.date_field} BETWEEN {start_date}T00:00:00Z AND {end_date}T23:59:59Z"
+        cql = f"{self.date_field} BETWEEN {_norm_iso(start_date)} AND {_norm_iso(end_date, end=True)}"
 
         while True:
             params = self._base_params(chosen_typename)
@@ -206,8 +276,9 @@ class WfsFireSource(FireSource):
             url = f"{self.base}{self.service_path}?{urlencode(params, safe=' :,<>=T')}"
 
             log.info("wfs.request.range", field=self.date_field, start=start_date, end=end_date)
-            data = await self._get_json(url)
+            data = await self._get_json(url, chosen_typename, {"run": run, "start_index": start_idx, "cql": cql})
             feats = (data or {}).get("features") or []
+            WFS_PAGE_FEATURES.labels(chosen_typename).observe(len(feats))
             log.info("wfs.response", start_index=start_idx, received=len(feats))
             if not feats:
                 break
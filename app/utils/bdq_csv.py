@@ -0,0 +1,128 @@
+# app/utils/bdq_csv.py
+"""
+Parser dos arquivos CSV do BDQueimadas (dumps diários, mensais e anuais).
+
+Converte linhas em Features no mesmo formato do GeoJSON do WFS (o que
+`_doc_from_feature` espera): propriedades com os nomes da camada WFS,
+geometria Point, `data_hora_gmt` em ISO UTC.
+
+Os dumps mudaram de cabeçalho ao longo dos anos (`datahora`/`data_hora_gmt`,
+`latitude`/`lat`, `riscofogo`/`risco_fogo`...); `ALIASES` leva todos para o
+nome da camada. Separador (`,` ou `;`) e encoding (UTF-8 ou Latin-1) são
+detectados. O identificador segue a precedência da ingestão WFS (`foco_id`,
+depois `id_foco_bdq`, depois `id`), então o mesmo foco vindo do CSV e do WFS
+cai no mesmo documento. Sem nenhum deles, o id é derivado de satélite +
+data/hora + posição (`bdq_...`): estável entre reimportações do mesmo arquivo,
+mas nunca coincide com o `_id` do WFS — esses focos não se fundem com os da
+ingestão e, se o WFS também os trouxer, ficam duplicados.
+
+Sem dependências do app: `parse_block` roda em processos do pool (spawn).
+"""
+from __future__ import annotations
+import csv
+import io
+from typing import Any, Dict, List, Optional, Sequence
+
+ALIASES: Dict[str, str] = {
+    "datahora": "data_hora_gmt",
+    "data_hora": "data_hora_gmt",
+    "data_pas": "data_hora_gmt",
+    "latitude": "lat",
+    "longitude": "lon",
+    "diasemchuva": "numero_dias_sem_chuva",
+    "dias_sem_chuva": "numero_dias_sem_chuva",
+    "riscofogo": "risco_fogo",
+    "id_bdq": "id_foco_bdq",
+}
+FLOAT_FIELDS = frozenset({"lat", "lon", "precipitacao", "risco_fogo", "frp"})
+INT_FIELDS = frozenset({"municipio_id", "estado_id", "pais_id", "numero_dias_sem_chuva", "id_foco_bdq"})
+
+def normalize_header(raw: Sequence[str]) -> List[str]:
+    """Cabeçalho do arquivo -> nomes das propriedades da camada WFS."""
+    out = []
+    for name in raw:
+        key = name.strip().strip('"').lstrip("\ufeff").lower()
+        out.append(ALIASES.get(key, key))
+    return out
+
+def sniff_delimiter(header_line: str) -> str:
+    return ";" if header_line.count(";") > header_line.count(",") else ","
+
+def parse_ts(value: Optional[str]) -> Optional[str]:
+    """
+    '2023-01-01 13:40:00', '2023/01/01 13:40', '01/01/2023 13:40:00',
+    '2023-01-01T13:40:00Z' -> '2023-01-01T13:40:00Z'.
+    """
+    if not value:
+        return None
+    day, _, clock = value.strip().replace("T", " ").partition(" ")
+    day = day.replace("/", "-")
+    if len(day) == 10 and day[2] == "-":          # dd-mm-aaaa
+        day = f"{day[6:]}-{day[3:5]}-{day[:2]}"
+    clock = clock.strip().rstrip("Z").split("+")[0].split(".")[0] or "00:00:00"
+    if len(clock) == 5:
+        clock += ":00"
+    return f"{day}T{clock}Z"
+
+def _number(value: str, cast) -> Any:
+    try:
+        return cast(float(value.replace(",", ".")))
+    except ValueError:
+        return None
+
+def row_to_feature(header: Sequence[str], row: Sequence[str]) -> Optional[Dict[str, Any]]:
+    props: Dict[str, Any] = {}
+    for name, raw in zip(header, row):
+        value = raw.strip()
+        if not value:
+            props[name] = None
+        elif name in FLOAT_FIELDS:
+            props[name] = _number(value, float)
+        elif name in INT_FIELDS:
+            props[name] = _number(value, int)
+        else:
+            props[name] = value
+    lat, lon = props.get("lat"), props.get("lon")
+    ts = props["data_hora_gmt"] = parse_ts(props.get("data_hora_gmt"))
+    if lat is None or lon is None or ts is None:
+        return None
+    props["latitude"], props["longitude"] = lat, lon
+    # mesma precedência de utils.features.doc_from_feature
+    foco_id = props.get("foco_id") or props.get("id_foco_bdq") or props.get("id")
+    if not foco_id:     # sintético: não casa com ids do WFS (ver docstring do módulo)
+        foco_id = f"bdq_{props.get('satelite')}_{ts[:16]}_{lon:.5f}_{lat:.5f}"
+    props["foco_id"] = str(foco_id)
+    return {
+        "type": "Feature",
+        "id": props["foco_id"],
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "properties": props,
+    }
+
+def parse_block(
+    header: Sequence[str],
+    delimiter: str,
+    data: bytes,
+    start: Optional[str] = None,
+    end: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Bloco de linhas completas (bytes, sem cabeçalho) -> Features; descarta
+    linhas sem data/posição e, se informado, fora de [start, end] (ISO).
+    """
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode("latin-1")
+    out = []
+    for row in csv.reader(io.StringIO(text), delimiter=delimiter):
+        if not row:
+            continue
+        feat = row_to_feature(header, row)
+        if feat is None:
+            continue
+        ts = feat["properties"]["data_hora_gmt"]
+        if (start and ts < start) or (end and ts > end):
+            continue
+        out.append(feat)
+    return out
@@ -0,0 +1,81 @@
+# app/utils/export_formats.py
+"""
+Encoders em streaming para /data/export (NDJSON, GeoJSON, CSV).
+
+Cada encoder consome um async iterator de documentos (cursor Mongo) e emite
+blocos de bytes com `rows_per_chunk` linhas: a memória fica limitada a um
+bloco, independente do tamanho do resultado.
+"""
+from __future__ import annotations
+import csv
+import io
+from typing import Any, AsyncIterator, Callable, Mapping
+
+from ..models.schemas import FocusItem
+from .fast_json import dumps, focus_item_dict, feature_dict
+
+CSV_COLUMNS = [name for name in FocusItem.model_fields if name != "geometry"]
+
+MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "geojson": "application/geo+json",
+    "csv": "text/csv; charset=utf-8",
+}
+
+async def _chunked(
+    docs: AsyncIterator[Mapping[str, Any]],
+    encode: Callable[[Mapping[str, Any]], bytes],
+    *,
+    head: bytes = b"",
+    sep: bytes = b"",
+    tail: bytes = b"",
+    rows_per_chunk: int = 500,
+) -> AsyncIterator[bytes]:
+    rows_per_chunk = max(1, rows_per_chunk)
+    buf = bytearray(head)
+    rows = 0
+    async for d in docs:
+        if rows and sep:
+            buf += sep
+        buf += encode(d)
+        rows += 1
+        if rows % rows_per_chunk == 0:
+            yield bytes(buf)
+            buf.clear()
+    buf += tail
+    if buf:
+        yield bytes(buf)
+
+def ndjson_stream(docs: AsyncIterator[Mapping[str, Any]], rows_per_chunk: int = 500) -> AsyncIterator[bytes]:
+    return _chunked(docs, lambda d: dumps(focus_item_dict(d)) + b"\n", rows_per_chunk=rows_per_chunk)
+
+def geojson_stream(docs: AsyncIterator[Mapping[str, Any]], rows_per_chunk: int = 500) -> AsyncIterator[bytes]:
+    return _chunked(
+        docs,
+        lambda d: dumps(feature_dict(d)),
+        head=b'{"type":"FeatureCollection","features":[',
+        sep=b",",
+        tail=b"]}",
+        rows_per_chunk=rows_per_chunk,
+    )
+
+def csv_stream(docs: AsyncIterator[Mapping[str, Any]], rows_per_chunk: int = 500) -> AsyncIterator[bytes]:
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+
+    def _row(d: Mapping[str, Any]) -> bytes:
+        item = focus_item_dict(d)
+        writer.writerow(["" if item[c] is None else item[c] for c in CSV_COLUMNS])
+        line = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return line.encode("utf-8")
+
+    header = (",".join(CSV_COLUMNS) + "\n").encode("utf-8")
+    return _chunked(docs, _row, head=header, rows_per_chunk=rows_per_chunk)
+
+ENCODERS = {
+    "ndjson": ndjson_stream,
+    "geojson": geojson_stream,
+    "csv": csv_stream,
+}
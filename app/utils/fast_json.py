@@ -0,0 +1,62 @@
+# app/utils/fast_json.py
+"""
+Caminho rápido de serialização (orjson) para respostas grandes de /data/*.
+
+Os dicts são montados direto da saída do repositório (confiável), sem passar
+por FocusItem/FocusListResponse nem pela revalidação do `response_model`.
+O JSON gerado tem o mesmo shape e os mesmos bytes do caminho pydantic:
+chaves na ordem dos modelos, floats coeridos como o pydantic faz e separadores
+compactos/UTF-8 como o `JSONResponse` do FastAPI.
+"""
+from __future__ import annotations
+from typing import Any, Dict, Iterable, List, Mapping, Optional
+
+import orjson
+from fastapi.responses import JSONResponse
+
+def _opt_float(v: Any) -> Optional[float]:
+    return None if v is None else float(v)
+
+def _default(obj: Any) -> Any:
+    # RawBSONDocument (leitura lean) não é dict: orjson precisa de ajuda
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    raise TypeError
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default)
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse renderizada com orjson (mesmo media type/bytes do padrão)."""
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def focus_item_dict(d: Mapping[str, Any]) -> Dict[str, Any]:
+    """Equivalente a `FocusItem(...).model_dump()`, sem validação."""
+    return {
+        "id": d.get("id") or str(d.get("_id")),
+        "data_hora_gmt": d.get("data_hora_gmt"),
+        "longitude": _opt_float(d.get("longitude")),
+        "latitude": _opt_float(d.get("latitude")),
+        "satelite": d.get("satelite"),
+        "municipio": d.get("municipio"),
+        "estado": d.get("estado"),
+        "pais": d.get("pais"),
+        "bioma": d.get("bioma"),
+        "frp": _opt_float(d.get("frp")),
+        "geometry": d.get("geometry"),
+    }
+
+def feature_dict(d: Mapping[str, Any]) -> Dict[str, Any]:
+    """Equivalente a `GeoJSONFeature(...).model_dump()` (properties = campos do FocusItem)."""
+    props = focus_item_dict(d)
+    fid = props.pop("id")
+    geom = props.pop("geometry")
+    return {"type": "Feature", "id": fid, "geometry": geom, "properties": props}
+
+def focus_list_dict(docs: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    items: List[Dict[str, Any]] = [focus_item_dict(d) for d in docs]
+    return {"total": len(items), "returned": len(items), "items": items}
+
+def feature_collection_dict(docs: Iterable[Mapping[str, Any]]) -> Dict[str, Any]:
+    return {"type": "FeatureCollection", "features": [feature_dict(d) for d in docs]}
@@ -0,0 +1,52 @@
+# app/utils/features.py
+"""
+Feature (GeoJSON do WFS) -> documento gravado, sem dependência da API.
+
+Módulo de import leve: `docs_from_page` é a tarefa enviada aos workers do
+pool de transformação (uma página inteira por tarefa, para que o custo de
+IPC fique pequeno perto do trabalho). As resoluções da grade vêm como
+argumento; o worker não lê configuração.
+"""
+from __future__ import annotations
+from typing import Any, Dict, List, Sequence
+
+from .grid import grid_keys, point_of
+
+def doc_from_feature(feat: Dict[str, Any], resolutions: Sequence[float]) -> Dict[str, Any]:
+    """Documento do foco; `{}` se a feature não tem identificador estável."""
+    props = feat.get("properties") or {}
+    geom = feat.get("geometry")
+
+    doc_id = props.get("foco_id") or props.get("id_foco_bdq") or feat.get("id")
+    if not doc_id:
+        # sem identificador estável, descartamos o registro
+        return {}
+    doc = {
+        "_id": doc_id,
+        "id": doc_id,
+        "properties": props,
+        "geometry": geom,
+        "data_hora_gmt": props.get("data_hora_gmt"),
+        "longitude": props.get("longitude"),
+        "latitude": props.get("latitude"),
+        "satelite": props.get("satelite"),
+        "municipio": props.get("municipio"),
+        "estado": props.get("estado"),
+        "pais": props.get("pais"),
+        "bioma": props.get("bioma"),
+        "frp": props.get("frp"),
+    }
+    # chaves de célula por resolução (agregação de densidade sem geometria no $group)
+    pt = point_of(doc)
+    if pt is not None:
+        doc["grid"] = grid_keys(pt[0], pt[1], resolutions)
+    return doc
+
+def docs_from_page(feats: List[Dict[str, Any]], resolutions: Sequence[float]) -> List[Dict[str, Any]]:
+    """Documentos de uma página, na ordem das features (descartadas as sem id)."""
+    out = []
+    for feat in feats:
+        doc = doc_from_feature(feat, resolutions)
+        if doc:
+            out.append(doc)
+    return out
@@ -0,0 +1,47 @@
+# app/utils/geo.py
+from __future__ import annotations
+import math
+from typing import Any, Dict, Tuple
+
+EARTH_RADIUS_KM = 6378.1
+
+BBox = Tuple[float, float, float, float]
+
+def parse_bbox(bbox: str) -> BBox:
+    """
+    Converte 'minLon,minLat,maxLon,maxLat' em tupla de floats.
+    ValueError (mensagem pronta para 422) se não forem 4 números finitos.
+    """
+    parts = bbox.split(",")
+    if len(parts) != 4:
+        raise ValueError("bbox must be minLon,minLat,maxLon,maxLat")
+    try:
+        min_lon, min_lat, max_lon, max_lat = (float(p) for p in parts)
+    except ValueError:
+        raise ValueError("bbox values must be numbers") from None
+    if not all(math.isfinite(v) for v in (min_lon, min_lat, max_lon, max_lat)):
+        raise ValueError("bbox values must be finite")
+    return min_lon, min_lat, max_lon, max_lat
+
+def bbox_geometry(bbox: BBox) -> Dict[str, Any]:
+    """
+    Polígono GeoJSON (anel fechado, anti-horário) para `$geoWithin` no índice 2dsphere.
+    """
+    min_lon, min_lat, max_lon, max_lat = bbox
+    return {
+        "type": "Polygon",
+        "coordinates": [[
+            [min_lon, min_lat], [max_lon, min_lat], [max_lon, max_lat],
+            [min_lon, max_lat], [min_lon, min_lat],
+        ]],
+    }
+
+def within_bbox(bbox: BBox) -> Dict[str, Any]:
+    return {"$geoWithin": {"$geometry": bbox_geometry(bbox)}}
+
+def within_radius(lon: float, lat: float, km: float) -> Dict[str, Any]:
+    """
+    Filtro por raio com `$centerSphere` (não exige ordenação por distância,
+    então combina com sort por data — ao contrário de `$near`).
+    """
+    return {"$geoWithin": {"$centerSphere": [[lon, lat], km / EARTH_RADIUS_KM]}}
@@ -0,0 +1,45 @@
+# app/utils/grid.py
+"""
+Grade fixa em graus para agregações de densidade.
+
+Cada foco recebe, na ingestão, uma chave de célula por resolução
+(`grid.r0_5 = "ix:iy"`), e o `$group` de /data/density agrupa direto por
+esse campo indexado, sem cálculo geométrico no servidor.
+"""
+from __future__ import annotations
+import math
+from typing import Any, Dict, Iterable, Mapping, Optional, Tuple
+
+def res_key(res: float) -> str:
+    """Nome do campo da resolução: 0.5 -> 'r0_5', 1 -> 'r1'."""
+    return "r" + format(res, "g").replace(".", "_")
+
+def cell_index(lon: float, lat: float, res: float) -> Tuple[int, int]:
+    # arredonda antes do floor para não cair na célula vizinha por erro de float
+    return math.floor(round(lon / res, 9)), math.floor(round(lat / res, 9))
+
+def cell_key(lon: float, lat: float, res: float) -> str:
+    ix, iy = cell_index(lon, lat, res)
+    return f"{ix}:{iy}"
+
+def cell_bounds(key: str, res: float) -> Tuple[float, float, float, float]:
+    """(minLon, minLat, maxLon, maxLat) da célula `ix:iy`."""
+    ix, iy = (int(p) for p in key.split(":"))
+    return (
+        round(ix * res, 9), round(iy * res, 9),
+        round((ix + 1) * res, 9), round((iy + 1) * res, 9),
+    )
+
+def point_of(doc: Mapping[str, Any]) -> Optional[Tuple[float, float]]:
+    """(lon, lat) do documento: geometry Point ou, na falta, longitude/latitude."""
+    geom = doc.get("geometry") or {}
+    coords = geom.get("coordinates") if geom.get("type") == "Point" else None
+    if coords and len(coords) >= 2 and coords[0] is not None and coords[1] is not None:
+        return float(coords[0]), float(coords[1])
+    lon, lat = doc.get("longitude"), doc.get("latitude")
+    if lon is None or lat is None:
+        return None
+    return float(lon), float(lat)
+
+def grid_keys(lon: float, lat: float, resolutions: Iterable[float]) -> Dict[str, str]:
+    return {res_key(r): cell_key(lon, lat, r) for r in resolutions}
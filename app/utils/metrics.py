@@ -0,0 +1,187 @@
+# app/utils/metrics.py
+"""
+Métricas no formato texto do Prometheus (exposition format 0.0.4), sem
+dependência externa: Counter, Gauge (valor ou callback) e Histogram.
+
+Custo no caminho quente: `labels(...)` devolve uma série em cache (um dict
+lookup); `inc`/`observe` são somas em floats (+ bisect no histograma).
+Pensado para o event loop (uma thread); não usa locks.
+"""
+from __future__ import annotations
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    if v == int(v) and abs(v) < 1e15:
+        return str(int(v))
+    return repr(float(v))
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _label_str(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple[str, ...], object] = {}
+
+    def _new(self):
+        raise NotImplementedError
+
+    def labels(self, *values: str):
+        """Série para os valores de label (criada na primeira chamada e reutilizada)."""
+        s = self._series.get(values)
+        if s is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name}: expected labels {self.labelnames}")
+            s = self._series[values] = self._new()
+        return s
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        head = f"# HELP {self.name} {self.documentation}\n# TYPE {self.name} {self.kind}\n"
+        return head + "".join(line + "\n" for line in self.samples())
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self) -> None:
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+    def set(self, v: float) -> None:
+        self.value = v
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def samples(self) -> Iterable[str]:
+        for values, s in self._series.items():
+            yield f"{self.name}{_label_str(self.labelnames, values)} {_fmt(s.value)}"  # type: ignore[attr-defined]
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        fn: Optional[Callable[[], float]] = None,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._fn = fn   # lido na coleta (sem custo no caminho quente)
+
+    def _new(self) -> _Value:
+        return _Value()
+
+    def set(self, v: float) -> None:
+        self._default().set(v)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def samples(self) -> Iterable[str]:
+        if self._fn is not None:
+            try:
+                yield f"{self.name} {_fmt(float(self._fn()))}"
+            except Exception:
+                return
+            return
+        for values, s in self._series.items():
+            yield f"{self.name}{_label_str(self.labelnames, values)} {_fmt(s.value)}"  # type: ignore[attr-defined]
+
+class _HistSeries:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: Tuple[float, ...]) -> None:
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # último = +Inf
+        self.sum = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect_left(self.bounds, v)] += 1
+        self.sum += v
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.bounds = tuple(sorted(buckets))
+
+    def _new(self) -> _HistSeries:
+        return _HistSeries(self.bounds)
+
+    def observe(self, v: float) -> None:
+        self._default().observe(v)
+
+    def samples(self) -> Iterable[str]:
+        for values, s in self._series.items():
+            acc = 0
+            for bound, n in zip(self.bounds + (float("inf"),), s.counts):  # type: ignore[attr-defined]
+                acc += n
+                le = f'le="{_fmt(bound)}"'
+                yield f"{self.name}_bucket{_label_str(self.labelnames, values, le)} {acc}"
+            yield f"{self.name}_sum{_label_str(self.labelnames, values)} {_fmt(s.sum)}"  # type: ignore[attr-defined]
+            yield f"{self.name}_count{_label_str(self.labelnames, values)} {acc}"
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), fn: Optional[Callable[[], float]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, fn))  # type: ignore[return-value]
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        return "".join(m.render() for m in self._metrics)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
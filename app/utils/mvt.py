@@ -0,0 +1,115 @@
+# app/utils/mvt.py
+"""
+Encoder mínimo de Mapbox Vector Tiles (spec 2.1) para camadas de pontos,
+mais a matemática de tiles XYZ (Web Mercator). Escrito à mão para não
+depender de protobuf/mapbox-vector-tile: só precisamos de POINT.
+"""
+from __future__ import annotations
+import math
+import struct
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+MAX_LAT = 85.0511287798066
+
+# ---------- tiles XYZ ----------
+def tile_bounds(z: int, x: int, y: int) -> Tuple[float, float, float, float]:
+    """(minLon, minLat, maxLon, maxLat) do tile."""
+    n = 1 << z
+    def _lat(yy: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * yy / n))))
+    return x / n * 360.0 - 180.0, _lat(y + 1), (x + 1) / n * 360.0 - 180.0, _lat(y)
+
+def lonlat_to_world(lon: float, lat: float) -> Tuple[float, float]:
+    """Coordenadas Mercator normalizadas em [0, 1) (origem no canto superior esquerdo)."""
+    lat = max(-MAX_LAT, min(MAX_LAT, lat))
+    wx = (lon + 180.0) / 360.0
+    s = math.sin(math.radians(lat))
+    wy = 0.5 - math.log((1 + s) / (1 - s)) / (4 * math.pi)
+    return wx, wy
+
+def lonlat_to_tile(lon: float, lat: float, z: int) -> Tuple[int, int]:
+    n = 1 << z
+    wx, wy = lonlat_to_world(lon, lat)
+    return min(n - 1, max(0, int(wx * n))), min(n - 1, max(0, int(wy * n)))
+
+def lonlat_to_tile_px(lon: float, lat: float, z: int, x: int, y: int, extent: int = 4096) -> Tuple[int, int]:
+    """Posição do ponto dentro do tile, em unidades de `extent`."""
+    n = 1 << z
+    wx, wy = lonlat_to_world(lon, lat)
+    return int(round((wx * n - x) * extent)), int(round((wy * n - y) * extent))
+
+# ---------- protobuf ----------
+def _varint(n: int) -> bytes:
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+def _zigzag(n: int) -> int:
+    return (n << 1) ^ (n >> 63)
+
+def _tag(field: int, wire: int) -> bytes:
+    return _varint((field << 3) | wire)
+
+def _len_delimited(field: int, payload: bytes) -> bytes:
+    return _tag(field, 2) + _varint(len(payload)) + payload
+
+def _packed(field: int, values: Iterable[int]) -> bytes:
+    return _len_delimited(field, b"".join(_varint(v) for v in values))
+
+def _value(v: Any) -> bytes:
+    # Tile.Value: 1 string, 3 double, 6 sint64, 7 bool
+    if isinstance(v, bool):
+        return _tag(7, 0) + _varint(int(v))
+    if isinstance(v, int):
+        return _tag(6, 0) + _varint(_zigzag(v) & 0xFFFFFFFFFFFFFFFF)
+    if isinstance(v, float):
+        return _tag(3, 1) + struct.pack("<d", v)
+    return _len_delimited(1, str(v).encode("utf-8"))
+
+PointFeature = Tuple[int, int, Dict[str, Any], Optional[int]]
+
+def encode_point_layer(name: str, features: List[PointFeature], extent: int = 4096) -> bytes:
+    """
+    Codifica uma camada MVT de pontos. `features` = [(px, py, props, id|None)],
+    com px/py já em coordenadas do tile (0..extent). Props None são omitidas.
+    """
+    keys: Dict[str, int] = {}
+    values: Dict[Tuple[type, Any], int] = {}
+    body = bytearray()
+    for px, py, props, fid in features:
+        tags: List[int] = []
+        for k, v in props.items():
+            if v is None:
+                continue
+            ki = keys.setdefault(k, len(keys))
+            vi = values.setdefault((type(v), v), len(values))
+            tags += (ki, vi)
+        feat = bytearray()
+        if fid is not None:
+            feat += _tag(1, 0) + _varint(fid)
+        if tags:
+            feat += _packed(2, tags)
+        feat += _tag(3, 0) + _varint(1)  # GeomType.POINT
+        # MoveTo(1) + dx, dy (cursor começa em 0,0 em cada feature)
+        feat += _packed(4, (9, _zigzag(px) & 0xFFFFFFFF, _zigzag(py) & 0xFFFFFFFF))
+        body += _len_delimited(2, bytes(feat))
+
+    layer = bytearray(_tag(15, 0) + _varint(2))
+    layer += _len_delimited(1, name.encode("utf-8"))
+    layer += body
+    for k in keys:
+        layer += _len_delimited(3, k.encode("utf-8"))
+    for (_, v) in values:
+        layer += _len_delimited(4, _value(v))
+    layer += _tag(5, 0) + _varint(extent)
+    return bytes(layer)
+
+def encode_tile(layers: Iterable[bytes]) -> bytes:
+    """Tile = sequência de `layers` (campo 3)."""
+    return b"".join(_len_delimited(3, layer) for layer in layers)
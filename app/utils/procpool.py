@@ -0,0 +1,89 @@
+# app/utils/procpool.py
+"""
+Trabalho de CPU fora do event loop, em processos, preservando a ordem.
+
+`ordered_map` consome um iterável de argumentos (lido numa thread, já que
+pode fazer I/O e descompressão), mantém no máximo `max_inflight` tarefas no
+pool e devolve os resultados na ordem de entrada. Com `executor=None` roda
+no pool de threads padrão (útil com 1 worker ou em testes). `ordered_amap`
+faz o mesmo com argumentos vindos de um iterador assíncrono (páginas do WFS).
+"""
+from __future__ import annotations
+import asyncio
+import multiprocessing as mp
+import os
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable, Optional, Sequence
+
+_END = object()
+
+def default_workers() -> int:
+    return max(1, (os.cpu_count() or 2) - 1)
+
+def process_pool(workers: int) -> Optional[ProcessPoolExecutor]:
+    """
+    Pool com `spawn` (o processo principal tem threads: logging, Motor); `None`
+    com `workers <= 1`. Funções enviadas devem estar em módulos de import leve.
+    """
+    if workers <= 1:
+        return None
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp.get_context("spawn"))
+
+async def ordered_map(
+    fn: Callable[..., Any],
+    items: Iterable[Sequence[Any]],
+    *,
+    executor: Optional[Executor] = None,
+    max_inflight: int = 4,
+) -> AsyncIterator[Any]:
+    """`fn(*args)` para cada `args` de `items`, no executor; resultados em ordem."""
+    loop = asyncio.get_running_loop()
+    it = iter(items)
+    inflight: deque[asyncio.Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(inflight) < max_inflight:
+                args = await asyncio.to_thread(next, it, _END)
+                if args is _END:
+                    exhausted = True
+                    break
+                inflight.append(loop.run_in_executor(executor, fn, *args))
+            if not inflight:
+                break
+            yield await inflight.popleft()
+    finally:
+        for fut in inflight:
+            fut.cancel()
+
+async def ordered_amap(
+    fn: Callable[..., Any],
+    items: AsyncIterable[Sequence[Any]],
+    *,
+    executor: Optional[Executor] = None,
+    max_inflight: int = 4,
+) -> AsyncIterator[Any]:
+    """
+    `ordered_map` sobre um iterador assíncrono. Resultado pronto sai antes de
+    puxar o próximo item: fonte lenta não atrasa a gravação do que já foi feito.
+    """
+    loop = asyncio.get_running_loop()
+    it = items.__aiter__()
+    inflight: deque[asyncio.Future] = deque()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(inflight) < max_inflight and not (inflight and inflight[0].done()):
+                try:
+                    args = await it.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                inflight.append(loop.run_in_executor(executor, fn, *args))
+            if not inflight:
+                break
+            yield await inflight.popleft()
+    finally:
+        for fut in inflight:
+            fut.cancel()
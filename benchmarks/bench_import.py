@@ -0,0 +1,96 @@
+# benchmarks/bench_import.py
+"""
+Benchmark da importação de dumps do BDQueimadas (`FileFireSource`), offline.
+
+Gera um .zip com um CSV no layout dos dumps anuais (colunas `id, lat, lon,
+data_hora_gmt, satelite, ...`) a partir da fonte sintética e mede o caminho
+completo até antes do Mongo: descompressão em fluxo -> parse no pool ->
+`_ingest_features(dry_run=True)` (conversão em documentos), com 1 worker e
+com N workers.
+
+    python -m benchmarks.bench_import                  # 300k focos (~1 ano, satélite de referência)
+    python -m benchmarks.bench_import --n 1000000 -w 1 -w 4 -w 8
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import io
+import tempfile
+import zipfile
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List
+
+from .synthetic import SyntheticFireSource
+
+COLUMNS = [
+    "id", "lat", "lon", "data_hora_gmt", "satelite", "municipio", "estado", "pais",
+    "municipio_id", "estado_id", "pais_id", "numero_dias_sem_chuva", "precipitacao", "risco_fogo", "bioma", "frp",
+]
+
+def write_dump(path: Path, n: int, start: str, end: str) -> int:
+    """Zip com um CSV de `n` focos (data no formato dos dumps: 'YYYY-MM-DD HH:MM:SS')."""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        with zf.open(path.stem + ".csv", "w") as raw, io.TextIOWrapper(raw, encoding="utf-8", newline="") as fh:
+            w = csv.writer(fh)
+            w.writerow(COLUMNS)
+            for feat in SyntheticFireSource(n, start, end).features():
+                p = dict(feat["properties"], id=feat["properties"]["foco_id"])
+                p["data_hora_gmt"] = p["data_hora_gmt"].replace("T", " ").rstrip("Z")
+                w.writerow(["" if p.get(c) is None else p[c] for c in COLUMNS])
+    return path.stat().st_size
+
+async def _run(path: Path, workers: int, batch_size: int) -> Dict[str, Any]:
+    from app.api.v1.routers.ingest import _ingest_features
+    from app.core.metrics import INGEST_STAGE_SECONDS
+    from app.services.file_source import FileFireSource
+
+    source = FileFireSource([str(path)], workers=workers)
+    before = {s: INGEST_STAGE_SECONDS.labels("file", s).sum for s in ("fetch", "transform")}
+    rows = 0
+
+    async def counted():
+        nonlocal rows
+        async for feat in source.iter_48h():
+            rows += 1
+            yield feat
+
+    t0 = perf_counter()
+    await _ingest_features(None, counted(), "file", dry_run=True, batch_size=batch_size)  # type: ignore[arg-type]
+    wall = perf_counter() - t0
+    return {
+        "workers": source.workers,
+        "rows": rows,
+        "wall_s": round(wall, 2),
+        "fps": round(rows / wall),
+        "fetch_s": round(INGEST_STAGE_SECONDS.labels("file", "fetch").sum - before["fetch"], 2),
+        "transform_s": round(INGEST_STAGE_SECONDS.labels("file", "transform").sum - before["transform"], 2),
+    }
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=300_000)
+    ap.add_argument("-w", "--workers", type=int, action="append", help="repetível; padrão: 1 e núcleos - 1")
+    ap.add_argument("--batch-size", type=int, default=10_000)
+    args = ap.parse_args()
+
+    import logging
+    import structlog
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    from app.utils.procpool import default_workers
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "focos_br_ref_2024.zip"
+        t0 = perf_counter()
+        size = write_dump(path, args.n, "2024-01-01", "2024-12-31")
+        print(f"dump: {args.n} focos, {size / 1e6:.1f} MB zip (gerado em {perf_counter() - t0:.1f}s)")
+        results: List[Dict[str, Any]] = []
+        for w in args.workers or sorted({1, default_workers()}):
+            r = asyncio.run(_run(path, w, args.batch_size))
+            results.append(r)
+            print(f"workers={r['workers']:>2d} rows={r['rows']:>8d} wall={r['wall_s']:>6.2f}s fps={r['fps']:>8d} "
+                  f"(espera pelo parse={r['fetch_s']:.2f}s, transform={r['transform_s']:.2f}s)")
+
+if __name__ == "__main__":
+    main()
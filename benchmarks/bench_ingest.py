@@ -0,0 +1,195 @@
+# benchmarks/bench_ingest.py
+"""
+Benchmark da ingestão, totalmente offline: `SyntheticFireSource` ->
+`_ingest_features` (o mesmo caminho de /ingest/*) -> `MockRepository`.
+
+Cenários:
+  - 48h      : janela de 48h (~25k focos x scale) num repositório vazio;
+  - backfill : um ano (~250k focos x scale) via `iter_range`;
+  - resync   : a mesma janela de 48h já gravada, 2% dos focos alterados.
+
+Cada cenário roda num processo novo (pico de RSS isolado) e reporta
+features/s (total e só do pipeline, sem o gerador sintético, que entra como
+"fetch"), pico de RSS e tempo por etapa (fetch, transform, write, hooks).
+
+    python -m benchmarks.bench_ingest                    # roda e compara com baselines.json
+    python -m benchmarks.bench_ingest --scale 0.2 -s 48h
+    python -m benchmarks.bench_ingest --update-baselines # grava os números desta máquina
+    python -m benchmarks.bench_ingest -s backfill --transform process --transform-workers 4
+
+`--transform` escolhe onde roda a conversão feature -> documento
+(TRANSFORM_EXECUTOR): no event loop (`inline`) ou por página num pool de
+threads/processos; com pool, `transform` é a espera pelo pool.
+
+Regressão (sai com código 1): `pipeline_fps` abaixo de baseline x (1 - tol) ou
+`peak_rss_mb` acima de baseline x (1 + tol). Baselines dependem da máquina:
+regenere ao trocar de hardware.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import multiprocessing as mp
+import platform
+import resource
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Any, Dict, List
+
+BASELINES = Path(__file__).with_name("baselines.json")
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "48h": {"n": 25_000, "start": "2025-09-01", "end": "2025-09-02", "mode": "48h"},
+    "backfill": {"n": 250_000, "start": "2024-01-01", "end": "2024-12-31", "mode": "initial"},
+    "resync": {"n": 25_000, "start": "2025-09-01", "end": "2025-09-02", "mode": "resync", "changed": 0.02},
+}
+
+def _rss_mb() -> float:
+    # ru_maxrss: KiB no Linux, bytes no macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+async def _run(name: str, scale: float, hooks: bool, batch_size: int, transform: str, workers: int) -> Dict[str, Any]:
+    from app.api.v1.routers.ingest import _ingest_features
+    from app.core.config import settings
+    from app.core.metrics import INGEST_STAGE_SECONDS
+    from app.services import ingest_events
+    from app.services.hot_snapshot import hot_snapshot
+    from app.services.mock_services import MockRepository
+    from app.services.transform_pool import close_transform_pool, transform_pool, transform_workers
+    from .synthetic import SyntheticFireSource
+
+    # importar os routers registra todos os ganchos; o de eventos precisa do Mongo
+    settings.events_enabled = False
+    settings.transform_executor, settings.transform_workers = transform, workers  # type: ignore[assignment]
+    if not hooks:
+        ingest_events._hooks.clear()
+
+    spec = SCENARIOS[name]
+    n = max(1, int(spec["n"] * scale))
+    repo = MockRepository()
+    source = SyntheticFireSource(n, spec["start"], spec["end"], changed=spec.get("changed", 0.0))
+
+    if name == "resync":
+        # estado anterior: a mesma janela já gravada (fora da medição)
+        await repo.upsert_many(
+            d for d in map(_doc, SyntheticFireSource(n, spec["start"], spec["end"]).features()) if d
+        )
+    if hooks:
+        await hot_snapshot.load(repo)
+    if transform_pool() is not None:
+        # aquece o pool (spawn dos processos) fora da medição
+        list(transform_pool().map(abs, range(transform_workers() * 4)))
+
+    rss_before = _rss_mb()
+    t0 = perf_counter()
+    feats = source.iter_48h() if spec["mode"] in ("48h", "resync") else source.iter_range(spec["start"], spec["end"])
+    written = await _ingest_features(repo, feats, spec["mode"], batch_size=batch_size)
+    wall = perf_counter() - t0
+    close_transform_pool()
+
+    stages = {
+        stage: round(INGEST_STAGE_SECONDS.labels(spec["mode"], stage).sum, 4)
+        for stage in ("fetch", "transform", "write", "hooks")
+    }
+    pipeline = stages["transform"] + stages["write"] + stages["hooks"]
+    return {
+        "scenario": name,
+        "transform": transform if transform == "inline" else f"{transform}x{transform_workers()}",
+        "features": n,
+        "written": written,
+        "wall_s": round(wall, 3),
+        "fps": round(n / wall, 1),
+        "pipeline_fps": round(n / pipeline, 1) if pipeline else None,
+        "peak_rss_mb": round(_rss_mb(), 1),
+        "rss_before_mb": round(rss_before, 1),
+        "stages_s": stages,
+    }
+
+def _doc(feat: Dict[str, Any]) -> Dict[str, Any]:
+    from app.api.v1.routers.ingest import _doc_from_feature
+    return _doc_from_feature(feat)
+
+def _child(name: str, scale: float, hooks: bool, batch_size: int, transform: str, workers: int, out: "mp.Queue") -> None:
+    import logging
+    import structlog
+    # logs por página (wfs.*, hooks) não entram na medição
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    out.put(asyncio.run(_run(name, scale, hooks, batch_size, transform, workers)))
+
+def run_scenario(
+    name: str, scale: float = 1.0, hooks: bool = False, batch_size: int = 2000,
+    transform: str = "inline", workers: int = 0,
+) -> Dict[str, Any]:
+    ctx = mp.get_context("spawn")
+    q: "mp.Queue" = ctx.Queue()
+    p = ctx.Process(target=_child, args=(name, scale, hooks, batch_size, transform, workers, q))
+    p.start()
+    result = q.get()
+    p.join()
+    return result
+
+def _key(scale: float, hooks: bool, transform: str = "inline") -> str:
+    return f"scale={scale:g}{',hooks' if hooks else ''}{'' if transform == 'inline' else ',transform=' + transform}"
+
+def check(results: List[Dict[str, Any]], baselines: Dict[str, Any], tol: float) -> List[str]:
+    failures = []
+    for r in results:
+        base = baselines.get(r["scenario"])
+        if not base:
+            continue
+        if r["pipeline_fps"] and r["pipeline_fps"] < base["pipeline_fps"] * (1 - tol):
+            failures.append(f"{r['scenario']}: pipeline_fps {r['pipeline_fps']} < {base['pipeline_fps']} (-{tol:.0%})")
+        if r["peak_rss_mb"] > base["peak_rss_mb"] * (1 + tol):
+            failures.append(f"{r['scenario']}: peak_rss_mb {r['peak_rss_mb']} > {base['peak_rss_mb']} (+{tol:.0%})")
+    return failures
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("-s", "--scenario", action="append", choices=sorted(SCENARIOS), help="repetível; padrão: todos")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplica o número de focos de cada cenário")
+    ap.add_argument("--batch-size", type=int, default=2000)
+    ap.add_argument("--hooks", action="store_true", help="inclui ganchos pós-escrita em processo (snapshot, caches, push)")
+    ap.add_argument("--transform", choices=["inline", "thread", "process"], default="inline",
+                    help="onde roda a conversão feature -> documento (TRANSFORM_EXECUTOR)")
+    ap.add_argument("--transform-workers", type=int, default=0, help="workers do pool (0 = núcleos - 1)")
+    ap.add_argument("--tolerance", type=float, default=0.25)
+    ap.add_argument("--update-baselines", action="store_true")
+    ap.add_argument("--json", action="store_true", help="imprime os resultados em JSON")
+    args = ap.parse_args()
+
+    results = [
+        run_scenario(name, args.scale, args.hooks, args.batch_size, args.transform, args.transform_workers)
+        for name in (args.scenario or SCENARIOS)
+    ]
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        for r in results:
+            st = r["stages_s"]
+            print(f"{r['scenario']:9s} {r['transform']:9s} n={r['features']:>7d} written={r['written']:>7d} "
+                  f"fps={r['fps']:>9.0f} pipeline_fps={r['pipeline_fps'] or 0:>9.0f} "
+                  f"rss={r['peak_rss_mb']:>7.1f}MB  fetch={st['fetch']:.2f}s transform={st['transform']:.2f}s "
+                  f"write={st['write']:.2f}s hooks={st['hooks']:.2f}s")
+
+    all_baselines = json.loads(BASELINES.read_text()) if BASELINES.exists() else {}
+    key = _key(args.scale, args.hooks, args.transform)
+    if args.update_baselines:
+        current = all_baselines.setdefault(key, {})
+        for r in results:
+            current[r["scenario"]] = {"pipeline_fps": r["pipeline_fps"], "peak_rss_mb": r["peak_rss_mb"]}
+        all_baselines["_machine"] = {"python": platform.python_version(), "platform": platform.platform()}
+        BASELINES.write_text(json.dumps(all_baselines, indent=2, sort_keys=True) + "\n")
+        print(f"baselines atualizados em {BASELINES.name} [{key}]")
+        return
+
+    failures = check(results, all_baselines.get(key, {}), args.tolerance)
+    if failures:
+        print("REGRESSÃO:\n  " + "\n  ".join(failures))
+        raise SystemExit(1)
+    if key not in all_baselines:
+        print(f"sem baselines para [{key}] (use --update-baselines)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+# benchmarks/bench_serialization.py
+"""
+Compara o caminho pydantic (padrão) com o caminho rápido (API_FAST_JSON)
+em /data/recent e /data/find, e confere que os bytes são idênticos.
+
+    python -m benchmarks.bench_serialization --n 1000 --rounds 50
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import random
+from time import perf_counter
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.api.v1.routers.data import router as data_router
+from app.core.config import settings
+from app.core.deps import get_read_repo, get_repo
+from app.services.mock_services import MockRepository
+
+SATS = ["AQUA_M-T", "TERRA_M-T", "NPP-375", "NOAA-20", "GOES-16", "METOP-C"]
+UFS = ["PARÁ", "MATO GROSSO", "TOCANTINS", "MARANHÃO", "PIAUÍ", "BAHIA"]
+BIOMAS = ["Amazônia", "Cerrado", "Caatinga", "Pantanal"]
+
+def _docs(n: int, seed: int = 42) -> list[dict]:
+    rnd = random.Random(seed)
+    out = []
+    for i in range(n):
+        lon = round(rnd.uniform(-73.9, -34.8), 5)
+        lat = round(rnd.uniform(-33.7, 5.2), 5)
+        _id = f"bench-{i:07d}"
+        out.append({
+            "_id": _id, "id": _id,
+            "data_hora_gmt": f"2025-10-{1 + i % 28:02d}T{i % 24:02d}:{i % 60:02d}:00Z",
+            "longitude": lon, "latitude": lat,
+            "satelite": rnd.choice(SATS), "municipio": f"MUNICIPIO {i % 500}",
+            "estado": rnd.choice(UFS), "pais": "Brasil", "bioma": rnd.choice(BIOMAS),
+            "frp": round(rnd.expovariate(1 / 25), 1) if i % 5 else None,
+            "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        })
+    return out
+
+def _timeit(client: TestClient, url: str, rounds: int) -> tuple[float, bytes]:
+    body = b""
+    t0 = perf_counter()
+    for _ in range(rounds):
+        r = client.get(url)
+        r.raise_for_status()
+        body = r.content
+    return (perf_counter() - t0) / rounds, body
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=1000)
+    ap.add_argument("--rounds", type=int, default=30)
+    args = ap.parse_args()
+
+    repo = MockRepository()
+    asyncio.run(repo.upsert_many(_docs(args.n)))
+
+    app = FastAPI()
+    app.include_router(data_router)
+    app.dependency_overrides[get_repo] = lambda: repo
+    app.dependency_overrides[get_read_repo] = lambda: repo
+    client = TestClient(app)
+
+    limit = min(args.n, 1000)
+    for url in (f"/data/recent?limit={limit}", f"/data/recent?limit={limit}&format=geojson",
+                f"/data/find?limit={limit}"):
+        settings.api_fast_json = False
+        slow, slow_body = _timeit(client, url, args.rounds)
+        settings.api_fast_json = True
+        fast, fast_body = _timeit(client, url, args.rounds)
+        same = "identical" if slow_body == fast_body else "DIFFERENT"
+        print(f"{url:45s} pydantic={slow * 1000:8.2f}ms  orjson={fast * 1000:8.2f}ms  "
+              f"speedup={slow / fast:5.2f}x  bytes={len(fast_body)} ({same})")
+        if slow_body != fast_body:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# benchmarks/synthetic.py
+"""
+Fonte sintética de focos (FireSource) para benchmarks offline.
+
+Gera N features no formato do GeoJSON do WFS (todas as propriedades da camada,
+geometria Point), com distribuições próximas das reais: satélites e estados
+ponderados, focos concentrados em núcleos (arco do desmatamento, Matopiba,
+Pantanal) e ciclo diário com pico à tarde. A feature `i` depende só de
+(`seed`, `i`): duas fontes iguais geram os mesmos dados, o que permite medir
+uma ressincronização "quase sem mudança" (`changed` = fração alterada).
+"""
+from __future__ import annotations
+import asyncio
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+# (satélite, peso): NPP/NOAA (VIIRS 375 m) dominam a contagem
+SATELLITES: List[Tuple[str, float]] = [
+    ("NPP-375", 0.24), ("NOAA-20", 0.24), ("NOAA-21", 0.12), ("GOES-16", 0.14),
+    ("AQUA_M-T", 0.06), ("TERRA_M-T", 0.05), ("METOP-B", 0.05), ("METOP-C", 0.05),
+    ("NPP-375D", 0.03), ("MSG-03", 0.02),
+]
+
+# (estado, bioma principal, peso, (lon, lat) do núcleo, desvio em graus)
+REGIONS: List[Tuple[str, str, float, Tuple[float, float], float]] = [
+    ("MATO GROSSO", "Amazônia", 0.20, (-55.5, -11.5), 2.2),
+    ("PARÁ", "Amazônia", 0.17, (-51.5, -5.5), 2.5),
+    ("AMAZONAS", "Amazônia", 0.09, (-62.0, -6.5), 2.5),
+    ("TOCANTINS", "Cerrado", 0.08, (-48.3, -10.2), 1.6),
+    ("MARANHÃO", "Cerrado", 0.09, (-45.3, -5.0), 1.5),
+    ("PIAUÍ", "Cerrado", 0.05, (-43.5, -8.0), 1.4),
+    ("BAHIA", "Caatinga", 0.06, (-42.0, -12.0), 1.8),
+    ("RONDÔNIA", "Amazônia", 0.06, (-63.0, -10.5), 1.3),
+    ("ACRE", "Amazônia", 0.03, (-69.5, -9.5), 1.0),
+    ("MATO GROSSO DO SUL", "Pantanal", 0.05, (-56.5, -19.5), 1.4),
+    ("MINAS GERAIS", "Cerrado", 0.04, (-45.5, -17.0), 1.6),
+    ("GOIÁS", "Cerrado", 0.04, (-49.5, -15.5), 1.4),
+    ("RORAIMA", "Amazônia", 0.02, (-61.0, 2.5), 1.0),
+    ("AMAPÁ", "Amazônia", 0.02, (-51.5, 1.5), 0.8),
+]
+
+_SAT_NAMES = [s for s, _ in SATELLITES]
+_SAT_CUM = [sum(w for _, w in SATELLITES[: i + 1]) for i in range(len(SATELLITES))]
+_REG_CUM = [sum(r[2] for r in REGIONS[: i + 1]) for i in range(len(REGIONS))]
+_OTHER_BIOMES = ["Amazônia", "Cerrado", "Caatinga", "Pantanal", "Mata Atlântica"]
+
+def _pick(cum: List[float], u: float) -> int:
+    u *= cum[-1]
+    for i, c in enumerate(cum):
+        if u <= c:
+            return i
+    return len(cum) - 1
+
+def _iso(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+def _parse(day_or_iso: str, *, end: bool = False) -> datetime:
+    if "T" not in day_or_iso:
+        day_or_iso += "T23:59:59Z" if end else "T00:00:00Z"
+    return datetime.strptime(day_or_iso.replace("Z", ""), "%Y-%m-%dT%H:%M:%S").replace(tzinfo=timezone.utc)
+
+def make_feature(i: int, start: datetime, span_s: float, *, seed: int = 0, revision: int = 0) -> Dict[str, Any]:
+    """Feature `i` de um conjunto que cobre [start, start + span_s); `revision` muda só os atributos voláteis."""
+    rnd = random.Random(seed * 1_000_003 + i)
+    region = _pick(_REG_CUM, rnd.random())
+    state, biome, _, (clon, clat), sd = REGIONS[region]
+    lon = round(min(-34.8, max(-73.9, rnd.gauss(clon, sd))), 5)
+    lat = round(min(5.2, max(-33.7, rnd.gauss(clat, sd))), 5)
+    # ciclo diário: pico entre 15h e 19h UTC (tarde local)
+    day = int(rnd.random() * max(1, span_s // 86400))
+    hour = min(23, max(0, int(rnd.gauss(17, 3.5))))
+    offset = min(span_s - 1, day * 86400 + hour * 3600 + rnd.randrange(3600))
+    ts = _iso(start + timedelta(seconds=offset))
+    sat = _SAT_NAMES[_pick(_SAT_CUM, rnd.random())]
+    frp = round(rnd.lognormvariate(2.3, 1.1), 1) if rnd.random() < 0.85 else None
+    if revision:
+        # reprocessamento do INPE: FRP/risco recalculados, identidade e posição iguais
+        frp = round((frp or 1.0) * (1 + 0.05 * revision), 1)
+    foco_id = f"{sat}_{ts[:16]}_{lon:.4f}_{lat:.4f}_{i}"
+    props = {
+        "id": i + 1,
+        "foco_id": foco_id,
+        "id_foco_bdq": 900_000_000 + i,
+        "lat": lat,
+        "lon": lon,
+        "latitude": lat,
+        "longitude": lon,
+        "data_hora_gmt": ts,
+        "satelite": sat,
+        "municipio": f"MUNICIPIO {state[:3]} {rnd.randrange(150):03d}",
+        "estado": state,
+        "pais": "Brasil",
+        "municipio_id": 5_100_000 + rnd.randrange(99_999),
+        "estado_id": 11 + region,
+        "pais_id": 33,
+        "numero_dias_sem_chuva": rnd.choice([None, *range(0, 120, 3)]),
+        "precipitacao": round(rnd.expovariate(2.0), 2),
+        "risco_fogo": round(min(1.0, rnd.betavariate(4, 2)), 2) if rnd.random() < 0.9 else -999,
+        "bioma": biome if rnd.random() < 0.9 else rnd.choice(_OTHER_BIOMES),
+        "frp": frp,
+    }
+    return {
+        "type": "Feature",
+        "id": f"focos.{i + 1}",
+        "geometry": {"type": "Point", "coordinates": [lon, lat]},
+        "geometry_name": "geom",
+        "properties": props,
+    }
+
+class SyntheticFireSource:
+    """
+    FireSource sintética. `n` features espalhadas em [start, end]; `iter_48h`
+    gera as mesmas (a janela é o próprio conjunto). `page_size` e
+    `page_delay_s` simulam a paginação do WFS (cede o loop a cada página).
+
+    `changed` (0..1): fração das features com `revision=1` (atributos
+    alterados), para o cenário de ressincronização.
+    """
+    def __init__(
+        self,
+        n: int,
+        start: str = "2025-09-01",
+        end: str = "2025-09-02T23:59:59Z",
+        *,
+        seed: int = 42,
+        changed: float = 0.0,
+        page_size: int = 1000,
+        page_delay_s: float = 0.0,
+    ) -> None:
+        self.n = n
+        self.start = _parse(start)
+        self.end = _parse(end, end=True)
+        self.seed = seed
+        self.changed = changed
+        self.page_size = page_size
+        self.page_delay_s = page_delay_s
+
+    def features(self) -> Iterator[Dict[str, Any]]:
+        span = (self.end - self.start).total_seconds() + 1
+        cut = int(self.changed * 1_000_000)
+        for i in range(self.n):
+            revision = 1 if cut and (i * 7919) % 1_000_000 < cut else 0
+            yield make_feature(i, self.start, span, seed=self.seed, revision=revision)
+
+    async def _pages(self, flt: Optional[Tuple[str, str]] = None) -> AsyncIterator[Dict[str, Any]]:
+        in_page = 0
+        for feat in self.features():
+            if flt is not None:
+                ts = feat["properties"]["data_hora_gmt"]
+                if not (flt[0] <= ts <= flt[1]):
+                    continue
+            yield feat
+            in_page += 1
+            if in_page == self.page_size:
+                in_page = 0
+                await asyncio.sleep(self.page_delay_s)
+
+    async def iter_48h(self) -> AsyncIterator[Dict[str, Any]]:
+        async for feat in self._pages():
+            yield feat
+
+    async def iter_range(self, start_date: str, end_date: str, typename: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        flt = (_iso(_parse(start_date)), _iso(_parse(end_date, end=True)))
+        async for feat in self._pages(flt):
+            yield feat
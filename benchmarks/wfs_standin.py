@@ -0,0 +1,351 @@
+# benchmarks/wfs_standin.py
+"""
+Servidor WFS local (stand-in do GeoServer TerraBrasilis) para testes de
+desempenho reproduzíveis, sem tocar no servidor público.
+
+Serve GetFeature / DescribeFeatureType / GetCapabilities a partir de um
+dataset sintético (`benchmarks/synthetic.py`) ou gravado (`record`), e respeita
+o que o `WfsFireSource` usa: `count`, `startIndex`, `sortBy` (`campo`,
+`campo D`, `campo+D`), `cql_filter` no campo de data (`BETWEEN a AND b`,
+`>=`, `<=`, `>`, `<`, `=` unidos por AND) e `resultType=hits`.
+
+Falhas injetáveis (CLI ou `POST /_control` em tempo de execução):
+  - latência: `latency_ms` + `jitter_ms` por requisição e `ms_per_1k_features`;
+  - erros: `error_rate` (0..1) com `error_status` (503 padrão);
+  - throttling: `max_concurrent` (acima disso 429) e `rate_per_s` (429 + Retry-After).
+`GET /_stats` devolve contagens (requisições, 429, erros, pico de concorrência, bytes).
+
+Uso:
+    # servidor HTTP (uvicorn), 200k focos sintéticos em 30 dias, 150 ms de latência
+    python -m benchmarks.wfs_standin serve --synthetic 200000 --days 30 --latency-ms 150 --port 8089
+    WFS_BASE=http://127.0.0.1:8089/geoserver uvicorn app.main:app
+
+    # grava uma janela do WFS real uma vez (educadamente, paginado) para replay
+    python -m benchmarks.wfs_standin record --start 2025-09-01 --end 2025-09-07 -o data/focos.jsonl.gz
+    python -m benchmarks.wfs_standin serve --dataset data/focos.jsonl.gz
+
+Em processo (sem rede), para benchmarks: `make_app(...)` + `httpx.ASGITransport`.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import bisect
+import gzip
+import json
+import random
+import re
+from dataclasses import asdict, dataclass, fields
+from datetime import datetime, timezone
+from pathlib import Path
+from time import monotonic
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+from .synthetic import SyntheticFireSource
+
+SERVICE_PATH = "/geoserver/wfs"
+DEFAULT_LAYERS = ("dados_abertos:focos_48h_br_satref", "dados_abertos:focos_br_ref")
+
+@dataclass
+class Faults:
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    ms_per_1k_features: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    max_concurrent: int = 0      # 0 = sem limite
+    rate_per_s: float = 0.0      # 0 = sem limite
+
+    def update(self, values: Dict[str, Any]) -> None:
+        for f in fields(self):
+            if f.name in values:
+                setattr(self, f.name, type(getattr(self, f.name))(values[f.name]))
+
+@dataclass
+class Stats:
+    requests: int = 0
+    get_feature: int = 0
+    hits: int = 0
+    throttled: int = 0
+    errors: int = 0
+    features: int = 0
+    bytes: int = 0
+    concurrent: int = 0
+    peak_concurrent: int = 0
+
+class Dataset:
+    """Features ordenadas por data, já serializadas (orjson) uma vez."""
+    def __init__(self, features: Iterable[Dict[str, Any]], date_field: str = "data_hora_gmt") -> None:
+        rows = sorted(
+            ((f["properties"].get(date_field) or "", orjson.dumps(f)) for f in features),
+            key=lambda r: r[0],
+        )
+        self.dates: List[str] = [d for d, _ in rows]
+        self.blobs: List[bytes] = [b for _, b in rows]
+        self.date_field = date_field
+        first = orjson.loads(self.blobs[0]) if self.blobs else {"properties": {}}
+        self.properties = list(first["properties"])
+
+    def __len__(self) -> int:
+        return len(self.blobs)
+
+    def span(self, lo: Optional[str], lo_incl: bool, hi: Optional[str], hi_incl: bool) -> Tuple[int, int]:
+        i = 0 if lo is None else (bisect.bisect_left if lo_incl else bisect.bisect_right)(self.dates, lo)
+        j = len(self.dates) if hi is None else (bisect.bisect_right if hi_incl else bisect.bisect_left)(self.dates, hi)
+        return i, max(i, j)
+
+# ---------- CQL (subconjunto) ----------
+_VALUE = r"'?([0-9T:\-\.Z]+)'?"
+_BETWEEN = re.compile(rf"^\s*(\w+)\s+BETWEEN\s+{_VALUE}\s+AND\s+{_VALUE}\s*$", re.I)
+_CMP = re.compile(rf"^\s*(\w+)\s*(>=|<=|>|<|=)\s*{_VALUE}\s*$")
+
+def parse_cql(cql: str, date_field: str) -> Tuple[Optional[str], bool, Optional[str], bool]:
+    """Traduz o filtro de data em (lo, lo_inclusivo, hi, hi_inclusivo); outros campos -> ValueError."""
+    lo: Optional[str] = None
+    hi: Optional[str] = None
+    lo_incl = hi_incl = True
+    m = _BETWEEN.match(cql)
+    if m:
+        if m.group(1) != date_field:
+            raise ValueError(f"unsupported field {m.group(1)}")
+        return m.group(2), True, m.group(3), True
+    for part in re.split(r"\s+AND\s+", cql, flags=re.I):
+        m = _CMP.match(part)
+        if not m or m.group(1) != date_field:
+            raise ValueError(f"unsupported filter: {part!r}")
+        op, value = m.group(2), m.group(3)
+        if op in (">=", ">", "="):
+            lo, lo_incl = value, op != ">"
+        if op in ("<=", "<", "="):
+            hi, hi_incl = value, op != "<"
+    return lo, lo_incl, hi, hi_incl
+
+def _sort_desc(sort_by: Optional[str], date_field: str) -> bool:
+    if not sort_by:
+        return False
+    field, _, direction = sort_by.replace("+", " ").partition(" ")
+    if field.strip() != date_field:
+        raise ValueError(f"unsupported sortBy {sort_by!r}")
+    return direction.strip().upper() in ("D", "DESC")
+
+def _exception(code: str, text: str, status: int = 400) -> Response:
+    body = (
+        '<?xml version="1.0" encoding="UTF-8"?><ows:ExceptionReport version="2.0.0" '
+        'xmlns:ows="http://www.opengis.net/ows/1.1"><ows:Exception exceptionCode="'
+        f'{code}"><ows:ExceptionText>{text}</ows:ExceptionText></ows:Exception></ows:ExceptionReport>'
+    )
+    return Response(body, status_code=status, media_type="application/xml")
+
+def make_app(layers: Dict[str, Dataset], faults: Optional[Faults] = None, *, seed: int = 0) -> Starlette:
+    """App ASGI do stand-in. `layers`: typeName -> Dataset (vários nomes podem apontar para o mesmo)."""
+    faults = faults or Faults()
+    stats = Stats()
+    rnd = random.Random(seed)
+    window = {"second": 0, "count": 0}
+
+    def _throttle() -> Optional[Response]:
+        if faults.max_concurrent and stats.concurrent > faults.max_concurrent:
+            return Response("too many concurrent requests", status_code=429, headers={"Retry-After": "1"})
+        if faults.rate_per_s:
+            now = int(monotonic())
+            if window["second"] != now:
+                window["second"], window["count"] = now, 0
+            window["count"] += 1
+            if window["count"] > faults.rate_per_s:
+                return Response("rate limit exceeded", status_code=429, headers={"Retry-After": "1"})
+        return None
+
+    async def _delay(n_features: int) -> None:
+        ms = faults.latency_ms + rnd.uniform(0, faults.jitter_ms) + faults.ms_per_1k_features * n_features / 1000
+        if ms > 0:
+            await asyncio.sleep(ms / 1000)
+
+    def _get_feature(q: Dict[str, str], ds: Dataset) -> Tuple[Response, int]:
+        try:
+            lo, lo_incl, hi, hi_incl = (None, True, None, True)
+            if q.get("cql_filter"):
+                lo, lo_incl, hi, hi_incl = parse_cql(q["cql_filter"], ds.date_field)
+            desc = _sort_desc(q.get("sortby"), ds.date_field)
+            count = int(q.get("count") or q.get("maxfeatures") or 0) or len(ds)
+            start = int(q.get("startindex") or 0)
+        except ValueError as exc:
+            return _exception("InvalidParameterValue", str(exc)), 0
+        i, j = ds.span(lo, lo_incl, hi, hi_incl)
+        matched = j - i
+        if (q.get("resulttype") or "").lower() == "hits":
+            stats.hits += 1
+            ts = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+            body = (
+                '<?xml version="1.0" encoding="UTF-8"?><wfs:FeatureCollection '
+                'xmlns:wfs="http://www.opengis.net/wfs/2.0" '
+                f'numberMatched="{matched}" numberReturned="0" timeStamp="{ts}"/>'
+            )
+            return Response(body, media_type="application/xml"), 0
+        if desc:
+            hi_idx = j - start
+            sel = ds.blobs[max(i, hi_idx - count):max(i, hi_idx)][::-1]
+        else:
+            sel = ds.blobs[i + start:min(j, i + start + count)]
+        body = b"".join((
+            b'{"type":"FeatureCollection","features":[', b",".join(sel),
+            b'],"totalFeatures":', str(matched).encode(),
+            b',"numberMatched":', str(matched).encode(),
+            b',"numberReturned":', str(len(sel)).encode(),
+            b',"crs":{"type":"name","properties":{"name":"urn:ogc:def:crs:EPSG::4326"}}}',
+        ))
+        return Response(body, media_type="application/json"), len(sel)
+
+    def _describe(ds: Dataset, typename: str) -> Response:
+        elements = "".join(
+            f'<xsd:element maxOccurs="1" minOccurs="0" name="{p}" nillable="true" type="xsd:string"/>'
+            for p in ds.properties
+        )
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?><xsd:schema xmlns:xsd="http://www.w3.org/2001/XMLSchema">'
+            f'<xsd:complexType name="{typename.split(":")[-1]}Type"><xsd:complexContent><xsd:extension base="gml:AbstractFeatureType">'
+            f'<xsd:sequence><xsd:element maxOccurs="1" minOccurs="0" name="geom" nillable="true" type="gml:PointPropertyType"/>'
+            f"{elements}</xsd:sequence></xsd:extension></xsd:complexContent></xsd:complexType></xsd:schema>"
+        )
+        return Response(body, media_type="application/xml")
+
+    def _capabilities() -> Response:
+        items = "".join(f"<FeatureType><Name>{name}</Name></FeatureType>" for name in layers)
+        body = (
+            '<?xml version="1.0" encoding="UTF-8"?><wfs:WFS_Capabilities version="2.0.0" '
+            f'xmlns:wfs="http://www.opengis.net/wfs/2.0"><FeatureTypeList>{items}</FeatureTypeList></wfs:WFS_Capabilities>'
+        )
+        return Response(body, media_type="application/xml")
+
+    async def wfs(request: Request) -> Response:
+        stats.requests += 1
+        stats.concurrent += 1
+        stats.peak_concurrent = max(stats.peak_concurrent, stats.concurrent)
+        try:
+            throttled = _throttle()
+            if throttled is not None:
+                stats.throttled += 1
+                return throttled
+            q = {k.lower(): v for k, v in request.query_params.items()}
+            req = (q.get("request") or "").lower()
+            if req == "getcapabilities":
+                await _delay(0)
+                return _capabilities()
+            typename = q.get("typenames") or q.get("typename") or ""
+            ds = layers.get(typename)
+            if ds is None:
+                return _exception("InvalidParameterValue", f"Feature type {typename} unknown")
+            if req == "describefeaturetype":
+                await _delay(0)
+                return _describe(ds, typename)
+            if req != "getfeature":
+                return _exception("OperationNotSupported", f"request {req!r}")
+            stats.get_feature += 1
+            if faults.error_rate and rnd.random() < faults.error_rate:
+                stats.errors += 1
+                await _delay(0)
+                return Response("injected failure", status_code=faults.error_status)
+            resp, n = _get_feature(q, ds)
+            await _delay(n)
+            stats.features += n
+            stats.bytes += len(resp.body)
+            return resp
+        finally:
+            stats.concurrent -= 1
+
+    async def control(request: Request) -> Response:
+        faults.update(await request.json())
+        return JSONResponse(asdict(faults))
+
+    async def get_stats(request: Request) -> Response:
+        return JSONResponse(asdict(stats))
+
+    async def reset_stats(request: Request) -> Response:
+        for f in fields(stats):
+            if f.name != "concurrent":
+                setattr(stats, f.name, 0)
+        return JSONResponse(asdict(stats))
+
+    app = Starlette(routes=[
+        Route(SERVICE_PATH, wfs),
+        Route("/_control", control, methods=["POST"]),
+        Route("/_stats", get_stats, methods=["GET"]),
+        Route("/_stats", reset_stats, methods=["DELETE"]),
+    ])
+    app.state.faults = faults
+    app.state.stats = stats
+    return app
+
+# ---------- datasets ----------
+def synthetic_dataset(n: int, start: str, end: str, seed: int = 42) -> Dataset:
+    return Dataset(SyntheticFireSource(n, start, end, seed=seed).features())
+
+def load_dataset(path: str | Path) -> Dataset:
+    """`.jsonl[.gz]` (uma feature por linha) ou FeatureCollection `.json[.gz]`."""
+    path = Path(path)
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        if ".jsonl" in path.suffixes:
+            return Dataset(json.loads(line) for line in fh if line.strip())
+        return Dataset(json.load(fh)["features"])
+
+async def record(start: str, end: str, out: Path, typename: Optional[str], page_size: int) -> int:
+    """Baixa [start, end] do WFS configurado (WFS_BASE etc.) uma vez e grava para replay."""
+    from app.services.wfs_service import WfsFireSource
+    source = WfsFireSource(page_size=page_size)
+    n = 0
+    opener = gzip.open if out.suffix == ".gz" else open
+    with opener(out, "wt", encoding="utf-8") as fh:
+        async for feat in source.iter_range(start, end, typename=typename):
+            fh.write(json.dumps(feat, ensure_ascii=False) + "\n")
+            n += 1
+    return n
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    sub = ap.add_subparsers(dest="cmd", required=True)
+
+    sv = sub.add_parser("serve", help="sobe o stand-in (uvicorn)")
+    src = sv.add_mutually_exclusive_group()
+    src.add_argument("--dataset", help="arquivo gravado (.jsonl[.gz] ou FeatureCollection .json[.gz])")
+    src.add_argument("--synthetic", type=int, default=50_000, help="número de focos sintéticos")
+    sv.add_argument("--start", default="2025-09-01")
+    sv.add_argument("--days", type=int, default=2)
+    sv.add_argument("--layer", action="append", help="typeName servido (repetível)")
+    sv.add_argument("--host", default="127.0.0.1")
+    sv.add_argument("--port", type=int, default=8089)
+    for f in fields(Faults):
+        sv.add_argument(f"--{f.name.replace('_', '-')}", type=type(f.default), default=f.default)
+
+    rc = sub.add_parser("record", help="grava uma janela do WFS real para replay")
+    rc.add_argument("--start", required=True)
+    rc.add_argument("--end", required=True)
+    rc.add_argument("--typename")
+    rc.add_argument("--page-size", type=int, default=1000)
+    rc.add_argument("-o", "--out", type=Path, required=True)
+
+    args = ap.parse_args()
+    if args.cmd == "record":
+        n = asyncio.run(record(args.start, args.end, args.out, args.typename, args.page_size))
+        print(f"{n} features gravadas em {args.out}")
+        return
+
+    import uvicorn
+    from datetime import timedelta
+    if args.dataset:
+        ds = load_dataset(args.dataset)
+    else:
+        start = datetime.strptime(args.start, "%Y-%m-%d")
+        end = (start + timedelta(days=args.days) - timedelta(seconds=1)).strftime("%Y-%m-%dT%H:%M:%SZ")
+        ds = synthetic_dataset(args.synthetic, args.start, end)
+    faults = Faults(**{f.name: getattr(args, f.name) for f in fields(Faults)})
+    layers = {name: ds for name in (args.layer or DEFAULT_LAYERS)}
+    print(f"stand-in WFS: {len(ds)} features, camadas {list(layers)}, http://{args.host}:{args.port}{SERVICE_PATH}")
+    uvicorn.run(make_app(layers, faults), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()